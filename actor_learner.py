@@ -0,0 +1,178 @@
+# actor_learner.py
+
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+from dqn_agent import DQNAgent, configure_threads
+from poker_env import PokerEnv
+from replay_buffer import MemmapReplayBuffer
+
+class SharedWeights:
+    """
+    Policy weights kept as one flat tensor in shared memory plus a version counter.
+    The learner publishes by copying its parameters in; actors compare versions and
+    copy out only when something new was published, without touching any file.
+    """
+
+    def __init__(self, model, context=mp):
+        self.vector = parameters_to_vector(model.parameters()).detach().cpu().clone().share_memory_()
+        self.version = context.Value('q', 0)
+
+    def publish(self, model):
+        """Copies the model parameters into shared memory and bumps the version."""
+        with self.version.get_lock():
+            self.vector.copy_(parameters_to_vector(model.parameters()).detach().cpu())
+            self.version.value += 1
+
+    def load_into(self, model, known_version):
+        """
+        Copies the shared parameters into the model if a newer version exists.
+        Returns the version the model now holds.
+        """
+        if self.version.value == known_version:
+            return known_version
+        with self.version.get_lock():
+            vector_to_parameters(self.vector.clone(), model.parameters())
+            return self.version.value
+
+
+def actor_epsilon(actor_id, num_actors, base=0.4, alpha=7.0):
+    """Fixed exploration rate per actor, spread from base down to near-greedy."""
+    if num_actors == 1:
+        return base
+    return base ** (1 + alpha * actor_id / (num_actors - 1))
+
+
+def run_actor(actor_id, num_actors, shared_weights, replay, stop_event, env_steps,
+              sync_interval=100, flush_interval=32, seed=0):
+    """
+    Plays PokerEnv self-play episodes with an epsilon-greedy copy of the policy and
+    appends the transitions to the shared replay store in small batches. The
+    environment's opponent plays the same published weights at the same
+    exploration rate.
+    """
+    configure_threads(1, 1)  # Actors share the machine with the learner
+    np.random.seed(seed + actor_id)
+    env = PokerEnv()
+    state_size = env.observation_space.shape[0]
+    agent = DQNAgent(state_size=state_size, action_size=env.action_space.n, memory=replay)
+    agent.epsilon = actor_epsilon(actor_id, num_actors)
+    env.opponent.agent.epsilon = agent.epsilon
+    version = sync_actor(shared_weights, agent, env.opponent.agent, -1)
+
+    pending = []
+    steps = 0
+    state = env.reset()
+    while not stop_event.is_set():
+        action = agent.act(state)
+        next_state, reward, done, _ = env.step(action)
+        pending.append((state, action, reward, next_state, done))
+        state = env.reset() if done else next_state
+        steps += 1
+
+        if len(pending) == flush_interval:
+            states, actions, rewards, next_states, dones = zip(*pending)
+            replay.add_batch(np.stack(states), actions, rewards, np.stack(next_states), dones)
+            with env_steps.get_lock():
+                env_steps.value += len(pending)
+            pending = []
+        if steps % sync_interval == 0:
+            version = sync_actor(shared_weights, agent, env.opponent.agent, version)
+
+
+def sync_actor(shared_weights, agent, opponent, version):
+    """Loads newly published weights into the actor and copies them to its opponent."""
+    new_version = shared_weights.load_into(agent.model, version)
+    if new_version != version:
+        opponent.model.load_state_dict(agent.model.state_dict())
+    return new_version
+
+
+def check_actors(actors):
+    """Raises RuntimeError when every actor process has exited."""
+    if not any(actor.is_alive() for actor in actors):
+        codes = [actor.exitcode for actor in actors]
+        raise RuntimeError(f"All actors exited (exit codes {codes})")
+
+
+def train_actor_learner(
+    num_actors=4,
+    num_updates=10000,
+    batch_size=64,
+    publish_interval=50,
+    report_interval=500,
+    replay_dir=None,
+    replay_capacity=1000000,
+    model_save_path='models/poker_dqn_agent.pth',
+    device='cpu',
+    learner_threads=None
+):
+    """
+    Trains with N actor processes feeding a single learner.
+    Actors run self-play and append to a memory-mapped replay store; the learner
+    samples batches from it, trains, and publishes new weights through shared
+    memory every publish_interval updates. The learner gets the cores the
+    single-threaded actors leave free unless learner_threads is given.
+    The replay store goes to a temporary directory, removed afterwards, unless
+    replay_dir is given.
+    Returns the learner agent.
+    """
+    configure_threads(learner_threads or max(1, (os.cpu_count() or 1) - num_actors))
+    os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+    probe = PokerEnv()
+    state_size = probe.observation_space.shape[0]
+    temporary_replay = replay_dir is None
+    if temporary_replay:
+        replay_dir = tempfile.mkdtemp(prefix='poker-replay-')
+    replay = MemmapReplayBuffer(replay_dir, replay_capacity, state_size)
+    learner = DQNAgent(state_size=state_size, action_size=probe.action_space.n, device=device, memory=replay)
+    context = mp.get_context('spawn')
+    shared_weights = SharedWeights(learner.model, context)
+    stop_event = context.Event()
+    env_steps = context.Value('q', 0)
+    actors = [
+        context.Process(
+            target=run_actor,
+            args=(actor_id, num_actors, shared_weights, replay, stop_event, env_steps),
+            daemon=True
+        )
+        for actor_id in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    try:
+        # Wait for the actors to fill one batch
+        while len(replay) < batch_size:
+            check_actors(actors)
+            time.sleep(0.05)
+
+        start_time = time.perf_counter()
+        start_steps = env_steps.value
+        for update in range(1, num_updates + 1):
+            learner.replay(batch_size)
+            if update % publish_interval == 0:
+                shared_weights.publish(learner.model)
+            if update % report_interval == 0:
+                elapsed = time.perf_counter() - start_time
+                check_actors(actors)
+                print(f"Update {update}/{num_updates} - Updates/s: {update / elapsed:.0f} - "
+                      f"Env steps/s: {(env_steps.value - start_steps) / elapsed:.0f} - "
+                      f"Replay size: {len(replay)}")
+    finally:
+        stop_event.set()
+        for actor in actors:
+            actor.join(timeout=10)
+        replay.flush()
+        if temporary_replay:
+            # The learner keeps its mappings of the removed files
+            shutil.rmtree(replay_dir, ignore_errors=True)
+
+    learner.save(model_save_path)
+    print("Training complete. Final model saved.")
+    return learner
@@ -0,0 +1,466 @@
+# arena.py
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from game_logic import GameLogic
+from player import Player
+from poker_bot import PokerBot
+from profiling import add_profile_arguments, start_from_args
+
+# Line protocol, one message per line, loosely following the ACPC match-state format.
+#
+#   client -> server  VERSION:2.0.0                      once, right after connecting
+#   server -> client  MATCHSTATE:<seat>:<hand>:<betting>:<cards>
+#   client -> server  f | c | r                          or the MATCHSTATE line echoed with ":<action>"
+#   server -> client  HANDEND:<seat>:<hand>:<betting>:<cards>:<chips won>
+#   server -> client  MATCHEND:<seat>:<hands>:<chips won>  then the connection is closed
+#
+# MATCHSTATE is only sent when the seat has to act. <betting> lists the actions of
+# every street separated by '/'; <cards> is "hole|hole|.../flop/turn/river" with the
+# other seats' hole cards blank until a showdown. Cards are written like "Ah" or "Td".
+# A seat that answers late or disconnects folds for the rest of the match.
+
+RANKS = {'2': '2', '3': '3', '4': '4', '5': '5', '6': '6', '7': '7', '8': '8', '9': '9',
+         '10': 'T', 'Jack': 'J', 'Queen': 'Q', 'King': 'K', 'Ace': 'A'}
+SUITS = {'Hearts': 'h', 'Diamonds': 'd', 'Clubs': 'c', 'Spades': 's'}
+ACTION_LETTERS = {'fold': 'f', 'call': 'c', 'check': 'c', 'raise': 'r'}
+LETTER_ACTIONS = {'f': 'fold', 'c': 'call', 'r': 'raise'}
+STREET_CARDS = [('flop', 3), ('turn', 1), ('river', 1)]
+MAX_RAISES_PER_STREET = 4  # Further raises on the street are played as calls
+BOARD_SLICES = [(0, 3), (3, 4), (4, 5)]
+
+def format_cards(cards):
+    """Writes cards in the compact protocol form, e.g. "AhTd"."""
+    return ''.join(RANKS[card['value']] + SUITS[card['suit']] for card in cards)
+
+
+class RemotePlayer(Player):
+    """
+    Seat played by an external bot over a socket connection.
+    """
+
+    def __init__(self, name, reader, writer, chips=1000):
+        super().__init__(name, chips)
+        self.reader = reader
+        self.writer = writer
+        self.connected = True
+
+    def send(self, line):
+        if self.connected:
+            self.writer.write((line + '\r\n').encode())
+
+    async def request_action(self, state, timeout):
+        """
+        Sends a match state and waits for the reply.
+        Returns (action, outcome) where outcome is 'ok', 'invalid', 'timeout' or
+        'disconnected'; anything but a valid reply folds.
+        """
+        if not self.connected:
+            return 'fold', 'disconnected'
+        try:
+            self.send(state)
+            await self.writer.drain()
+            line = await asyncio.wait_for(self.reader.readline(), timeout)
+        except asyncio.TimeoutError:
+            self.disconnect()
+            return 'fold', 'timeout'
+        except (ValueError, asyncio.LimitOverrunError):
+            # A reply longer than the stream limit; the rest of it cannot be resynchronised
+            self.disconnect()
+            return 'fold', 'invalid'
+        except ConnectionError:
+            self.disconnect()
+            return 'fold', 'disconnected'
+        if not line:
+            self.disconnect()
+            return 'fold', 'disconnected'
+        reply = line.decode(errors='replace').strip().rsplit(':', 1)[-1]
+        action = LETTER_ACTIONS.get(reply[:1].lower())
+        if action is None:
+            return 'fold', 'invalid'
+        return action, 'ok'
+
+    def disconnect(self):
+        if self.connected:
+            self.connected = False
+            self.writer.close()
+
+
+class ArenaTable(GameLogic):
+    """
+    GameLogic table whose betting rounds await remote seats instead of blocking.
+    The betting follows execute_betting_round, except that a hand ends as soon as
+    it is decided: once everyone else folded, or everyone else is all-in and the
+    seat has matched them, nobody is asked to act again. Raises are sized here
+    rather than by GameLogic: a raise always puts the seat above the current bet
+    (or all-in when it cannot), and after MAX_RAISES_PER_STREET raises on a street
+    further raises count as calls, so every hand terminates whatever clients send.
+    Every hand starts from initial_chips, so a match is scored by the chips won
+    per hand.
+    """
+
+    def __init__(self, players, initial_chips=1000, action_timeout=1.0, stats=None):
+        super().__init__(players=list(players), initial_chips=initial_chips)
+        self.verbose = False
+        self.action_timeout = action_timeout
+        self.stats = stats if stats is not None else {}
+        self.dealer_position = len(self.players) - 1  # prepare_round moves the button to seat 0
+        self.hand_number = 0
+        self.betting = [[]]
+        self.revealed = set()  # Seats whose hole cards are shown at the showdown
+        self.street_raises = 0
+
+    def match_state(self, seat):
+        """Match state line as seen by the given seat."""
+        holes = [
+            format_cards(player.hand) if seat_index == seat or seat_index in self.revealed else ''
+            for seat_index, player in enumerate(self.players)
+        ]
+        cards = ['|'.join(holes)]
+        for start, end in BOARD_SLICES:
+            if len(self.community_cards) >= end:
+                cards.append(format_cards(self.community_cards[start:end]))
+        betting = '/'.join(''.join(street) for street in self.betting)
+        return f"{seat}:{self.hand_number}:{betting}:{'/'.join(cards)}"
+
+    async def play_hand(self):
+        """Plays one hand and returns each seat's chip result."""
+        for player in self.players:
+            player.chips = self.initial_chips
+        self.shuffle_and_deal()
+        self.prepare_round()
+        self.betting = [[]]
+        self.revealed = set()
+
+        for phase, count in STREET_CARDS + [(None, 0)]:
+            await self.betting_round()
+            if phase is None or self.is_decided():
+                break
+            self.game_phase = phase
+            self.deal_community_cards(count)
+            self.betting.append([])
+
+        live = [player for player in self.players if player.is_active]
+        if len(live) > 1:
+            # Run out the board for all-in hands, then compare hands
+            for (phase, count), (_, end) in zip(STREET_CARDS, BOARD_SLICES):
+                if len(self.community_cards) < end:
+                    self.game_phase = phase
+                    self.deal_community_cards(count)
+            self.revealed = {seat for seat, player in enumerate(self.players) if player.is_active}
+            self.game_phase = 'showdown'
+            self.showdown()
+        else:
+            live[0].chips += self.pot
+            self.pot = 0
+
+        results = [player.chips - self.initial_chips for player in self.players]
+        for seat, player in enumerate(self.players):
+            if isinstance(player, RemotePlayer):
+                player.send(f"HANDEND:{self.match_state(seat)}:{results[seat]}")
+        self.hand_number += 1
+        self.stats['hands'] = self.stats.get('hands', 0) + 1
+        return results
+
+    async def betting_round(self):
+        """Asynchronous counterpart of execute_betting_round for a single street."""
+        players_in_round = [player for player in self.players if player.is_active]
+        for player in players_in_round:
+            player.current_bet = 0
+        self.street_raises = 0
+
+        betting_complete = False
+        while not betting_complete:
+            betting_complete = True
+            for player in players_in_round:
+                if not player.is_active or player.is_all_in or self.is_decided(player):
+                    continue
+                action = self.legal_action(player, await self.next_action(player))
+                self.process_player_action(player, action)
+                self.betting[-1].append(ACTION_LETTERS[action])
+                if not self.all_bets_equal(players_in_round):
+                    betting_complete = False
+
+    def legal_action(self, player, action):
+        """Turns raises past the street cap, or by a seat that cannot top the current bet, into calls."""
+        if action == 'raise':
+            if self.street_raises >= MAX_RAISES_PER_STREET or player.current_bet + player.chips <= self.current_bet:
+                return 'call'
+            self.street_raises += 1
+        return action
+
+    def process_player_action(self, player, action):
+        """
+        Applies an action, sizing raises to twice the current bet (at least one big
+        blind more), capped at the seat's stack.
+        GameLogic caps the raise by the chips behind the seat instead of its total,
+        which can hand chips back once a stack runs short.
+        """
+        if action != 'raise':
+            super().process_player_action(player, action)
+            return
+        total_bet = min(max(self.current_bet * 2, self.current_bet + self.big_blind),
+                        player.current_bet + player.chips)
+        bet_amount = total_bet - player.current_bet
+        player.chips -= bet_amount
+        player.current_bet = total_bet
+        self.current_bet = total_bet
+        self.pot += bet_amount
+        if player.chips == 0:
+            player.is_all_in = True
+
+    def is_decided(self, player=None):
+        """
+        Checks whether no more betting can change the hand: at most one seat is
+        live, or every live seat but one is all-in and that seat has matched them.
+        """
+        live = [other for other in self.players if other.is_active]
+        if len(live) <= 1:
+            return True
+        can_act = [other for other in live if not other.is_all_in]
+        if not can_act:
+            return True
+        if len(can_act) > 1:
+            return False
+        if player is None:
+            player = can_act[0]
+        return player.current_bet >= max(other.current_bet for other in live)
+
+    async def next_action(self, player):
+        self.stats['actions'] = self.stats.get('actions', 0) + 1
+        if isinstance(player, RemotePlayer):
+            seat = self.players.index(player)
+            action, outcome = await player.request_action(f"MATCHSTATE:{self.match_state(seat)}",
+                                                          self.action_timeout)
+            if outcome != 'ok':
+                self.stats[outcome] = self.stats.get(outcome, 0) + 1
+            return action
+        return self.get_player_action(player)
+
+
+class ArenaServer:
+    """
+    Hosts bot-versus-bot matches on one asyncio event loop.
+    Connections are seated in arrival order, seats at a time, or each against
+    house bots when house_bot is given. house_bot(index) returns a Player (usually a
+    PokerBot); house bots decide synchronously on the event loop with
+    house_budget seconds per decision, so keep that small. Finished house bots are
+    reused by later matches.
+    """
+
+    def __init__(self, seats=2, hands_per_match=100, action_timeout=1.0, initial_chips=1000,
+                 house_bot=None, house_budget=0.0, report_interval=None):
+        if seats < 2:
+            raise ValueError("A match needs at least two seats")
+        self.seats = seats
+        self.hands_per_match = hands_per_match
+        self.action_timeout = action_timeout
+        self.initial_chips = initial_chips
+        self.house_bot = house_bot
+        self.house_budget = house_budget
+        self.report_interval = report_interval
+        self.house_pool = []
+        self.house_created = 0
+        self.waiting = []
+        self.connections = itertools.count()
+        self.counters = {'matches': 0, 'hands': 0, 'actions': 0, 'timeout': 0, 'invalid': 0,
+                         'disconnected': 0, 'active_matches': 0}
+        self.server = None
+        self.reporter = None
+        self.start_time = None
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """Listens on a Unix socket when path is given, otherwise on TCP. Returns the bound address."""
+        if path:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+        self.start_time = time.perf_counter()
+        if self.report_interval:
+            self.reporter = asyncio.create_task(self._report_periodically())
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        if self.reporter:
+            self.reporter.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for player in self.waiting:
+            player.disconnect()
+        self.waiting = []
+
+    async def handle_connection(self, reader, writer):
+        """Reads the handshake, then seats the connection."""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.action_timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            line = b''
+        if not line.startswith(b'VERSION:'):
+            writer.close()
+            return
+        player = RemotePlayer(f"Remote {next(self.connections)}", reader, writer, chips=self.initial_chips)
+        if self.house_bot:
+            await self.run_match([player] + [self._house_player() for _ in range(self.seats - 1)])
+            return
+        self.waiting = [other for other in self.waiting if other.connected]
+        self.waiting.append(player)
+        if len(self.waiting) >= self.seats:
+            players, self.waiting = self.waiting[:self.seats], self.waiting[self.seats:]
+            await self.run_match(players)
+
+    def _house_player(self):
+        if self.house_pool:
+            return self.house_pool.pop()
+        self.house_created += 1
+        return self.house_bot(self.house_created)
+
+    async def run_match(self, players):
+        """Plays hands_per_match hands and returns each seat's total."""
+        self.counters['active_matches'] += 1
+        table = ArenaTable(players, self.initial_chips, self.action_timeout, self.counters)
+        table.decision_budget = self.house_budget
+        remote = [player for player in players if isinstance(player, RemotePlayer)]
+        totals = [0] * len(players)
+        try:
+            for _ in range(self.hands_per_match):
+                for seat, result in enumerate(await table.play_hand()):
+                    totals[seat] += result
+                if not any(player.connected for player in remote):
+                    break
+            for seat, player in enumerate(players):
+                if isinstance(player, RemotePlayer) and player.connected:
+                    player.send(f"MATCHEND:{seat}:{table.hand_number}:{totals[seat]}")
+                    try:
+                        await player.writer.drain()
+                    except ConnectionError:
+                        pass
+        finally:
+            for player in remote:
+                player.disconnect()
+            self.house_pool.extend(player for player in players if not isinstance(player, RemotePlayer))
+            self.counters['active_matches'] -= 1
+        self.counters['matches'] += 1
+        return totals
+
+    def stats(self):
+        """Counters since start(), with match and hand throughput."""
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        stats = dict(self.counters, elapsed=elapsed)
+        stats['matches_per_second'] = self.counters['matches'] / elapsed if elapsed else 0.0
+        stats['hands_per_second'] = self.counters['hands'] / elapsed if elapsed else 0.0
+        return stats
+
+    def print_report(self):
+        stats = self.stats()
+        print(f"Matches: {stats['matches']} - Matches/s: {stats['matches_per_second']:.1f} - "
+              f"Hands/s: {stats['hands_per_second']:.0f} - Active: {stats['active_matches']} - "
+              f"Timeouts: {stats['timeout']} - Disconnects: {stats['disconnected']}")
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.print_report()
+
+
+def random_strategy(state):
+    """Client strategy that calls most of the time and sometimes raises or folds."""
+    return random.choices('crf', weights=(6, 3, 1))[0]
+
+
+async def play_client(strategy=random_strategy, host='127.0.0.1', port=None, path=None):
+    """
+    Connects one bot to an arena and plays a match.
+    strategy maps a MATCHSTATE line to 'f', 'c' or 'r'. Returns the chips won over
+    the match, or None if the server closed the connection first.
+    """
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'VERSION:2.0.0\r\n')
+    total = None
+    try:
+        async for line in reader:
+            line = line.decode().strip()
+            if line.startswith('MATCHSTATE:'):
+                writer.write(f"{line}:{strategy(line)}\r\n".encode())
+            elif line.startswith('MATCHEND:'):
+                total = int(line.rsplit(':', 1)[-1])
+                break
+    finally:
+        writer.close()
+    return total
+
+
+async def benchmark(server, clients, matches, host='127.0.0.1', port=None, path=None):
+    """Plays the given number of matches with concurrent built-in clients and prints the throughput."""
+    seats_per_match = 1 if server.house_bot else server.seats
+    remaining = iter(range(matches * seats_per_match))
+
+    async def client_loop():
+        for _ in remaining:
+            await play_client(random_strategy, host, port, path)
+
+    await asyncio.gather(*(client_loop() for _ in range(max(clients, seats_per_match))))
+    server.print_report()
+
+
+def make_house_bot(checkpoint=None, state_size=112):
+    """House bot factory: greedy network play from a checkpoint, or PokerBot's heuristic tier."""
+    template = None
+    if checkpoint:
+        from evaluation import GreedyBot
+        template = GreedyBot('House', state_size=state_size)
+        template.load_agent(checkpoint)
+        template.agent.epsilon = 0.0
+
+    def house_bot(index):
+        if template is None:
+            return PokerBot(f"House {index}", state_size=state_size, equity_refinement=False)
+        bot = GreedyBot(f"House {index}", state_size=state_size)
+        bot.agent = template.agent
+        return bot
+
+    return house_bot
+
+
+async def main(args):
+    house_bot = make_house_bot(args.house_checkpoint) if args.house or args.house_checkpoint else None
+    server = ArenaServer(seats=args.seats, hands_per_match=args.hands, action_timeout=args.timeout,
+                         house_bot=house_bot, report_interval=args.report_interval)
+    address = await server.start(args.host, args.port, args.unix_socket)
+    print(f"Arena listening on {address}")
+    try:
+        if args.benchmark:
+            port = None if args.unix_socket else address[1]
+            await benchmark(server, args.clients, args.benchmark, args.host, port, args.unix_socket)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Asyncio arena hosting matches between socket-connected bots.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=18791)
+    parser.add_argument('--unix-socket', default=None, help='Listen on this Unix socket path instead of TCP')
+    parser.add_argument('--seats', type=int, default=2)
+    parser.add_argument('--hands', type=int, default=100, help='Hands per match')
+    parser.add_argument('--timeout', type=float, default=1.0, help='Seconds allowed per action')
+    parser.add_argument('--house', action='store_true', help='Seat every connection against house PokerBots')
+    parser.add_argument('--house-checkpoint', default=None, help='Weights for greedy house bots')
+    parser.add_argument('--report-interval', type=float, default=10.0)
+    parser.add_argument('--benchmark', type=int, default=0, help='Play this many matches with built-in clients, then exit')
+    parser.add_argument('--clients', type=int, default=1000, help='Concurrent built-in clients for --benchmark')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args, 'arena')
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
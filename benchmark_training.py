@@ -0,0 +1,101 @@
+# benchmark_training.py
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+import torch
+from dqn_agent import DQNAgent, configure_threads
+from poker_env import PokerEnv
+from sweep import evaluate_policy
+from training_loop import train_agent, train_agent_vectorized
+from vec_env import PokerVecEnv
+
+# (name, warmup_steps, update_interval, gradient_steps, batch_size)
+SCHEDULES = [
+    ('every-step-32', 0, 1, 1, 32),
+    ('every-4-steps-128', 1000, 4, 1, 128),
+    ('every-16-steps-4x128', 1000, 16, 4, 128),
+    ('every-16-steps-512', 1000, 16, 1, 512),
+]
+EVAL_SEED = 12345  # Seed of the evaluation hands, shared by every run and the baseline
+
+
+class AlwaysCall:
+    """Baseline policy that calls every decision, scored the same way as a trained agent."""
+    epsilon = 0.0
+
+    def act(self, state):
+        return 1
+
+
+def run_schedule(schedule, budget_seconds, max_episodes, seed, model_dir, num_envs=1, target_reward=None,
+                 eval_episodes=1000):
+    """
+    Trains with one schedule for budget_seconds of wall-clock time, or until
+    target_reward is reached when one is given, and returns (seconds, episodes,
+    reached, greedy reward). The greedy reward is the mean over eval_episodes
+    fixed hands without exploration, the same hands for every schedule.
+    With num_envs > 1 the schedule runs through train_agent_vectorized instead.
+    """
+    name, warmup_steps, update_interval, gradient_steps, batch_size = schedule
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    env = PokerEnv()
+    agent = DQNAgent(state_size=env.observation_space.shape[0], action_size=env.action_space.n)
+    schedule_args = dict(
+        num_episodes=max_episodes, batch_size=batch_size, save_interval=max_episodes + 1,
+        model_save_path=os.path.join(model_dir, f'{name}.pth'), warmup_steps=warmup_steps,
+        update_interval=update_interval, gradient_steps=gradient_steps, target_reward=target_reward,
+        time_budget=budget_seconds
+    )
+    start = time.perf_counter()
+    if num_envs > 1:
+        vec_env = PokerVecEnv(num_envs)
+        rewards, _ = train_agent_vectorized(vec_env, agent, **schedule_args)
+        vec_env.close()
+    else:
+        rewards, _ = train_agent(env, agent, **schedule_args)
+    seconds = time.perf_counter() - start
+    reached = (target_reward is not None and len(rewards) >= 100
+               and float(np.mean(rewards[-100:])) >= target_reward)
+    return seconds, len(rewards), reached, evaluate_policy(agent, eval_episodes, seed=EVAL_SEED)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Greedy reward after a fixed wall-clock budget for several update schedules.'
+    )
+    parser.add_argument('--budget-seconds', type=float, default=30.0, help='Training time per run')
+    parser.add_argument('--eval-episodes', type=int, default=1000, help='Fixed hands each trained agent is scored on')
+    # The 100-episode training mean sits near 0 from the start, so a target is only
+    # meaningful as a margin over the always-call baseline printed below
+    parser.add_argument('--target-reward', type=float, default=None,
+                        help='Also stop once the mean reward over the last 100 episodes reaches this')
+    parser.add_argument('--max-episodes', type=int, default=1000000)
+    parser.add_argument('--seeds', type=int, default=3)
+    parser.add_argument('--num-envs', type=int, default=1, help='Train through the vectorised loop with K environments')
+    parser.add_argument('--torch-threads', type=int, default=None)
+    parser.add_argument('--interop-threads', type=int, default=None)
+    args = parser.parse_args()
+    threads = configure_threads(args.torch_threads, args.interop_threads)
+    print(f"Torch threads: intra-op {threads[0]}, inter-op {threads[1]}")
+
+    baseline = evaluate_policy(AlwaysCall(), args.eval_episodes, seed=EVAL_SEED)
+    results = []
+    with tempfile.TemporaryDirectory() as model_dir:
+        for schedule in SCHEDULES:
+            for seed in range(args.seeds):
+                results.append((schedule[0], seed) + run_schedule(
+                    schedule, args.budget_seconds, args.max_episodes, seed, model_dir, args.num_envs,
+                    args.target_reward, args.eval_episodes
+                ))
+
+    print(f"\nAlways-call baseline over {args.eval_episodes} hands: {baseline:.3f}")
+    print(f"{'Schedule':<24}{'Seed':>6}{'Seconds':>10}{'Episodes':>10}{'Reached':>9}{'Reward':>9}{'Margin':>9}")
+    for name, seed, seconds, episodes, reached, reward in results:
+        print(f"{name:<24}{seed:>6}{seconds:>10.1f}{episodes:>10}{'yes' if reached else 'no':>9}"
+              f"{reward:>9.3f}{reward - baseline:>+9.3f}")
@@ -0,0 +1,266 @@
+# card_abstraction.py
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from hand_evaluator import cards_to_indices, evaluate_hands_batch
+
+# Number of board cards on each street
+STREETS = {'preflop': 0, 'flop': 3, 'turn': 4, 'river': 5}
+DEFAULT_BUCKETS = {'preflop': 169, 'flop': 50, 'turn': 50, 'river': 50}
+CARD_BITS = 6  # Bits per card index in a packed key
+
+def _rows(cards, count):
+    """Returns cards as an int64 array of count rows, allowing zero columns."""
+    cards = np.asarray(cards, dtype=np.int64)
+    return cards.reshape(count, -1) if cards.size else np.zeros((count, 0), dtype=np.int64)
+
+def canonical_keys(holes, boards):
+    """
+    Returns one int64 key per (hole cards, board) row, identical for every
+    situation that differs only by a relabelling of the suits.
+    Suits are renamed in order of their (hole ranks, board ranks) signature,
+    the hole and board cards are sorted, and the card indices are packed into
+    6-bit fields, hole cards first.
+    """
+    holes = np.asarray(holes, dtype=np.int64).reshape(-1, 2)
+    boards = _rows(boards, len(holes))
+    signatures = np.zeros((len(holes), 4), dtype=np.int64)
+    for cards, shift in ((holes, 13), (boards, 0)):
+        for column in range(cards.shape[1]):
+            suits = cards[:, column] // 13
+            np.add.at(signatures, (np.arange(len(cards)), suits), 1 << (cards[:, column] % 13 + shift))
+    # Suits with equal signatures hold identical ranks, so their relative order does not matter
+    order = np.argsort(-signatures, axis=1, kind='stable')
+    relabel = np.empty_like(order)
+    np.put_along_axis(relabel, order, np.arange(4)[None, :], axis=1)
+
+    def renamed(cards):
+        if cards.shape[1] == 0:
+            return cards
+        new = np.take_along_axis(relabel, cards // 13, axis=1) * 13 + cards % 13
+        return np.sort(new, axis=1)
+
+    packed = np.hstack([renamed(holes), renamed(boards)])
+    shifts = CARD_BITS * np.arange(packed.shape[1], dtype=np.int64)
+    return (packed << shifts).sum(axis=1)
+
+
+def hole_classes():
+    """Returns one representative hole per suit-isomorphic class (169 rows)."""
+    holes = np.array(list(itertools.combinations(range(52), 2)), dtype=np.int64)
+    _, first = np.unique(canonical_keys(holes, np.zeros((len(holes), 0))), return_index=True)
+    return holes[np.sort(first)]
+
+
+def street_situations(hole, board_size):
+    """
+    Enumerates every board of board_size cards for one hole and keeps one board
+    per canonical situation. Returns (keys, boards).
+    """
+    deck = np.setdiff1d(np.arange(52), hole)
+    combinations = list(itertools.combinations(deck, board_size))
+    boards = _rows(combinations, len(combinations))
+    keys = canonical_keys(np.broadcast_to(hole, (len(boards), 2)), boards)
+    keys, first = np.unique(keys, return_index=True)
+    return keys, boards[first]
+
+
+def strength_histograms(hole, boards, runouts=16, opponents=8, bins=10, rng=None, batch_size=2048):
+    """
+    For each board, samples runouts of the remaining board cards and, per
+    runout, the equity of the hole cards against sampled opponent hands.
+    Returns the normalised histograms of those equities, one row per board.
+    """
+    rng = rng or np.random.default_rng()
+    boards = np.asarray(boards, dtype=np.int64)
+    missing = 5 - boards.shape[1]
+    histograms = np.zeros((len(boards), bins), dtype=np.float32)
+    for start in range(0, len(boards), batch_size):
+        batch = boards[start:start + batch_size]
+        size = len(batch)
+        used = np.zeros((size, 52), dtype=bool)
+        used[:, hole] = True
+        used[np.arange(size)[:, None], batch] = True
+        # One random permutation of the unseen cards per (board, runout)
+        keys = rng.random((size, runouts, 52)) + used[:, None, :]
+        draws = np.argsort(keys, axis=2)[:, :, :missing + 2 * opponents]
+        full_boards = np.concatenate([np.broadcast_to(batch[:, None, :], (size, runouts, batch.shape[1])),
+                                      draws[:, :, :missing]], axis=2)
+        hero = evaluate_hands_batch(np.concatenate(
+            [np.broadcast_to(hole, (size, runouts, 2)), full_boards], axis=2).reshape(-1, 7))
+        opponent_holes = draws[:, :, missing:].reshape(size, runouts, opponents, 2)
+        villain = evaluate_hands_batch(np.concatenate(
+            [opponent_holes, np.broadcast_to(full_boards[:, :, None, :], (size, runouts, opponents, 5))],
+            axis=3).reshape(-1, 7)).reshape(size * runouts, opponents)
+        hero = hero[:, None]
+        equity = ((hero > villain) + 0.5 * (hero == villain)).mean(axis=1).reshape(size, runouts)
+        positions = np.minimum((equity * bins).astype(np.int64), bins - 1)
+        np.add.at(histograms[start:start + size], (np.arange(size)[:, None], positions), 1.0 / runouts)
+    return histograms
+
+
+def _save_npz(path, **arrays):
+    """Writes arrays atomically (temporary file, then rename)."""
+    temporary = path + '.tmp.npz'
+    np.savez(temporary, **arrays)
+    os.replace(temporary, path)
+
+
+def _histogram_chunk(directory, street, class_index, hole, runouts, opponents, bins, seed):
+    """Computes the histograms of every situation of one hole class on one street (runs in a worker)."""
+    path = os.path.join(directory, street, f'{class_index:03d}.npz')
+    rng = np.random.default_rng([seed, STREETS[street], class_index])
+    keys, boards = street_situations(hole, STREETS[street])
+    histograms = strength_histograms(hole, boards, runouts, opponents, bins, rng)
+    _save_npz(path, keys=keys, histograms=histograms)
+    return path
+
+
+def kmeans(data, k, iterations=25, sample_size=200000, rng=None, batch_size=65536):
+    """
+    Lloyd's k-means with k-means++ seeding, fitted on a sample of the rows.
+    Returns the centroids.
+    """
+    rng = rng or np.random.default_rng()
+    if len(data) > sample_size:
+        data = data[rng.choice(len(data), sample_size, replace=False)]
+    k = min(k, len(data))
+    centroids = [data[rng.integers(len(data))]]
+    distances = ((data - centroids[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distances.sum()
+        index = rng.choice(len(data), p=distances / total) if total > 0 else rng.integers(len(data))
+        centroids.append(data[index])
+        distances = np.minimum(distances, ((data - data[index]) ** 2).sum(axis=1))
+    centroids = np.array(centroids)
+    for _ in range(iterations):
+        labels = assign(data, centroids, batch_size)
+        moved = False
+        for cluster in range(k):
+            members = data[labels == cluster]
+            if len(members):
+                centre = members.mean(axis=0)
+                moved |= not np.allclose(centre, centroids[cluster])
+                centroids[cluster] = centre
+        if not moved:
+            break
+    return centroids
+
+
+def assign(data, centroids, batch_size=65536):
+    """Returns the index of the nearest centroid for each row."""
+    labels = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), batch_size):
+        batch = data[start:start + batch_size]
+        distances = (batch ** 2).sum(axis=1)[:, None] - 2 * batch @ centroids.T + (centroids ** 2).sum(axis=1)
+        labels[start:start + batch_size] = distances.argmin(axis=1)
+    return labels
+
+
+def build_buckets(directory='abstraction', streets=tuple(STREETS), buckets=None, runouts=16, opponents=8,
+                  bins=10, classes=None, processes=None, seed=0):
+    """
+    Offline card-abstraction job.
+    1. For each street and hole class, enumerates the canonical situations and
+       their strength histograms, one chunk file per class, on a process pool.
+       Finished chunks are skipped, so an interrupted run resumes where it stopped.
+    2. Clusters the cumulative histograms with k-means; squared distance between
+       CDFs stands in for earth mover's distance, which is their L1 distance.
+    3. Writes <street>_keys.npy (sorted canonical keys) and <street>_buckets.npy
+       for CardAbstraction to memory-map.
+    classes restricts the job to some hole-class indices, e.g. for a quick run.
+    """
+    buckets = dict(DEFAULT_BUCKETS, **(buckets or {}))
+    representatives = hole_classes()
+    class_indices = range(len(representatives)) if classes is None else classes
+    for street in streets:
+        os.makedirs(os.path.join(directory, street), exist_ok=True)
+
+    # Phase 1: histograms
+    jobs = [
+        (street, index) for street in streets for index in class_indices
+        if not os.path.exists(os.path.join(directory, street, f'{index:03d}.npz'))
+    ]
+    if jobs:
+        print(f"Computing histograms for {len(jobs)} chunks")
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as executor:
+            futures = [
+                executor.submit(_histogram_chunk, directory, street, index, representatives[index],
+                                runouts, opponents, bins, seed)
+                for street, index in jobs
+            ]
+            for done, future in enumerate(futures, 1):
+                future.result()
+                if done % 10 == 0 or done == len(futures):
+                    print(f"Chunks done: {done}/{len(futures)}")
+
+    # Phases 2 and 3: clustering and lookup tables
+    for street in streets:
+        keys_path = os.path.join(directory, f'{street}_keys.npy')
+        buckets_path = os.path.join(directory, f'{street}_buckets.npy')
+        if os.path.exists(keys_path) and os.path.exists(buckets_path):
+            continue
+        chunks = [np.load(os.path.join(directory, street, f'{index:03d}.npz')) for index in class_indices]
+        keys = np.concatenate([chunk['keys'] for chunk in chunks])
+        cdfs = np.cumsum(np.concatenate([chunk['histograms'] for chunk in chunks]), axis=1)
+        centroids = kmeans(cdfs, buckets[street], rng=np.random.default_rng([seed, STREETS[street]]))
+        # Number the buckets from weakest to strongest (most mass at low equity first)
+        strength_order = np.argsort(np.argsort(-centroids.sum(axis=1)))
+        labels = strength_order[assign(cdfs, centroids)]
+        order = np.argsort(keys)
+        np.save(buckets_path + '.tmp.npy', labels[order].astype(np.int16))
+        np.save(keys_path + '.tmp.npy', keys[order])
+        os.replace(buckets_path + '.tmp.npy', buckets_path)
+        os.replace(keys_path + '.tmp.npy', keys_path)
+        print(f"{street}: {len(keys)} situations in {len(centroids)} buckets")
+
+
+class CardAbstraction:
+    """
+    Bucket lookup over the tables written by build_buckets.
+    The arrays are memory-mapped, so any number of processes can share them and a
+    lookup is a canonical-key computation plus a binary search.
+    """
+
+    def __init__(self, directory='abstraction'):
+        self.keys = {}
+        self.buckets = {}
+        for street in STREETS:
+            keys_path = os.path.join(directory, f'{street}_keys.npy')
+            if os.path.exists(keys_path):
+                self.keys[street] = np.load(keys_path, mmap_mode='r')
+                self.buckets[street] = np.load(os.path.join(directory, f'{street}_buckets.npy'), mmap_mode='r')
+
+    def lookup(self, holes, boards):
+        """
+        Returns the bucket of each (hole, board) pair given as index arrays of
+        shape (N, 2) and (N, board size), or -1 for situations not in the table.
+        """
+        holes = np.asarray(holes, dtype=np.int64).reshape(-1, 2)
+        boards = _rows(boards, len(holes))
+        street = {size: name for name, size in STREETS.items()}[boards.shape[1]]
+        keys = canonical_keys(holes, boards)
+        table = self.keys[street]
+        positions = np.minimum(np.searchsorted(table, keys), len(table) - 1)
+        found = table[positions] == keys
+        return np.where(found, self.buckets[street][positions], -1)
+
+    def bucket(self, hand, community_cards):
+        """Returns the bucket of a hand given as card dictionaries."""
+        return int(self.lookup([cards_to_indices(hand)], [cards_to_indices(community_cards)])[0])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute card-abstraction buckets.')
+    parser.add_argument('--directory', default='abstraction')
+    parser.add_argument('--streets', nargs='+', default=list(STREETS), choices=list(STREETS))
+    parser.add_argument('--runouts', type=int, default=16)
+    parser.add_argument('--opponents', type=int, default=8)
+    parser.add_argument('--bins', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+    build_buckets(args.directory, args.streets, runouts=args.runouts, opponents=args.opponents,
+                  bins=args.bins, processes=args.processes)
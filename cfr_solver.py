@@ -0,0 +1,364 @@
+# cfr_solver.py
+
+import os
+import time
+from multiprocessing import Pool
+import numpy as np
+from hand_evaluator import evaluate_hands_batch, cards_to_indices
+from hand_range import COMBOS, COMBO_INDEX, NUM_COMBOS
+
+# Abstract actions, matching PokerBot.action_map
+FOLD, CALL, RAISE = 0, 1, 2
+ACTION_NAMES = {FOLD: 'fold', CALL: 'call', RAISE: 'raise'}
+ACTION_CODES = {'fold': 'f', 'call': 'c', 'raise': 'r'}
+NUM_ACTIONS = 3
+
+
+def _sample_deals(rng, num_deals, num_cards):
+    """Draws num_cards distinct card indices for each of num_deals deals."""
+    return rng.random((num_deals, 52)).argsort(axis=1)[:, :num_cards]
+
+
+def _combo_equity_worker(args):
+    """Estimates the equity of a slice of combos against a random hand (runs in a worker process)."""
+    seed, combo_indices, samples_per_combo = args
+    rng = np.random.default_rng(seed)
+    equities = np.zeros(len(combo_indices))
+    for position, combo in enumerate(combo_indices):
+        hand = COMBOS[combo]
+        deck = np.setdiff1d(np.arange(52), hand)
+        draws = deck[rng.random((samples_per_combo, len(deck))).argsort(axis=1)[:, :7]]
+        boards = draws[:, 2:]
+        hero = evaluate_hands_batch(np.hstack([np.broadcast_to(hand, (samples_per_combo, 2)), boards]))
+        villain = evaluate_hands_batch(draws)
+        equities[position] = np.mean((hero > villain) + 0.5 * (hero == villain))
+    return equities
+
+
+def _matchup_worker(args):
+    """
+    Samples full deals and accumulates, per pair of buckets, how often the pair is dealt
+    and how much of the pot the first hand wins (runs in a worker process).
+    """
+    seed, num_deals, combo_buckets, num_buckets, chunk_size = args
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((num_buckets, num_buckets))
+    wins = np.zeros((num_buckets, num_buckets))
+    remaining = num_deals
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        remaining -= size
+        cards = _sample_deals(rng, size, 9)
+        first = combo_buckets[COMBO_INDEX[cards[:, 0], cards[:, 1]]]
+        second = combo_buckets[COMBO_INDEX[cards[:, 2], cards[:, 3]]]
+        first_scores = evaluate_hands_batch(np.hstack([cards[:, :2], cards[:, 4:]]))
+        second_scores = evaluate_hands_batch(cards[:, 2:])
+        result = (first_scores > second_scores) + 0.5 * (first_scores == second_scores)
+        np.add.at(counts, (first, second), 1)
+        np.add.at(wins, (first, second), result)
+    return counts, wins
+
+
+def build_abstraction(num_buckets=10, samples_per_combo=200, num_deals=400000, processes=None, seed=0):
+    """
+    Buckets the 1,326 combos by equity against a random hand and estimates, for
+    every pair of buckets, the probability of being dealt together and the equity
+    of the first against the second. Both sampling passes are spread over a
+    process pool.
+    Returns (combo_buckets, chance, equity).
+    """
+    processes = processes or os.cpu_count() or 1
+    with Pool(processes) as pool:
+        slices = np.array_split(np.arange(NUM_COMBOS), processes)
+        jobs = [(seed + i, combos, samples_per_combo) for i, combos in enumerate(slices)]
+        combo_equity = np.concatenate(pool.map(_combo_equity_worker, jobs))
+
+        # Equal-sized buckets by equity quantile
+        order = np.argsort(combo_equity, kind='stable')
+        combo_buckets = np.empty(NUM_COMBOS, dtype=np.int64)
+        combo_buckets[order] = np.arange(NUM_COMBOS) * num_buckets // NUM_COMBOS
+
+        deals_per_job = -(-num_deals // processes)
+        jobs = [(seed + processes + i, deals_per_job, combo_buckets, num_buckets, 20000)
+                for i in range(processes)]
+        results = pool.map(_matchup_worker, jobs)
+
+    counts = sum(result[0] for result in results)
+    wins = sum(result[1] for result in results)
+    chance = counts / counts.sum()
+    equity = np.divide(wins, counts, out=np.full_like(wins, 0.5), where=counts > 0)
+    return combo_buckets, chance, equity
+
+
+class GameTree:
+    """
+    Heads-up single-street betting tree with the fold/call/raise abstraction.
+    Contributions are in small blinds; the small blind acts first, each raise
+    doubles the bet (as GameLogic.process_player_action does) up to max_raises,
+    and a call closes the betting once both players have acted.
+    """
+
+    def __init__(self, max_raises=3, small_blind=1, big_blind=2):
+        self.max_raises = max_raises
+        self.nodes = []  # Decision nodes, in depth-first order
+        self.history_ids = {}  # Action history string -> decision node id
+        self.root = self._build('', [small_blind, big_blind], 0, 0)
+
+    def _build(self, history, contributions, player, raises):
+        """Recursively builds the tree and returns the root of the subtree."""
+        node = {
+            'history': history,
+            'player': player,
+            'terminal': False,
+            'children': {},
+            'legal': np.zeros(NUM_ACTIONS, dtype=bool),
+        }
+        node['id'] = len(self.nodes)
+        self.nodes.append(node)
+        self.history_ids[history] = node['id']
+        opponent = 1 - player
+        current_bet = max(contributions)
+
+        if contributions[player] < current_bet:
+            node['legal'][FOLD] = True
+            node['children'][FOLD] = {
+                'terminal': True, 'kind': 'fold', 'folder': player, 'contributions': list(contributions)
+            }
+
+        node['legal'][CALL] = True
+        called = list(contributions)
+        called[player] = current_bet
+        if history:
+            node['children'][CALL] = {'terminal': True, 'kind': 'showdown', 'contributions': called}
+        else:
+            # A small blind limp gives the big blind the option
+            node['children'][CALL] = self._build(history + 'c', called, opponent, raises)
+
+        if raises < self.max_raises:
+            node['legal'][RAISE] = True
+            raised = list(contributions)
+            raised[player] = current_bet * 2
+            node['children'][RAISE] = self._build(history + 'r', raised, opponent, raises + 1)
+        return node
+
+
+class CFRSolver:
+    """
+    CFR+ over the bucketed game, vectorised across buckets.
+    Regrets and strategy sums are (nodes, buckets, actions) NumPy arrays; one tree walk
+    updates every bucket of a player at once, carrying reach probabilities as vectors.
+    """
+
+    def __init__(self, combo_buckets, chance, equity, max_raises=3):
+        self.combo_buckets = combo_buckets
+        self.chance = chance  # P(bucket of player 0, bucket of player 1)
+        self.equity = equity  # Share of the pot player 0 wins in each matchup
+        self.num_buckets = len(chance)
+        self.tree = GameTree(max_raises=max_raises)
+        shape = (len(self.tree.nodes), self.num_buckets, NUM_ACTIONS)
+        self.regrets = np.zeros(shape)
+        self.strategy_sum = np.zeros(shape)
+        self.legal = np.stack([node['legal'] for node in self.tree.nodes])[:, None, :]
+        self.iteration = 0
+        # Precomputed payoff matrices for player 0 per unit contribution
+        self._showdown_matrix = chance * (2 * equity - 1)
+
+    def current_strategy(self, node_id):
+        """Regret matching+ over the legal actions of every bucket at a node."""
+        positive = self.regrets[node_id] * self.legal[node_id]
+        totals = positive.sum(axis=1, keepdims=True)
+        uniform = self.legal[node_id] / self.legal[node_id].sum()
+        return np.where(totals > 0, positive / np.maximum(totals, 1e-12), uniform)
+
+    def average_strategy(self):
+        """Returns the normalised average strategy for every node and bucket."""
+        sums = self.strategy_sum * self.legal
+        totals = sums.sum(axis=2, keepdims=True)
+        uniform = self.legal / self.legal.sum(axis=2, keepdims=True)
+        return np.where(totals > 0, sums / np.maximum(totals, 1e-12), uniform)
+
+    def _terminal_values(self, node, reach0, reach1):
+        """Counterfactual values of both players' buckets at a terminal node."""
+        contributions = node['contributions']
+        if node['kind'] == 'fold':
+            # The folder loses what they put in
+            amount = contributions[node['folder']]
+            sign = -1.0 if node['folder'] == 0 else 1.0
+            matrix = self.chance * (sign * amount)
+        else:
+            matrix = self._showdown_matrix * contributions[0]
+        return matrix @ reach1, -(reach0 @ matrix)
+
+    def _walk(self, node, reach0, reach1, updating, weight):
+        """
+        Walks the tree once, returning the counterfactual values of both players.
+        Regrets and strategy sums are only updated for the player being updated.
+        """
+        if node['terminal']:
+            return self._terminal_values(node, reach0, reach1)
+
+        node_id = node['id']
+        player = node['player']
+        strategy = self.current_strategy(node_id)
+        action_values = np.zeros((self.num_buckets, NUM_ACTIONS))
+        values = [np.zeros(self.num_buckets), np.zeros(self.num_buckets)]
+        for action, child in node['children'].items():
+            if player == 0:
+                child_values = self._walk(child, reach0 * strategy[:, action], reach1, updating, weight)
+            else:
+                child_values = self._walk(child, reach0, reach1 * strategy[:, action], updating, weight)
+            action_values[:, action] = child_values[player]
+            values[player] += strategy[:, action] * child_values[player]
+            values[1 - player] += child_values[1 - player]
+
+        if player == updating:
+            reach = reach0 if player == 0 else reach1
+            regrets = self.regrets[node_id] + (action_values - values[player][:, None]) * self.legal[node_id]
+            self.regrets[node_id] = np.maximum(regrets, 0.0)
+            self.strategy_sum[node_id] += weight * reach[:, None] * strategy
+        return values
+
+    def iterate(self):
+        """Runs one CFR+ iteration: an alternating update of each player."""
+        self.iteration += 1
+        ones = np.ones(self.num_buckets)
+        for player in (0, 1):
+            # CFR+ weights the average strategy linearly by iteration
+            self._walk(self.tree.root, ones, ones, player, self.iteration)
+
+    def _best_response(self, node, player, opponent_reach, strategy):
+        """Values of the best response of player against the given strategy, per bucket."""
+        if node['terminal']:
+            if player == 0:
+                return self._terminal_values(node, np.zeros(self.num_buckets), opponent_reach)[0]
+            return self._terminal_values(node, opponent_reach, np.zeros(self.num_buckets))[1]
+        node_id = node['id']
+        if node['player'] == player:
+            best = np.full(self.num_buckets, -np.inf)
+            for action, child in node['children'].items():
+                best = np.maximum(best, self._best_response(child, player, opponent_reach, strategy))
+            return best
+        values = np.zeros(self.num_buckets)
+        for action, child in node['children'].items():
+            values += self._best_response(
+                child, player, opponent_reach * strategy[node_id][:, action], strategy
+            )
+        return values
+
+    def exploitability(self):
+        """
+        Returns how much a best response wins against the average strategy, averaged
+        over both seats, in milli-big-blinds per hand.
+        """
+        strategy = self.average_strategy()
+        ones = np.ones(self.num_buckets)
+        total = sum(self._best_response(self.tree.root, player, ones, strategy).sum() for player in (0, 1))
+        # Values are in small blinds; a big blind is two of them
+        return total / 2 / 2 * 1000
+
+    def solve(self, iterations, report_interval=100, checkpoint_interval=1000, checkpoint_path=None):
+        """
+        Runs CFR+ iterations, printing iterations per second and exploitability at
+        every report interval and checkpointing at every checkpoint interval.
+        Returns the (iteration, exploitability) history.
+        """
+        history = []
+        started = time.perf_counter()
+        last_report = started
+        last_iteration = self.iteration
+        for _ in range(iterations):
+            self.iterate()
+            if self.iteration % report_interval == 0:
+                now = time.perf_counter()
+                speed = (self.iteration - last_iteration) / (now - last_report)
+                exploitability = self.exploitability()
+                history.append((self.iteration, exploitability))
+                print(f"Iteration {self.iteration} - {speed:.0f} it/s - Exploitability: {exploitability:.2f} mbb/hand")
+                last_report = now
+                last_iteration = self.iteration
+            if checkpoint_path and self.iteration % checkpoint_interval == 0:
+                self.save_checkpoint(checkpoint_path)
+        return history
+
+    def save_checkpoint(self, path):
+        """Writes the solver state atomically (temporary file, then rename)."""
+        temporary = path + '.tmp.npz'
+        np.savez(
+            temporary,
+            regrets=self.regrets,
+            strategy_sum=self.strategy_sum,
+            iteration=self.iteration,
+            combo_buckets=self.combo_buckets,
+            chance=self.chance,
+            equity=self.equity,
+            max_raises=self.tree.max_raises,
+        )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        """Restores a solver written by save_checkpoint."""
+        data = np.load(path)
+        solver = cls(data['combo_buckets'], data['chance'], data['equity'], int(data['max_raises']))
+        solver.regrets = data['regrets']
+        solver.strategy_sum = data['strategy_sum']
+        solver.iteration = int(data['iteration'])
+        return solver
+
+    def export_blueprint(self, path):
+        """Writes the average strategy as a compact float16 table for Blueprint."""
+        histories = sorted(self.tree.history_ids, key=self.tree.history_ids.get)
+        np.savez_compressed(
+            path,
+            strategy=self.average_strategy().astype(np.float16),
+            combo_buckets=self.combo_buckets.astype(np.uint8 if self.num_buckets <= 256 else np.int32),
+            histories=np.array(histories),
+        )
+
+
+class Blueprint:
+    """
+    Lookup table of the solved average strategy.
+    A query is two dictionary/array reads: the action history gives the node and
+    the hole cards give the bucket.
+    """
+
+    def __init__(self, strategy, combo_buckets, histories):
+        self.strategy = strategy
+        self.combo_buckets = combo_buckets
+        self.history_ids = {history: node_id for node_id, history in enumerate(histories)}
+
+    @classmethod
+    def load(cls, path):
+        """Loads a table written by CFRSolver.export_blueprint."""
+        data = np.load(path)
+        return cls(data['strategy'], data['combo_buckets'], [str(history) for history in data['histories']])
+
+    def action_probabilities(self, actions, hand):
+        """
+        Returns the fold/call/raise probabilities after the given list of action
+        strings, for hole cards given as card dictionaries.
+        Returns None when the history is outside the abstraction.
+        """
+        node_id = self.history_ids.get(''.join(ACTION_CODES[action] for action in actions))
+        if node_id is None:
+            return None
+        first, second = cards_to_indices(hand)
+        return self.strategy[node_id, self.combo_buckets[COMBO_INDEX[first, second]]].astype(np.float32)
+
+    def sample_action(self, actions, hand, rng=None):
+        """Samples an action string from the blueprint, or returns None outside the abstraction."""
+        probabilities = self.action_probabilities(actions, hand)
+        if probabilities is None:
+            return None
+        rng = rng if rng is not None else np.random.default_rng()
+        return ACTION_NAMES[int(rng.choice(NUM_ACTIONS, p=probabilities / probabilities.sum()))]
+
+
+if __name__ == '__main__':
+    combo_buckets, chance, equity = build_abstraction()
+    solver = CFRSolver(combo_buckets, chance, equity)
+    os.makedirs('models', exist_ok=True)
+    solver.solve(5000, report_interval=500, checkpoint_interval=1000, checkpoint_path='models/cfr_checkpoint.npz')
+    solver.export_blueprint('models/cfr_blueprint.npz')
+    print("Blueprint saved to models/cfr_blueprint.npz")
@@ -0,0 +1,128 @@
+# checkpoint.py
+
+import glob
+import os
+import queue
+import random
+import threading
+import numpy as np
+import torch
+
+CHECKPOINT_PATTERN = 'checkpoint_{:08d}.pt'
+
+def atomic_save(obj, path):
+    """Writes obj with torch.save to a temporary file, then renames it over path."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def rng_state():
+    """Captures the Python, NumPy and torch random generator states."""
+    return {
+        'python': random.getstate(),
+        'numpy': np.random.get_state(),
+        'torch': torch.get_rng_state(),
+    }
+
+
+def set_rng_state(state):
+    """Restores generator states captured by rng_state."""
+    random.setstate(state['python'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+
+
+def list_checkpoints(directory):
+    """Returns the training checkpoints in a directory, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, 'checkpoint_*.pt')))
+
+
+def latest_checkpoint(directory):
+    """Returns the path of the newest training checkpoint, or None."""
+    checkpoints = list_checkpoints(directory)
+    return checkpoints[-1] if checkpoints else None
+
+
+def load_checkpoint(path):
+    """Loads a training checkpoint written by CheckpointWriter."""
+    return torch.load(path, weights_only=False)
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints from a background thread so the training loop never waits
+    on the disk. The caller hands over an already-copied state; the thread pickles
+    it to a temporary file and renames it into place, so a crash mid-write leaves
+    the previous checkpoint intact. Only the newest keep_last training checkpoints
+    are kept. If the disk falls behind, an older pending write to the same path is
+    replaced by the newer one.
+    """
+
+    def __init__(self, directory, keep_last=3):
+        self.directory = directory
+        self.keep_last = keep_last
+        os.makedirs(directory, exist_ok=True)
+        self.pending = {}  # Path -> object still waiting to be written
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.error = None
+        self.writes = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, obj, path):
+        """Queues obj to be written atomically to path."""
+        if self.error is not None:
+            raise RuntimeError("Checkpoint writer failed") from self.error
+        with self.lock:
+            replaced = path in self.pending
+            self.pending[path] = obj
+        if not replaced:
+            self.jobs.put(path)
+
+    def save_training_state(self, state, episode):
+        """Queues a full training checkpoint for the given episode."""
+        self.submit(state, os.path.join(self.directory, CHECKPOINT_PATTERN.format(episode)))
+
+    def _run(self):
+        while True:
+            path = self.jobs.get()
+            if path is None:
+                self.jobs.task_done()
+                return
+            with self.lock:
+                obj = self.pending.pop(path)
+            try:
+                atomic_save(obj, path)
+                self.writes += 1
+                self._prune()
+            except Exception as error:
+                self.error = error
+            finally:
+                self.jobs.task_done()
+
+    def _prune(self):
+        """Deletes all but the newest keep_last training checkpoints."""
+        checkpoints = list_checkpoints(self.directory)
+        for path in checkpoints[:-self.keep_last] if self.keep_last > 0 else []:
+            os.remove(path)
+
+    def wait(self):
+        """Blocks until every queued checkpoint is on disk."""
+        self.jobs.join()
+        if self.error is not None:
+            raise RuntimeError("Checkpoint writer failed") from self.error
+
+    def close(self):
+        """Finishes the queued writes and stops the thread."""
+        self.jobs.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise RuntimeError("Checkpoint writer failed") from self.error
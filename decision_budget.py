@@ -0,0 +1,79 @@
+# decision_budget.py
+
+import time
+from collections import Counter, deque
+import numpy as np
+
+# Decision tiers, from cheapest to most expensive
+TIERS = ['heuristic', 'network', 'equity']
+
+class DecisionBudget:
+    """
+    Wall-clock budget for a single bot decision.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.start = time.perf_counter()
+        self.deadline = self.start + seconds
+
+    def remaining(self):
+        """Returns the number of seconds left before the deadline."""
+        return self.deadline - time.perf_counter()
+
+    def elapsed(self):
+        """Returns the number of seconds spent since the budget started."""
+        return time.perf_counter() - self.start
+
+    def can_afford(self, expected_cost):
+        """Checks whether a step with the given expected cost still fits in the budget."""
+        return self.remaining() > expected_cost
+
+
+class DecisionMetrics:
+    """
+    Collects latency and tier statistics for bot decisions.
+    Several bots can share a single instance to get table-wide figures.
+    """
+
+    def __init__(self, window=10000, cost_smoothing=0.1):
+        self.latencies = deque(maxlen=window)  # Recent decision latencies in seconds
+        self.tier_counts = Counter()  # How many decisions each tier answered
+        self.decisions = 0
+        self.overruns = 0  # Decisions that finished after their deadline
+        self.cost_smoothing = cost_smoothing
+        self.tier_costs = {tier: 0.0 for tier in TIERS}  # Moving average cost of each tier
+
+    def record_tier_cost(self, tier, seconds):
+        """Updates the moving average cost of a tier, used to decide whether it fits next time."""
+        previous = self.tier_costs[tier]
+        if previous == 0.0:
+            self.tier_costs[tier] = seconds
+        else:
+            self.tier_costs[tier] = previous + self.cost_smoothing * (seconds - previous)
+
+    def record_decision(self, tier, elapsed, budget_seconds):
+        """Records which tier answered a decision and how long it took."""
+        self.decisions += 1
+        self.tier_counts[tier] += 1
+        self.latencies.append(elapsed)
+        if elapsed > budget_seconds:
+            self.overruns += 1
+
+    def percentile(self, q):
+        """Returns the q-th percentile of recent decision latencies in seconds."""
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(np.fromiter(self.latencies, dtype=np.float64), q))
+
+    def summary(self):
+        """Returns a dictionary with the collected decision statistics."""
+        return {
+            'decisions': self.decisions,
+            'overruns': self.overruns,
+            'overrun_rate': self.overruns / self.decisions if self.decisions else 0.0,
+            'tiers': dict(self.tier_counts),
+            'p50_ms': self.percentile(50) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': max(self.latencies, default=0.0) * 1000,
+        }
@@ -5,22 +5,71 @@ import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from collections import deque
+from replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, CompactReplayBuffer, CompactPrioritizedReplayBuffer
+
+def configure_threads(intra_op=None, inter_op=None):
+    """
+    Sets how many threads torch uses inside one operation (intra_op) and across
+    independent operations (inter_op), so actors and the learner sharing a machine
+    do not oversubscribe its cores. The inter-op pool can only be sized before torch
+    first uses it; a later call keeps the existing size.
+    """
+    if intra_op is not None:
+        torch.set_num_threads(intra_op)
+    if inter_op is not None:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            pass
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
 
 class DQNAgent:
-    def __init__(self, state_size, action_size, device='cpu', learning_rate=0.001, gamma=0.99, epsilon_decay=0.995):
+    def __init__(self, state_size, action_size, device='cpu', learning_rate=0.001, gamma=0.99, epsilon_decay=0.995,
+                 target_update_interval=100, tau=None, memory_size=20000, prioritized=False,
+                 priority_alpha=0.6, priority_beta_start=0.4, priority_beta_steps=100000, memory=None,
+                 hidden_size=128, compact_memory=False, extra_features=None):
         self.state_size = state_size  # Size of the state vector
         self.action_size = action_size  # Number of possible actions
+        self.hidden_size = hidden_size  # Width of the hidden layers
         self.device = torch.device(device)
-        self.memory = deque(maxlen=20000)  # Experience replay buffer
+        self.prioritized = prioritized  # Sample transitions by TD error instead of uniformly
+        if memory is not None:
+            # Any buffer with the ReplayBuffer interface, e.g. a shared MemmapReplayBuffer
+            self.memory = memory
+        elif prioritized:
+            # Bit-packed storage holds the same transitions in a fraction of the memory
+            storage = {}
+            if compact_memory:
+                buffer_class = CompactPrioritizedReplayBuffer
+                storage['extra_features'] = extra_features
+            else:
+                buffer_class = PrioritizedReplayBuffer
+            self.memory = buffer_class(
+                memory_size, state_size, alpha=priority_alpha,
+                beta_start=priority_beta_start, beta_steps=priority_beta_steps, **storage
+            )
+        elif compact_memory:
+            # Opponent features are detected from the stored states unless extra_features is given
+            self.memory = CompactReplayBuffer(memory_size, state_size, extra_features)
+        else:
+            self.memory = ReplayBuffer(memory_size, state_size)  # Experience replay buffer
         self.gamma = gamma  # Discount factor
         self.epsilon = 1.0  # Exploration rate (initially set to explore)
         self.epsilon_min = 0.01  # Minimum exploration rate
         self.epsilon_decay = epsilon_decay  # Decay rate for epsilon
         self.learning_rate = learning_rate  # Learning rate for the optimizer
         self.model = self._build_model().to(self.device)  # Neural network model
+        # Target network used for the bootstrapped Q-value targets
+        self.target_model = self._build_model().to(self.device)
+        self.target_model.load_state_dict(self.model.state_dict())
+        self.target_model.eval()
+        self.target_update_interval = target_update_interval  # Gradient steps between hard syncs
+        self.tau = tau  # Polyak averaging factor; when set, the target is updated softly every step
+        self.train_steps = 0  # Number of gradient steps taken
         self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
         self.criterion = nn.MSELoss()  # Loss function
+        self.metrics = None  # Optional TrainingMetrics fed by replay()
 
     def _build_model(self):
         """
@@ -28,11 +77,11 @@ class DQNAgent:
         The architecture consists of input, hidden, and output layers.
         """
         model = nn.Sequential(
-            nn.Linear(self.state_size, 128),
+            nn.Linear(self.state_size, self.hidden_size),
             nn.ReLU(),
-            nn.Linear(128, 128),
+            nn.Linear(self.hidden_size, self.hidden_size),
             nn.ReLU(),
-            nn.Linear(128, self.action_size)
+            nn.Linear(self.hidden_size, self.action_size)
         )
         return model
 
@@ -40,7 +89,13 @@ class DQNAgent:
         """
         Stores the experience in the replay buffer.
         """
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(state, action, reward, next_state, done)
+
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Stores a batch of experiences, e.g. one step of a vector environment.
+        """
+        self.memory.add_batch(states, actions, rewards, next_states, dones)
 
     def act(self, state):
         """
@@ -57,59 +112,135 @@ class DQNAgent:
             act_values = self.model(state)
         return torch.argmax(act_values).item()
 
-    def replay(self, batch_size):
+    def act_batch(self, states):
+        """
+        Decides actions for a batch of states with one forward pass.
+        Each row independently explores with probability epsilon.
+        """
+        states = torch.as_tensor(states, dtype=torch.float, device=self.device)
+        self.model.eval()
+        with torch.no_grad():
+            actions = torch.argmax(self.model(states), dim=1).cpu().numpy()
+        explore = np.random.rand(len(actions)) <= self.epsilon
+        actions[explore] = np.random.randint(self.action_size, size=int(explore.sum()))
+        return actions
+
+    def replay(self, batch_size, decay_epsilon=True):
         """
         Trains the neural network using experiences sampled from the replay buffer.
+        Pass decay_epsilon=False when exploration is decayed per env step instead.
         """
         if len(self.memory) < batch_size:
             return  # Not enough samples to train
 
-        minibatch = random.sample(self.memory, batch_size)
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start('sample')
+        if self.prioritized:
+            states, actions, rewards, next_states, dones, weights, indices = self.memory.sample(
+                batch_size, self.device
+            )
+        else:
+            states, actions, rewards, next_states, dones = self.memory.sample(batch_size, self.device)
+        if metrics is not None:
+            metrics.stop()
+            metrics.start('backprop')
+
+        # Bootstrapped targets from the target network, one batched forward pass
+        with torch.no_grad():
+            next_q_values = self.target_model(next_states).max(dim=1).values
+            targets = rewards + self.gamma * next_q_values * (1 - dones)
+
+        # Q-values of the actions actually taken, one batched forward pass
         self.model.train()
-        states = []
-        targets = []
-        for state, action, reward, next_state, done in minibatch:
-            state_tensor = torch.tensor(state, dtype=torch.float).to(self.device)
-            next_state_tensor = torch.tensor(next_state, dtype=torch.float).to(self.device)
-
-            # Compute the target Q-value
-            target = reward
-            if not done:
-                with torch.no_grad():
-                    target = reward + self.gamma * torch.max(self.model(next_state_tensor)).item()
-
-            # Get the current Q-values
-            target_f = self.model(state_tensor)
-            target_val = target_f.clone().detach()
-            target_val[action] = target  # Update the Q-value for the action taken
-
-            # Store for batch training
-            states.append(state_tensor)
-            targets.append(target_val)
-
-        # Convert lists to tensors
-        states_tensor = torch.stack(states)
-        targets_tensor = torch.stack(targets)
-
-        # Perform a single optimization step
+        q_values = self.model(states).gather(1, actions.unsqueeze(1)).squeeze(1)
+        if self.prioritized:
+            # Importance-sampling weights correct for the non-uniform sampling
+            td_errors = q_values - targets
+            loss = (weights * td_errors.pow(2)).mean()
+            self.memory.update_priorities(indices, td_errors.detach().cpu().numpy())
+        else:
+            loss = self.criterion(q_values, targets)
+
         self.optimizer.zero_grad()
-        outputs = self.model(states_tensor)
-        loss = self.criterion(outputs, targets_tensor)
         loss.backward()
         self.optimizer.step()
+        self.train_steps += 1
+        self.update_target_model()
+        if metrics is not None:
+            metrics.stop()
+            with torch.no_grad():
+                q_detached = q_values.detach()
+                q_mean, q_max, q_min = torch.stack([q_detached.mean(), q_detached.max(), q_detached.min()]).tolist()
+            metrics.record_update(loss.item(), q_mean, q_max, q_min)
+            metrics.record_buffer(len(self.memory), self.memory.capacity)
+
+        if decay_epsilon:
+            self.decay_epsilon()
 
-        # Decay the exploration rate
+    def decay_epsilon(self):
+        """
+        Decays the exploration rate by one step.
+        """
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
+    def update_target_model(self):
+        """
+        Moves the target network towards the online network: a Polyak average every
+        step when tau is set, otherwise a hard copy every target_update_interval steps.
+        """
+        if self.tau is not None:
+            with torch.no_grad():
+                for target_param, param in zip(self.target_model.parameters(), self.model.parameters()):
+                    target_param.mul_(1 - self.tau).add_(param, alpha=self.tau)
+        elif self.train_steps % self.target_update_interval == 0:
+            self.target_model.load_state_dict(self.model.state_dict())
+
     def load(self, name):
         """
         Loads a saved model.
         """
         self.model.load_state_dict(torch.load(name))
+        self.target_model.load_state_dict(self.model.state_dict())
 
     def save(self, name):
         """
         Saves the current model.
         """
         torch.save(self.model.state_dict(), name)
+
+    def model_state(self, model=None):
+        """Returns a detached CPU copy of the model weights, safe to write from another thread."""
+        model = self.model if model is None else model
+        return {key: value.detach().cpu().clone() for key, value in model.state_dict().items()}
+
+    def training_state(self):
+        """
+        Returns a detached copy of everything needed to resume training: both
+        networks, the optimizer, exploration rate, step counter and replay buffer.
+        """
+        optimizer_state = self.optimizer.state_dict()
+        return {
+            'model': self.model_state(),
+            'target_model': self.model_state(self.target_model),
+            'optimizer': {
+                'state': {
+                    key: {name: value.clone() if torch.is_tensor(value) else value for name, value in slot.items()}
+                    for key, slot in optimizer_state['state'].items()
+                },
+                'param_groups': [dict(group) for group in optimizer_state['param_groups']],
+            },
+            'epsilon': self.epsilon,
+            'train_steps': self.train_steps,
+            'memory': self.memory.state_dict(),
+        }
+
+    def load_training_state(self, state):
+        """Restores a copy made by training_state."""
+        self.model.load_state_dict(state['model'])
+        self.target_model.load_state_dict(state['target_model'])
+        self.optimizer.load_state_dict(state['optimizer'])
+        self.epsilon = state['epsilon']
+        self.train_steps = state['train_steps']
+        self.memory.load_state_dict(state['memory'])
@@ -0,0 +1,99 @@
+# equity.py
+
+import random
+import time
+from hand_evaluator import evaluate_hand, CARD_VALUE_RANKS
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+VALUES = [
+    '2', '3', '4', '5', '6', '7', '8', '9', '10',
+    'Jack', 'Queen', 'King', 'Ace'
+]
+
+def full_deck():
+    """Returns a fresh, ordered 52-card deck in the same layout as GameLogic.create_deck."""
+    return [{'value': value, 'suit': suit} for suit in SUITS for value in VALUES]
+
+def remaining_deck(known_cards):
+    """Returns the cards of a full deck that are not among the known cards."""
+    known = {(card['value'], card['suit']) for card in known_cards}
+    return [card for card in full_deck() if (card['value'], card['suit']) not in known]
+
+def preflop_strength(hand):
+    """
+    Scores two hole cards with the Chen formula and scales the result to [0, 1].
+    Cheap enough to run inside any decision budget.
+    """
+    if len(hand) != 2:
+        return 0.0
+    high, low = sorted((CARD_VALUE_RANKS[card['value']] for card in hand), reverse=True)
+    # Base score from the highest card
+    base_scores = {14: 10, 13: 8, 12: 7, 11: 6}
+    score = base_scores.get(high, high / 2)
+    if high == low:
+        # Pairs double the score, with a minimum of 5
+        score = max(score * 2, 5)
+    else:
+        gap = high - low - 1
+        score -= [0, 1, 2, 4][gap] if gap < 4 else 5
+        if gap <= 1 and high < 12:
+            score += 1  # Connected cards below a queen can make more straights
+    if hand[0]['suit'] == hand[1]['suit']:
+        score += 2
+    # The Chen score ranges from -1 (72o) to 20 (AA)
+    return min(max((score + 1) / 21, 0.0), 1.0)
+
+def estimate_equity(hand, community_cards, num_opponents=1, max_samples=1000, deadline=None):
+    """
+    Estimates the share of the pot won by the hand against random opponent holdings
+    by sampling runouts.
+    Stops after max_samples or once time.perf_counter() passes the deadline.
+    Returns a tuple (equity, samples_taken).
+    """
+    deck = remaining_deck(hand + community_cards)
+    cards_needed = 5 - len(community_cards)
+    draw_size = cards_needed + 2 * num_opponents
+    wins = 0.0
+    samples = 0
+    while samples < max_samples:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        drawn = random.sample(deck, draw_size)
+        board = community_cards + drawn[:cards_needed]
+        own_score = evaluate_hand(hand + board)
+        best_opponent = max(
+            evaluate_hand(drawn[cards_needed + 2 * i:cards_needed + 2 * i + 2] + board)
+            for i in range(num_opponents)
+        )
+        if own_score > best_opponent:
+            wins += 1
+        elif own_score == best_opponent:
+            wins += 0.5
+        samples += 1
+    if samples == 0:
+        return None, 0
+    return wins / samples, samples
+
+# Rough share of the pot a made hand of each rank tends to win, used when there is no time to sample
+MADE_HAND_STRENGTH = {
+    1: 0.15,  # High Card
+    2: 0.45,  # One Pair
+    3: 0.65,  # Two Pair
+    4: 0.75,  # Three of a Kind
+    5: 0.85,  # Straight
+    6: 0.88,  # Flush
+    7: 0.93,  # Full House
+    8: 0.97,  # Four of a Kind
+    9: 0.99,  # Straight Flush
+    10: 1.0,  # Royal Flush
+}
+
+def heuristic_strength(hand, community_cards):
+    """
+    Returns a cheap estimate in [0, 1] of how strong the hand is.
+    Uses the Chen formula before the flop and the made-hand rank afterwards.
+    """
+    if not community_cards:
+        return preflop_strength(hand)
+    hand_rank, _ = evaluate_hand(hand + community_cards)
+    return MADE_HAND_STRENGTH.get(hand_rank, 0.0)
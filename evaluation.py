@@ -0,0 +1,228 @@
+# evaluation.py
+
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from statistics import NormalDist
+import numpy as np
+from dqn_agent import configure_threads
+from game_logic import GameLogic
+from hand_evaluator import cards_to_indices, evaluate_hands_batch
+from poker_bot import PokerBot
+from profiling import add_profile_arguments, start_from_args
+
+class GreedyBot(PokerBot):
+    """
+    PokerBot that always plays the network's greedy action, so the same cards
+    always produce the same decisions.
+    """
+
+    def decide_action(self, game_logic, budget=None):
+        return self.network_action(game_logic)
+
+
+class DuplicateGame(GameLogic):
+    """
+    Heads-up GameLogic used for duplicate matches.
+    Once a hand is decided (everyone else folded, or everyone else is all-in and
+    the street has moved on) the remaining player only checks, so no chips move
+    after the outcome is fixed. The board at the first all-in, and the stacks and
+    live players just before the showdown, are recorded for the equity adjustment.
+    """
+
+    def __init__(self, initial_chips=1000):
+        super().__init__(initial_chips=initial_chips)
+        self.verbose = False
+        self.allin_board = None
+
+    def shuffle_and_deal(self):
+        self.allin_board = None
+        super().shuffle_and_deal()
+
+    def get_player_action(self, player):
+        others = [other for other in self.players if other is not player and other.is_active]
+        if not others:
+            return 'check'
+        if (all(other.is_all_in for other in others) and self.allin_board is not None
+                and len(self.community_cards) > len(self.allin_board)):
+            return 'check'
+        return super().get_player_action(player)
+
+    def process_player_action(self, player, action):
+        super().process_player_action(player, action)
+        if player.is_all_in and self.allin_board is None:
+            self.allin_board = self.community_cards[:]
+
+    def showdown(self):
+        self.chips_before_showdown = [player.chips for player in self.players]
+        self.active_before_showdown = [player.is_active for player in self.players]
+        super().showdown()
+
+
+def allin_equity(first_hand, second_hand, board, samples=1000, rng=None):
+    """
+    Share of the pot the first hand wins against the second over the remaining
+    board cards (ties count half). Runouts are enumerated when at most two cards
+    are missing and sampled otherwise.
+    """
+    rng = rng or np.random.default_rng()
+    first = cards_to_indices(first_hand)
+    second = cards_to_indices(second_hand)
+    known = cards_to_indices(board)
+    remaining = np.setdiff1d(np.arange(52), first + second + known)
+    missing = 5 - len(known)
+    if missing == 0:
+        runouts = np.zeros((1, 0), dtype=np.int64)
+    elif missing <= 2:
+        runouts = np.array(list(itertools.combinations(remaining, missing)), dtype=np.int64)
+    else:
+        keys = rng.random((samples, len(remaining)))
+        runouts = remaining[np.argsort(keys, axis=1)[:, :missing]]
+    boards = np.hstack([np.tile(known, (len(runouts), 1)).astype(np.int64), runouts])
+    first_scores = evaluate_hands_batch(np.hstack([np.tile(first, (len(boards), 1)), boards]))
+    second_scores = evaluate_hands_batch(np.hstack([np.tile(second, (len(boards), 1)), boards]))
+    return float(np.mean((first_scores > second_scores) + 0.5 * (first_scores == second_scores)))
+
+
+def play_hand(game, seats, deck_seed, equity_adjust=False, rng=None):
+    """
+    Plays one hand with the given seat order on a deck fixed by deck_seed.
+    Returns each seat's chip result, adjusted to its all-in equity if requested.
+    """
+    game.players = list(seats)
+    for player in seats:
+        player.chips = game.initial_chips
+    game.dealer_position = len(seats) - 1  # prepare_round moves the button to seat 0
+    state = random.getstate()
+    random.seed(deck_seed)
+    game.shuffle_and_deal()
+    random.setstate(state)
+    game.prepare_round()
+    game.execute_betting_round()
+    results = [player.chips - game.initial_chips for player in seats]
+
+    if equity_adjust and game.allin_board is not None and len(game.allin_board) < 5:
+        contributions = [game.initial_chips - chips for chips in game.chips_before_showdown]
+        active = [i for i, player in enumerate(seats) if game.active_before_showdown[i]]
+        if len(active) == 2:
+            pot = sum(contributions)
+            first, second = active
+            equity = allin_equity(seats[first].hand, seats[second].hand, game.allin_board, rng=rng)
+            results = [-contribution for contribution in contributions]
+            results[first] += equity * pot
+            results[second] += (1 - equity) * pot
+    return results
+
+
+_worker_bots = None
+
+def _init_worker(first_path, second_path, state_size, initial_chips):
+    """Loads both checkpoints once per worker process."""
+    global _worker_bots
+    configure_threads(1, 1)
+    bots = []
+    for name, path in (('First', first_path), ('Second', second_path)):
+        bot = GreedyBot(name, chips=initial_chips, state_size=state_size)
+        bot.load_agent(path)
+        bot.agent.epsilon = 0.0
+        bots.append(bot)
+    _worker_bots = (bots, initial_chips)
+
+
+def _play_pairs(deck_seeds, equity_adjust):
+    """Plays each deck twice with the seats swapped; returns the first bot's result per pair in big blinds."""
+    bots, initial_chips = _worker_bots
+    game = DuplicateGame(initial_chips=initial_chips)
+    first, second = bots
+    rng = np.random.default_rng(deck_seeds[0])
+    results = []
+    for deck_seed in deck_seeds:
+        straight = play_hand(game, (first, second), deck_seed, equity_adjust, rng)[0]
+        swapped = play_hand(game, (second, first), deck_seed, equity_adjust, rng)[1]
+        results.append((straight + swapped) / 2 / game.big_blind)
+    return results
+
+
+def evaluate_duplicate(first_path, second_path, state_size=112, initial_chips=1000, max_pairs=20000,
+                       min_pairs=200, batch_pairs=100, target_half_width=5.0, confidence=0.95,
+                       equity_adjust=True, processes=None, seed=0):
+    """
+    Compares two checkpoints with duplicate matches spread over a process pool.
+    Every deck is played twice with the seats swapped and the two results are
+    averaged, which cancels most of the card luck. Batches are scored as they
+    finish and evaluation stops once the confidence interval of the first bot's
+    win rate is within target_half_width bb/100, or after max_pairs decks.
+    Returns a dictionary with the win rate and its interval in bb/100.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    results = []
+    next_seed = seed
+    stopped_early = False
+
+    workers = processes or os.cpu_count() or 1
+    pending = set()
+
+    def fill(executor):
+        # Keep two batches per worker queued so no worker waits on the parent
+        nonlocal next_seed
+        while len(pending) < workers * 2 and next_seed - seed < max_pairs:
+            count = min(batch_pairs, max_pairs - (next_seed - seed))
+            pending.add(executor.submit(_play_pairs, list(range(next_seed, next_seed + count)), equity_adjust))
+            next_seed += count
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(first_path, second_path, state_size, initial_chips)) as executor:
+        fill(executor)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending -= done
+            for future in done:
+                results.extend(future.result())
+            mean, half_width = _interval(results, z)
+            if len(results) >= min_pairs and half_width <= target_half_width:
+                stopped_early = True
+                break
+            fill(executor)
+        for future in pending:
+            future.cancel()
+
+    mean, half_width = _interval(results, z)
+    return {
+        'pairs': len(results),
+        'hands': 2 * len(results),
+        'bb_per_100': mean,
+        'ci_low': mean - half_width,
+        'ci_high': mean + half_width,
+        'confidence': confidence,
+        'stopped_early': stopped_early,
+    }
+
+
+def _interval(results, z):
+    """Mean and confidence half-width of per-pair results, both in bb/100."""
+    values = np.asarray(results, dtype=np.float64) * 100
+    if len(values) < 2:
+        return (float(values.mean()) if len(values) else 0.0), float('inf')
+    return float(values.mean()), float(z * values.std(ddof=1) / np.sqrt(len(values)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Duplicate evaluation of two poker checkpoints.')
+    parser.add_argument('first', help='Checkpoint whose win rate is reported')
+    parser.add_argument('second', help='Reference checkpoint')
+    parser.add_argument('--max-pairs', type=int, default=20000)
+    parser.add_argument('--half-width', type=float, default=5.0, help='Stop once the interval is this tight (bb/100)')
+    parser.add_argument('--no-equity-adjust', action='store_true')
+    parser.add_argument('--processes', type=int, default=None)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args, 'evaluation')
+
+    report = evaluate_duplicate(
+        args.first, args.second, max_pairs=args.max_pairs, target_half_width=args.half_width,
+        equity_adjust=not args.no_equity_adjust, processes=args.processes
+    )
+    print(f"{report['bb_per_100']:.1f} bb/100 over {report['hands']} hands "
+          f"({report['confidence'] * 100:.0f}% CI {report['ci_low']:.1f} to {report['ci_high']:.1f})")
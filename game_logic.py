@@ -18,10 +18,44 @@ class GameLogic:
         self.dealer_position = 0  # Index of the dealer
         self.active_players = []
         self.initial_chips = initial_chips
+        self.decision_budget = None  # Seconds per bot decision; None uses each bot's own budget
+        self.opponent_tracker = None  # Optional OpponentTracker fed with every action
+        self.range_tracker = None  # Optional RangeTracker keeping each player's hole-card range
+        self.verbose = True  # Print the play-by-play; simulations turn this off
 
     def add_player(self, player):
         self.players.append(player)
 
+    def log(self, message):
+        """Prints a play-by-play message unless the game is running silently."""
+        if self.verbose:
+            print(message)
+
+    def snapshot(self):
+        """
+        Captures the mutable state of the hand as plain tuples and list copies.
+        Cards are never mutated, so lists of them are copied shallowly; this is far
+        cheaper than copy.deepcopy of the whole game.
+        """
+        players = tuple(
+            (player.chips, player.hand[:], player.is_active, player.is_all_in,
+             player.current_bet, player.hand_rank, player.high_cards)
+            for player in self.players
+        )
+        return (self.pot, self.current_bet, self.game_phase, self.dealer_position,
+                self.community_cards[:], self.deck[:], players)
+
+    def restore(self, snapshot):
+        """Restores the state captured by snapshot()."""
+        (self.pot, self.current_bet, self.game_phase, self.dealer_position,
+         community_cards, deck, players) = snapshot
+        self.community_cards = community_cards[:]
+        self.deck = deck[:]
+        for player, state in zip(self.players, players):
+            (player.chips, hand, player.is_active, player.is_all_in,
+             player.current_bet, player.hand_rank, player.high_cards) = state
+            player.hand = hand[:]
+
     def start_game(self):
         """Starts a new game of poker."""
         self.shuffle_and_deal()
@@ -45,6 +79,11 @@ class GameLogic:
                 card = self.deck.pop()
                 player.hand.append(card)
 
+        if self.opponent_tracker:
+            self.opponent_tracker.start_hand(self.players)
+        if self.range_tracker:
+            self.range_tracker.start_hand(self.players)
+
     def create_deck(self):
         """Creates a standard 52-card deck."""
         suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
@@ -57,6 +96,11 @@ class GameLogic:
 
     def initialize_round(self):
         """Initializes variables for a new betting round."""
+        self.prepare_round()
+        self.execute_betting_round()
+
+    def prepare_round(self):
+        """Resets the table for a new hand and posts the blinds, without playing it."""
         self.pot = 0
         self.community_cards = []
         self.current_bet = 0
@@ -64,7 +108,6 @@ class GameLogic:
         self.active_players = [player for player in self.players if player.chips > 0]
         self.dealer_position = (self.dealer_position + 1) % len(self.players)
         self.post_blinds()
-        self.execute_betting_round()
 
     def post_blinds(self):
         """Posts small and big blinds."""
@@ -87,7 +130,7 @@ class GameLogic:
 
     def execute_betting_round(self):
         """Executes a betting round."""
-        print(f"Starting betting round: {self.game_phase}")
+        self.log(f"Starting betting round: {self.game_phase}")
         betting_complete = False
         players_in_round = [player for player in self.players if player.is_active]
 
@@ -126,8 +169,8 @@ class GameLogic:
     def get_player_action(self, player):
         """Gets the action from the player."""
         if isinstance(player, PokerBot):
-            action = player.decide_action(self)
-            print(f"{player.name} decides to {action}.")
+            action = player.decide_action(self, budget=self.decision_budget)
+            self.log(f"{player.name} decides to {action}.")
         else:
             # For the human player, you can implement input or UI interaction
             action = self.get_human_player_action(player)
@@ -142,21 +185,29 @@ class GameLogic:
 
     def process_player_action(self, player, action):
         """Processes the action taken by a player."""
+        if self.opponent_tracker:
+            self.opponent_tracker.record_action(
+                player, action, self.game_phase, self.is_facing_raise(player)
+            )
+        if self.range_tracker:
+            self.range_tracker.record_action(
+                player, action, self.community_cards, self.is_facing_raise(player)
+            )
         if action == 'fold':
             player.is_active = False
-            print(f"{player.name} folds.")
+            self.log(f"{player.name} folds.")
         elif action == 'call':
             call_amount = self.current_bet - player.current_bet
             bet_amount = min(call_amount, player.chips)
             player.chips -= bet_amount
             player.current_bet += bet_amount
             self.pot += bet_amount
-            print(f"{player.name} calls with {bet_amount} chips.")
+            self.log(f"{player.name} calls with {bet_amount} chips.")
             if player.chips == 0:
                 player.is_all_in = True
-                print(f"{player.name} is all-in!")
+                self.log(f"{player.name} is all-in!")
         elif action == 'check':
-            print(f"{player.name} checks.")
+            self.log(f"{player.name} checks.")
         elif action == 'raise':
             min_raise = self.current_bet * 2
             raise_amount = min(player.chips, min_raise)
@@ -166,10 +217,15 @@ class GameLogic:
             player.current_bet += bet_amount
             self.current_bet = total_bet
             self.pot += bet_amount
-            print(f"{player.name} raises to {total_bet} chips.")
+            self.log(f"{player.name} raises to {total_bet} chips.")
             if player.chips == 0:
                 player.is_all_in = True
-                print(f"{player.name} is all-in!")
+                self.log(f"{player.name} is all-in!")
+
+    def is_facing_raise(self, player):
+        """Checks if the player faces a bet above the big blind (pre-flop) or any bet (later)."""
+        opening_bet = self.big_blind if self.game_phase == 'pre-flop' else 0
+        return self.current_bet > max(player.current_bet, opening_bet)
 
     def all_bets_equal(self, players):
         """Checks if all active players have equal bets."""
@@ -178,10 +234,13 @@ class GameLogic:
 
     def deal_community_cards(self, number):
         """Deals community cards to the table."""
+        dealt_before = len(self.community_cards)
         for _ in range(number):
             card = self.deck.pop()
             self.community_cards.append(card)
-        print(f"Community cards: {self.format_cards(self.community_cards)}")
+        if self.opponent_tracker and dealt_before < 3 <= len(self.community_cards):
+            self.opponent_tracker.record_flop([player for player in self.players if player.is_active])
+        self.log(f"Community cards: {self.format_cards(self.community_cards)}")
 
     def format_cards(self, cards):
         """Formats the cards for display."""
@@ -189,19 +248,22 @@ class GameLogic:
 
     def showdown(self):
         """Handles the showdown and determines the winner."""
-        print("Showdown:")
+        self.log("Showdown:")
         active_players = [player for player in self.players if player.is_active]
         best_rank = -1
         best_high_cards = []
         winners = []
 
+        if self.opponent_tracker and len(active_players) > 1:
+            self.opponent_tracker.record_showdown(active_players)
+
         for player in active_players:
             full_hand = player.hand + self.community_cards
             hand_rank, high_cards = evaluate_hand(full_hand)
             player.hand_rank = hand_rank
             player.high_cards = high_cards
             hand_name = self.get_hand_name(hand_rank)
-            print(f"{player.name} has {hand_name} with high cards {high_cards}.")
+            self.log(f"{player.name} has {hand_name} with high cards {high_cards}.")
 
             if hand_rank > best_rank:
                 best_rank = hand_rank
@@ -217,13 +279,13 @@ class GameLogic:
         if len(winners) == 1:
             winner = winners[0]
             winner.chips += self.pot
-            print(f"{winner.name} wins the pot of {self.pot} chips with a {self.get_hand_name(winner.hand_rank)}!")
+            self.log(f"{winner.name} wins the pot of {self.pot} chips with a {self.get_hand_name(winner.hand_rank)}!")
         else:
             # Split the pot among tied players
             pot_share = self.pot // len(winners)
             for winner in winners:
                 winner.chips += pot_share
-            print("The pot is split among the winners!")
+            self.log("The pot is split among the winners!")
         self.pot = 0
 
         # Reset player statuses for the next game
@@ -2,6 +2,7 @@
 
 from collections import Counter
 from itertools import combinations
+import numpy as np
 
 # Define hand ranks
 HAND_RANKS = {
@@ -150,3 +151,124 @@ def compare_hands(hand1, hand2):
             elif hc1 < hc2:
                 return -1
         return 0  # Tie
+
+# Vectorized evaluation over card indices
+#
+# Cards are indexed as suit_index * 13 + value_index; PokerBot.get_card_index delegates to card_to_index.
+# Batch scores are single integers, category * 16^5 followed by five base-16 tie-break digits,
+# so comparing scores orders hands the same way as comparing evaluate_hand results.
+
+SUIT_INDEX = {'Hearts': 0, 'Diamonds': 1, 'Clubs': 2, 'Spades': 3}
+SCORE_BASE = 16
+_CATEGORY_FACTOR = SCORE_BASE ** 5
+
+def card_to_index(card):
+    """Returns the 0-51 index of a card dictionary."""
+    return SUIT_INDEX[card['suit']] * 13 + CARD_VALUE_RANKS[card['value']] - 2
+
+def index_to_card(index):
+    """Returns the card dictionary of a 0-51 index."""
+    suit = [name for name, position in SUIT_INDEX.items() if position == index // 13][0]
+    value = [name for name, rank in CARD_VALUE_RANKS.items() if rank == index % 13 + 2][0]
+    return {'value': value, 'suit': suit}
+
+def cards_to_indices(cards):
+    """Returns a list with the 0-51 index of each card dictionary."""
+    return [card_to_index(card) for card in cards]
+
+def _build_rank_tables():
+    """
+    Precomputes lookups over every 13-bit rank mask:
+    the top five ranks as base-16 digits and the high card of the best straight.
+    Ranks are stored as value_index + 1 so that 0 means 'none'.
+    """
+    masks = np.arange(1 << 13)
+    bits = (masks[:, None] >> np.arange(13)) & 1
+    top_five = np.zeros(len(masks), dtype=np.int64)
+    taken = np.zeros(len(masks), dtype=np.int64)
+    for rank in range(12, -1, -1):
+        take = (bits[:, rank] == 1) & (taken < 5)
+        top_five[take] += (rank + 1) * SCORE_BASE ** (4 - taken[take])
+        taken[take] += 1
+
+    straight_high = np.zeros(len(masks), dtype=np.int64)
+    for high in range(12, 3, -1):
+        pattern = sum(1 << rank for rank in range(high - 4, high + 1))
+        found = ((masks & pattern) == pattern) & (straight_high == 0)
+        straight_high[found] = high + 1
+    wheel = (1 << 12) | 0b1111  # Ace-low straight, five high
+    found = ((masks & wheel) == wheel) & (straight_high == 0)
+    straight_high[found] = 4
+    return top_five, straight_high
+
+_TOP_FIVE, _STRAIGHT_HIGH = _build_rank_tables()
+_HIGHEST = _TOP_FIVE // SCORE_BASE ** 4
+_RANK_BITS = 1 << np.arange(13)
+
+def _rank_bit(rank):
+    """Returns the mask bit of a stored rank (value_index + 1), or 0 for 'none'."""
+    return np.where(rank > 0, 1 << np.maximum(rank - 1, 0), 0)
+
+def evaluate_hands_batch(card_indices):
+    """
+    Evaluates many hands at once.
+    Takes an integer array of shape (N, K) with 5 <= K <= 7 card indices per hand and
+    returns N integer scores; a higher score is a better hand.
+    """
+    cards = np.asarray(card_indices, dtype=np.int64)
+    ranks = cards % 13
+    suits = cards // 13
+
+    rank_counts = (ranks[:, :, None] == np.arange(13)).sum(axis=1)
+    suit_counts = (suits[:, :, None] == np.arange(4)).sum(axis=1)
+    rank_mask = ((rank_counts > 0) * _RANK_BITS).sum(axis=1)
+    pair_mask = ((rank_counts >= 2) * _RANK_BITS).sum(axis=1)
+    trips_mask = ((rank_counts >= 3) * _RANK_BITS).sum(axis=1)
+    quads_mask = ((rank_counts >= 4) * _RANK_BITS).sum(axis=1)
+
+    # A hand of at most seven cards can only hold one flush suit
+    flush_suit = suit_counts.argmax(axis=1)
+    has_flush = suit_counts.max(axis=1) >= 5
+    in_flush = suits == flush_suit[:, None]
+    flush_mask = np.bitwise_or.reduce(np.where(in_flush, 1 << ranks, 0), axis=1) * has_flush
+
+    straight_flush = _STRAIGHT_HIGH[flush_mask]
+    straight = _STRAIGHT_HIGH[rank_mask]
+    quads = _HIGHEST[quads_mask]
+    trips = _HIGHEST[trips_mask]
+    full_house_pair = _HIGHEST[pair_mask & ~_rank_bit(trips)]
+    high_pair = _HIGHEST[pair_mask]
+    low_pair = _HIGHEST[pair_mask & ~_rank_bit(high_pair)]
+    B = SCORE_BASE
+
+    conditions = [
+        straight_flush > 0,
+        quads > 0,
+        (trips > 0) & (full_house_pair > 0),
+        has_flush,
+        straight > 0,
+        trips > 0,
+        low_pair > 0,
+        high_pair > 0,
+    ]
+    choices = [
+        np.where(straight_flush == 13, HAND_RANKS['Royal Flush'], HAND_RANKS['Straight Flush']) * _CATEGORY_FACTOR
+        + straight_flush * B ** 4,
+        HAND_RANKS['Four of a Kind'] * _CATEGORY_FACTOR + quads * B ** 4
+        + _HIGHEST[rank_mask & ~_rank_bit(quads)] * B ** 3,
+        HAND_RANKS['Full House'] * _CATEGORY_FACTOR + trips * B ** 4 + full_house_pair * B ** 3,
+        HAND_RANKS['Flush'] * _CATEGORY_FACTOR + _TOP_FIVE[flush_mask],
+        HAND_RANKS['Straight'] * _CATEGORY_FACTOR + straight * B ** 4,
+        HAND_RANKS['Three of a Kind'] * _CATEGORY_FACTOR + trips * B ** 4
+        + (_TOP_FIVE[rank_mask & ~_rank_bit(trips)] // B ** 3) * B ** 2,
+        HAND_RANKS['Two Pair'] * _CATEGORY_FACTOR + high_pair * B ** 4 + low_pair * B ** 3
+        + _HIGHEST[rank_mask & ~_rank_bit(high_pair) & ~_rank_bit(low_pair)] * B ** 2,
+        HAND_RANKS['One Pair'] * _CATEGORY_FACTOR + high_pair * B ** 4
+        + (_TOP_FIVE[rank_mask & ~_rank_bit(high_pair)] // B ** 2) * B,
+    ]
+    default = HAND_RANKS['High Card'] * _CATEGORY_FACTOR + _TOP_FIVE[rank_mask]
+    return np.select(conditions, choices, default)
+
+def score_category(scores):
+    """Returns the HAND_RANKS value encoded in batch scores."""
+    return np.asarray(scores) // _CATEGORY_FACTOR
@@ -0,0 +1,439 @@
+# hand_range.py
+
+import re
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+import numpy as np
+from hand_evaluator import evaluate_hands_batch, cards_to_indices, index_to_card
+from equity import preflop_strength
+
+# Every two-card holding, as pairs of 0-51 card indices
+COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+NUM_COMBOS = len(COMBOS)  # 1326
+
+# CARD_COMBOS[card] marks the combos that contain the card
+CARD_COMBOS = np.zeros((52, NUM_COMBOS), dtype=bool)
+CARD_COMBOS[COMBOS[:, 0], np.arange(NUM_COMBOS)] = True
+CARD_COMBOS[COMBOS[:, 1], np.arange(NUM_COMBOS)] = True
+
+# COMBO_INDEX[a, b] is the index in COMBOS of the holding with cards a and b
+COMBO_INDEX = np.full((52, 52), -1, dtype=np.int64)
+COMBO_INDEX[COMBOS[:, 0], COMBOS[:, 1]] = np.arange(NUM_COMBOS)
+COMBO_INDEX[COMBOS[:, 1], COMBOS[:, 0]] = np.arange(NUM_COMBOS)
+
+# Chen formula strength of every combo, computed once
+PREFLOP_STRENGTH = np.array([
+    preflop_strength([index_to_card(first), index_to_card(second)]) for first, second in COMBOS
+])
+
+def blocked_combos(card_indices):
+    """Returns a boolean mask of the combos that share a card with the given indices."""
+    if len(card_indices) == 0:
+        return np.zeros(NUM_COMBOS, dtype=bool)
+    return CARD_COMBOS[np.asarray(card_indices, dtype=np.int64)].any(axis=0)
+
+# Rank pairs of the combos: suits only matter for flushes, so the remaining
+# hands depend on the two hole ranks alone (91 pairs instead of 1326 combos)
+RANK_PAIRS, COMBO_RANK_PAIR = np.unique(np.sort(COMBOS % 13, axis=1), axis=0, return_inverse=True)
+COMBO_RANK_PAIR = COMBO_RANK_PAIR.ravel()
+COMBO_SUITS = COMBOS // 13
+
+def combo_scores(board):
+    """
+    Evaluator scores of every combo on a board of 3 to 5 card indices, equal to
+    evaluate_hands_batch on the full hands.
+    Every rank pair is scored once with suits spread so nothing is a flush, and
+    on boards with three or more cards of a suit, flushes are scored once per set
+    of suited hole ranks. That is at most about 200 rows instead of 1326. Combos
+    blocked by the board get arbitrary scores.
+    """
+    board = np.asarray(board, dtype=np.int64)
+    size = len(board) + 2
+    # Suits 0..3 in turn never put five cards of a seven-card hand in one suit
+    spread = (np.arange(size) % 4) * 13
+    rank_hands = np.hstack([RANK_PAIRS, np.broadcast_to(board % 13, (len(RANK_PAIRS), len(board)))]) + spread
+    scores = evaluate_hands_batch(rank_hands)[COMBO_RANK_PAIR]
+
+    board_suits = np.bincount(board // 13, minlength=4)
+    flush_suit = board_suits.argmax()
+    if board_suits[flush_suit] < 3:
+        return scores
+    # A flush only uses cards of its suit, so it depends on the suited hole ranks alone:
+    # every rank pair, every single rank, or none, next to the suited board cards
+    suited_board = board[board // 13 == flush_suit]
+    in_suit = COMBO_SUITS == flush_suit
+    suited_count = in_suit.sum(axis=1)
+    suited_holes = [np.zeros((1, 0), dtype=np.int64), np.arange(13)[:, None], RANK_PAIRS]
+    for count in range(max(5 - len(suited_board), 0), 3):
+        rows = np.flatnonzero(suited_count == count)
+        if len(rows) == 0:
+            continue
+        holes = suited_holes[count]
+        hands = np.hstack([holes + flush_suit * 13, np.broadcast_to(suited_board, (len(holes), len(suited_board)))])
+        if count == 2:
+            which = COMBO_RANK_PAIR[rows]
+        elif count == 1:
+            which = np.where(in_suit[rows, 0], COMBOS[rows, 0], COMBOS[rows, 1]) % 13
+        else:
+            which = np.zeros(len(rows), dtype=np.int64)
+        scores[rows] = np.maximum(scores[rows], evaluate_hands_batch(hands)[which])
+    return scores
+
+
+def combo_strength(board):
+    """
+    Returns the strength of every combo in [0, 1] for a board of card indices.
+    Before the flop this is the Chen formula; afterwards it is the percentile of
+    the made hand among all combos not blocked by the board.
+    A new postflop board takes about 0.3 ms (see combo_scores), and results are
+    cached per board (in any card order) and shared by every tracker and table
+    that sees it. The returned array is read-only.
+    """
+    if len(board) < 3:
+        return PREFLOP_STRENGTH
+    return _postflop_strength(tuple(sorted(board)))
+
+
+@lru_cache(maxsize=256)
+def _postflop_strength(board):
+    scores = combo_scores(board)
+    live = ~blocked_combos(board)
+    live_scores = np.sort(scores[live])
+    # Share of live combos this combo beats, counting ties as half
+    below = np.searchsorted(live_scores, scores, side='left')
+    not_above = np.searchsorted(live_scores, scores, side='right')
+    strength = (below + not_above) / (2.0 * len(live_scores))
+    strength.setflags(write=False)
+    return strength
+
+
+# Range notation, e.g. "TT+, AKs, KQo:0.5, 76s-54s, AhKd"
+RANK_CHARS = '23456789TJQKA'
+SUIT_CHARS = 'hdcs'  # Same order as hand_evaluator.SUIT_INDEX
+_HAND_PATTERN = re.compile(r'^([2-9TJQKA])([2-9TJQKA])([so]?)$')
+_COMBO_PATTERN = re.compile(r'^([2-9TJQKA])([hdcs])([2-9TJQKA])([hdcs])$')
+
+def _class_combos(high, low, suitedness):
+    """Combo indices of a hand class, e.g. ranks 12 and 11 with 's' for AKs."""
+    combos = []
+    for first_suit in range(4):
+        for second_suit in range(4):
+            if high == low and second_suit <= first_suit:
+                continue
+            suited = first_suit == second_suit
+            if (suitedness == 's' and not suited) or (suitedness == 'o' and suited):
+                continue
+            combos.append(COMBO_INDEX[first_suit * 13 + high, second_suit * 13 + low])
+    return combos
+
+def _parse_hand(text):
+    """Splits a hand class like "AKs" into (high rank, low rank, suitedness)."""
+    match = _HAND_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid hand '{text}'")
+    high, low = sorted((RANK_CHARS.index(match.group(1)), RANK_CHARS.index(match.group(2))), reverse=True)
+    if high == low and match.group(3):
+        raise ValueError(f"Pairs cannot be suited or offsuit: '{text}'")
+    return high, low, match.group(3)
+
+def _expand_token(token):
+    """Returns the combo indices described by one comma-separated range token."""
+    match = _COMBO_PATTERN.match(token)
+    if match:
+        first = SUIT_CHARS.index(match.group(2)) * 13 + RANK_CHARS.index(match.group(1))
+        second = SUIT_CHARS.index(match.group(4)) * 13 + RANK_CHARS.index(match.group(3))
+        if first == second:
+            raise ValueError(f"Duplicate card in '{token}'")
+        return [COMBO_INDEX[first, second]]
+
+    if token.endswith('+'):
+        high, low, suitedness = _parse_hand(token[:-1])
+        if high == low:
+            classes = [(rank, rank) for rank in range(low, 13)]  # TT+ is TT up to AA
+        else:
+            classes = [(high, kicker) for kicker in range(low, high)]  # A9s+ is A9s up to AKs
+    elif '-' in token:
+        start, end = token.split('-', 1)
+        high, low, suitedness = _parse_hand(start)
+        end_high, end_low, end_suitedness = _parse_hand(end)
+        if suitedness != end_suitedness:
+            raise ValueError(f"Mixed suitedness in '{token}'")
+        if high == low and end_high == end_low:
+            classes = [(rank, rank) for rank in range(min(low, end_low), max(low, end_low) + 1)]
+        elif high == end_high:
+            classes = [(high, kicker) for kicker in range(min(low, end_low), max(low, end_low) + 1)]
+        elif high - low == end_high - end_low:
+            # Same gap, both cards move together: 76s-54s is 76s, 65s, 54s
+            shift = high - end_high
+            step = 1 if shift >= 0 else -1
+            classes = [(end_high + offset, end_low + offset) for offset in range(0, shift + step, step)]
+        else:
+            raise ValueError(f"Invalid span '{token}'")
+    else:
+        high, low, suitedness = _parse_hand(token)
+        classes = [(high, low)]
+    return [combo for high, low in classes for combo in _class_combos(high, low, suitedness)]
+
+def parse_range(notation):
+    """
+    Expands range notation into a weight per combo of COMBOS.
+    Tokens are comma-separated: pairs ("TT"), suited or offsuit classes ("AKs",
+    "KQo", or "AK" for both), "+" to go up to the top ("TT+", "A9s+"), spans
+    ("TT-77", "KTs-K7s", "76s-54s"), single combos ("AhKd") and an optional
+    weight (":0.5"). Later tokens override earlier ones.
+    Raises ValueError for anything it cannot read.
+    """
+    weights = np.zeros(NUM_COMBOS)
+    for token in notation.replace(' ', '').split(','):
+        if not token:
+            continue
+        weight = 1.0
+        if ':' in token:
+            token, weight_text = token.split(':', 1)
+            try:
+                weight = float(weight_text)
+            except ValueError:
+                raise ValueError(f"Invalid weight in '{token}:{weight_text}'")
+        weights[_expand_token(token)] = weight
+    return weights
+
+def _as_weights(hand_range):
+    """Accepts notation, a HandRange or a weight vector."""
+    if isinstance(hand_range, str):
+        return parse_range(hand_range)
+    if isinstance(hand_range, HandRange):
+        return hand_range.weights.copy()
+    return np.asarray(hand_range, dtype=np.float64)
+
+def range_equity(hero, villain, board=(), dead=(), num_runouts=2000, max_exact_runouts=5000,
+                 batch_size=64, rng=None):
+    """
+    Equity of one range against another, as (overall equity, equity per combo).
+    Ranges can be notation, HandRange objects or weight vectors over COMBOS; board
+    and dead are card indices. Runouts are enumerated when there are at most
+    max_exact_runouts of them (the flop has 1,176) and num_runouts are sampled
+    otherwise. Every combo is evaluated once per runout, and each combo is then
+    compared with the whole opposing range through cumulative weights of the
+    range sorted by score, minus the combos sharing one of its cards, so card
+    conflicts are removed exactly without building the combo-by-combo matrix.
+    Combos with no weight or no live matchups get NaN equity.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    board = np.asarray(board, dtype=np.int64)
+    known = np.concatenate([board, np.asarray(dead, dtype=np.int64)])
+    live = ~blocked_combos(known)
+    hero_weights = _as_weights(hero) * live
+    villain_weights = _as_weights(villain) * live
+
+    deck = np.setdiff1d(np.arange(52), known)
+    missing = 5 - len(board)
+    if missing == 0:
+        runouts = np.empty((1, 0), dtype=np.int64)
+    elif comb(len(deck), missing) <= max_exact_runouts:
+        runouts = np.array(list(combinations(deck, missing)), dtype=np.int64)
+    else:
+        runouts = deck[rng.random((num_runouts, len(deck))).argsort(axis=1)[:, :missing]]
+
+    needed = np.flatnonzero((hero_weights > 0) | (villain_weights > 0))
+    cards = COMBOS[needed]
+    card_matrix = CARD_COMBOS[:, needed].T.astype(np.float64)
+    wins = np.zeros(len(needed))
+    totals = np.zeros(len(needed))
+    for start in range(0, len(runouts), batch_size):
+        chunk = runouts[start:start + batch_size]
+        count = len(chunk)
+        boards = np.hstack([np.broadcast_to(board, (count, len(board))), chunk])
+        hands = np.concatenate([
+            np.broadcast_to(cards, (count, len(needed), 2)),
+            np.broadcast_to(boards[:, None, :], (count, len(needed), 5)),
+        ], axis=2)
+        scores = evaluate_hands_batch(hands.reshape(-1, 7)).reshape(count, len(needed))
+        blocked = CARD_COMBOS[chunk][:, :, needed].any(axis=1) if missing else np.zeros(scores.shape, dtype=bool)
+        hero_live = hero_weights[needed] * ~blocked
+        villain_live = villain_weights[needed] * ~blocked
+
+        order = np.argsort(scores, axis=1)
+        sorted_scores = np.take_along_axis(scores, order, axis=1)
+        sorted_weights = np.take_along_axis(villain_live, order, axis=1)
+        cumulative = np.zeros((count, len(needed) + 1))
+        np.cumsum(sorted_weights, axis=1, out=cumulative[:, 1:])
+        cumulative_cards = np.zeros((count, len(needed) + 1, 52))
+        np.cumsum(sorted_weights[:, :, None] * card_matrix[order], axis=1, out=cumulative_cards[:, 1:])
+
+        # Search every row at once by shifting each row's scores into its own range
+        offset = (np.arange(count) * (int(scores.max()) + 1))[:, None]
+        flat = (sorted_scores + offset).ravel()
+        rows = np.arange(count)[:, None]
+        row_start = rows * len(needed)
+        below = np.searchsorted(flat, scores + offset, side='left') - row_start
+        not_above = np.searchsorted(flat, scores + offset, side='right') - row_start
+
+        def villain_weight(position):
+            # Opposing weight up to position, without combos that share a card (the same combo is removed twice)
+            return (cumulative[rows, position] - cumulative_cards[rows, position, cards[:, 0]]
+                    - cumulative_cards[rows, position, cards[:, 1]])
+
+        beaten = villain_weight(below)
+        beaten_or_tied = villain_weight(not_above) + villain_live
+        matched = villain_weight(np.full_like(below, len(needed))) + villain_live
+        wins += (hero_live * (beaten + beaten_or_tied) / 2).sum(axis=0)
+        totals += (hero_live * matched).sum(axis=0)
+
+    combo_equity = np.full(NUM_COMBOS, np.nan)
+    has_matchups = totals > 0
+    combo_equity[needed[has_matchups]] = wins[has_matchups] / totals[has_matchups]
+    total = totals.sum()
+    return (float(wins.sum() / total) if total > 0 else 0.5), combo_equity
+
+
+class ActionLikelihoodModel:
+    """
+    Probability of each action given the strength of a combo.
+    Raises are likely with strong combos, folds to a raise with weak ones, and
+    calls take the remaining mass. A floor keeps every combo possible so a single
+    surprising action never eliminates the true holding.
+    """
+
+    def __init__(self, sharpness=10.0, raise_threshold=0.7, fold_threshold=0.35, floor=0.02):
+        self.sharpness = sharpness
+        self.raise_threshold = raise_threshold
+        self.fold_threshold = fold_threshold
+        self.floor = floor
+
+    def likelihood(self, action, strength, facing_raise):
+        """Returns P(action | combo) for every combo as a vector."""
+        p_raise = 1.0 / (1.0 + np.exp(-self.sharpness * (strength - self.raise_threshold)))
+        if facing_raise:
+            p_fold = 1.0 / (1.0 + np.exp(-self.sharpness * (self.fold_threshold - strength)))
+        else:
+            p_fold = np.zeros_like(strength)
+        p_fold = np.minimum(p_fold, 1.0 - p_raise)
+        if action == 'raise':
+            p = p_raise
+        elif action == 'fold':
+            p = p_fold
+        else:
+            p = 1.0 - p_raise - p_fold
+        return np.maximum(p, self.floor)
+
+
+class HandRange:
+    """
+    Probability vector over the 1,326 possible hole-card combos of one player.
+    """
+
+    def __init__(self):
+        self.weights = np.full(NUM_COMBOS, 1.0 / NUM_COMBOS)
+
+    @classmethod
+    def from_notation(cls, notation):
+        """Creates a range from standard notation such as "TT+, AKs, KQo, 76s-54s"."""
+        hand_range = cls()
+        hand_range.weights = parse_range(notation)
+        hand_range._normalise()
+        return hand_range
+
+    def reset(self):
+        """Makes every combo equally likely again."""
+        self.weights.fill(1.0 / NUM_COMBOS)
+
+    def remove(self, card_indices):
+        """Drops the combos blocked by known cards."""
+        self.weights[blocked_combos(card_indices)] = 0.0
+        self._normalise()
+
+    def update(self, likelihood):
+        """Reweights the range by a per-combo likelihood vector (Bayes' rule)."""
+        self.weights *= likelihood
+        self._normalise()
+
+    def probabilities(self, known_cards=()):
+        """Returns the normalised range after removing combos blocked by known card indices."""
+        weights = self.weights * ~blocked_combos(known_cards)
+        total = weights.sum()
+        return weights / total if total > 0 else weights
+
+    def equity_vs_hand(self, hand, board, num_runouts=32, rng=None):
+        """
+        Returns the equity of a hand against this range.
+        Hand and board are lists of card indices; on the river the result is exact,
+        earlier streets sample num_runouts board completions and evaluate the whole
+        range against each of them in one batch.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        hand = np.asarray(hand, dtype=np.int64)
+        board = np.asarray(board, dtype=np.int64)
+        weights = self.probabilities(np.concatenate([hand, board]))
+        missing = 5 - len(board)
+        if missing == 0:
+            runouts = np.empty((1, 0), dtype=np.int64)
+        else:
+            deck = np.setdiff1d(np.arange(52), np.concatenate([hand, board]))
+            # Each row is an independent draw without replacement
+            order = rng.random((num_runouts, len(deck))).argsort(axis=1)[:, :missing]
+            runouts = deck[order]
+        boards = np.hstack([np.broadcast_to(board, (len(runouts), len(board))), runouts])
+
+        hero = evaluate_hands_batch(np.hstack([np.broadcast_to(hand, (len(boards), 2)), boards]))
+        villain_hands = np.concatenate([
+            np.broadcast_to(COMBOS, (len(boards), NUM_COMBOS, 2)),
+            np.broadcast_to(boards[:, None, :], (len(boards), NUM_COMBOS, 5)),
+        ], axis=2)
+        villain = evaluate_hands_batch(villain_hands.reshape(-1, 7)).reshape(len(boards), NUM_COMBOS)
+
+        # Combos that collide with a runout card cannot exist on that runout
+        live = weights[None, :] * ~CARD_COMBOS[runouts].any(axis=1) if missing else weights[None, :]
+        result = (hero[:, None] > villain) + 0.5 * (hero[:, None] == villain)
+        total = live.sum()
+        return float((live * result).sum() / total) if total > 0 else 0.5
+
+    def _normalise(self):
+        total = self.weights.sum()
+        if total > 0:
+            self.weights /= total
+
+
+class RangeTracker:
+    """
+    Keeps a HandRange per player from public information: board cards and actions.
+    Ranges are shared by everyone at the table; each bot removes its own hole cards
+    at query time with HandRange.probabilities or equity_vs_hand.
+    """
+
+    def __init__(self, likelihood_model=None):
+        self.likelihood_model = likelihood_model if likelihood_model else ActionLikelihoodModel()
+        self.ranges = {}  # Player name -> HandRange
+        self._board = None
+        self._strength = PREFLOP_STRENGTH
+
+    def start_hand(self, players):
+        """Resets the range of every player dealt in."""
+        for player in players:
+            self.range_for(player).reset()
+        self._board = None
+        self._strength = PREFLOP_STRENGTH
+
+    def record_action(self, player, action, community_cards, facing_raise):
+        """Reweights the range of a player after an action, before it is applied."""
+        board = cards_to_indices(community_cards)
+        hand_range = self.range_for(player)
+        if board != self._board:
+            # Combo strengths only change when the board does, at most three times a hand
+            self._board = board
+            self._strength = combo_strength(board)
+        hand_range.remove(board)
+        hand_range.update(self.likelihood_model.likelihood(action, self._strength, facing_raise))
+
+    def range_for(self, player):
+        """Returns the HandRange of a player, creating a uniform one on first sight."""
+        hand_range = self.ranges.get(player.name)
+        if hand_range is None:
+            hand_range = self.ranges[player.name] = HandRange()
+        return hand_range
+
+    def equity_vs_hand(self, player, hand, community_cards, num_runouts=32):
+        """Returns the equity of hole cards against the tracked range of a player."""
+        return self.range_for(player).equity_vs_hand(
+            cards_to_indices(hand), cards_to_indices(community_cards), num_runouts
+        )
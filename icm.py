@@ -0,0 +1,134 @@
+# icm.py
+
+from functools import lru_cache
+import numpy as np
+
+# Fields up to this size are solved exactly; larger ones are sampled
+MAX_EXACT_PLAYERS = 10
+
+@lru_cache(maxsize=None)
+def _mask_tables(num_players):
+    """
+    Bitmask tables for num_players: which players each mask contains, the mask
+    left after each player finishes, and the masks grouped by player count.
+    """
+    masks = np.arange(1 << num_players)
+    bits = 1 << np.arange(num_players)
+    members = (masks[:, None] & bits) != 0
+    children = masks[:, None] ^ bits
+    counts = members.sum(axis=1)
+    levels = [np.flatnonzero(counts == count) for count in range(num_players + 1)]
+    return members, children, levels
+
+
+def _prepare(stacks, payouts):
+    stacks = np.asarray(stacks, dtype=np.float64)
+    single = stacks.ndim == 1
+    stacks = np.atleast_2d(stacks)
+    payouts = np.asarray(payouts, dtype=np.float64)[:stacks.shape[1]]
+    return stacks, payouts, single
+
+
+def icm_equities(stacks, payouts):
+    """
+    Exact Independent Chip Model equities (Malmuth-Harville).
+    A player wins the next place with probability stack / remaining chips, so the
+    equity of every set of remaining players only depends on that set. Equities
+    are memoized per set, keyed on its bitmask, and computed level by level from
+    the last paid place up to the full table, with all sets of one size in a
+    single NumPy step. Sets smaller than the unpaid places are never visited.
+    stacks is (players,) or (tables, players) and the result has the same shape.
+    """
+    stacks, payouts, single = _prepare(stacks, payouts)
+    tables, num_players = stacks.shape
+    members, children, levels = _mask_tables(num_players)
+    equity = np.zeros((tables, 1 << num_players, num_players))
+    for count in range(num_players - len(payouts) + 1, num_players + 1):
+        level = levels[count]
+        place = num_players - count
+        weights = stacks[:, None, :] * members[level]
+        totals = weights.sum(axis=2, keepdims=True)
+        # Sets where nobody has chips left finish in a random order
+        weights = np.where(totals > 0, weights, members[level])
+        probability = weights / weights.sum(axis=2, keepdims=True)
+        following = equity[:, children[level], :]
+        equity[:, level] = payouts[place] * probability + np.einsum('tlj,tlji->tli', probability, following)
+    result = equity[:, -1]
+    return result[0] if single else result
+
+
+def sample_icm_equities(stacks, payouts, samples=20000, rng=None):
+    """
+    Monte Carlo ICM for fields too large to solve exactly.
+    Finishing orders are drawn from the same model: sorting Exp(1) / stack keys
+    ranks players as if places were drawn one by one in proportion to stacks.
+    Only the paid places are ordered. Accepts the same shapes as icm_equities.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    stacks, payouts, single = _prepare(stacks, payouts)
+    tables, num_players = stacks.shape
+    places = len(payouts)
+    with np.errstate(divide='ignore'):
+        keys = rng.standard_exponential((tables, samples, num_players)) / stacks[:, None, :]
+    if places < num_players:
+        top = np.argpartition(keys, places - 1, axis=2)[:, :, :places]
+        keys_top = np.take_along_axis(keys, top, axis=2)
+        finishers = np.take_along_axis(top, np.argsort(keys_top, axis=2), axis=2)
+    else:
+        finishers = np.argsort(keys, axis=2)
+    offsets = (np.arange(tables) * num_players)[:, None, None]
+    totals = np.bincount(
+        (finishers + offsets).ravel(),
+        weights=np.broadcast_to(payouts, finishers.shape).ravel(),
+        minlength=tables * num_players,
+    )
+    result = totals.reshape(tables, num_players) / samples
+    return result[0] if single else result
+
+
+def icm(stacks, payouts, samples=20000, rng=None):
+    """ICM equities, exact up to MAX_EXACT_PLAYERS players and sampled beyond."""
+    if np.shape(stacks)[-1] <= MAX_EXACT_PLAYERS:
+        return icm_equities(stacks, payouts)
+    return sample_icm_equities(stacks, payouts, samples, rng)
+
+
+def push_fold_outcomes(stacks, posted, hero, villain):
+    """
+    Stacks after each outcome of hero moving all-in against villain.
+    stacks are the chips behind after posting blinds and antes, posted the chips
+    each player already put in the pot. Returns a (4, players) array for: hero
+    folds (villain takes the pot), villain folds, villain calls and hero wins,
+    villain calls and hero loses.
+    """
+    stacks = np.asarray(stacks, dtype=np.float64)
+    posted = np.asarray(posted, dtype=np.float64)
+    pot = posted.sum()
+    hero_total = stacks[hero] + posted[hero]
+    villain_total = stacks[villain] + posted[villain]
+    matched = min(hero_total, villain_total)
+    dead = pot - posted[hero] - posted[villain]
+
+    outcomes = np.tile(stacks, (4, 1))
+    outcomes[0, villain] += pot
+    outcomes[1, hero] += pot
+    outcomes[2:, hero] = hero_total - matched
+    outcomes[2:, villain] = villain_total - matched
+    outcomes[2, hero] += 2 * matched + dead
+    outcomes[3, villain] += 2 * matched + dead
+    return outcomes
+
+
+def push_fold_decision(stacks, posted, payouts, hero, villain, equity, call_probability):
+    """
+    Chooses between moving all-in and folding by ICM equity instead of chips.
+    equity is hero's share of the pot when called and call_probability how often
+    villain calls. All four outcomes are valued in one batched ICM call.
+    Returns (action, push_value, fold_value) with values in payout units.
+    """
+    values = icm(push_fold_outcomes(stacks, posted, hero, villain), payouts)[:, hero]
+    fold_value = values[0]
+    called_value = equity * values[2] + (1 - equity) * values[3]
+    push_value = (1 - call_probability) * values[1] + call_probability * called_value
+    action = 'push' if push_value > fold_value else 'fold'
+    return action, float(push_value), float(fold_value)
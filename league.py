@@ -0,0 +1,191 @@
+# league.py
+
+import json
+import multiprocessing
+import os
+import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import torch
+from poker_env import PokerEnv
+
+def _init_evaluation_worker():
+    """Keeps evaluation workers from competing with the learner for CPU."""
+    torch.set_num_threads(1)
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+def hand_result(env):
+    """
+    Result of the finished hand for the agent seat: 1 for a win, 0 for a loss and
+    0.5 for a split pot or a hand cut off by the step limit.
+    PokerEnv.calculate_reward is 0 when the opponent folds, so folds are read
+    from the players rather than from the reward.
+    """
+    if env.game_logic.game_phase == 'showdown':
+        agent, opponent = env.agent_player.chips, env.opponent.chips
+        return 1.0 if agent > opponent else 0.0 if agent < opponent else 0.5
+    if not env.opponent.is_active:
+        return 1.0
+    if not env.agent_player.is_active:
+        return 0.0
+    return 0.5
+
+
+def play_match(first_path, second_path, num_hands=200, seed=0):
+    """
+    Plays two checkpoints against each other greedily in PokerEnv and returns the
+    share of hands won by the first one (ties count half).
+    The checkpoints swap seats halfway through so neither keeps the first move.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    env = PokerEnv()
+    score = 0.0
+    for hand in range(num_hands):
+        swapped = hand >= num_hands // 2
+        agent_path, opponent_path = (second_path, first_path) if swapped else (first_path, second_path)
+        if hand in (0, num_hands // 2):
+            for player, path in ((env.agent_player, agent_path), (env.opponent, opponent_path)):
+                player.load_agent(path)
+                player.agent.epsilon = 0.0
+        state = env.reset()
+        for _ in range(100):
+            state, _, done, _ = env.step(env.agent_player.agent.act(state))
+            if done:
+                break
+        result = hand_result(env)
+        score += 1.0 - result if swapped else result
+    return score / num_hands
+
+
+class League:
+    """
+    Pool of past DQNAgent checkpoints with Elo ratings.
+    Training draws its opponents from the pool, while head-to-head matches between
+    pool members run in a background process pool. The promoted model is the
+    highest-rated checkpoint with enough games, rather than the one behind the best
+    single-episode reward.
+    """
+
+    def __init__(self, directory='models/league', pool_size=20, initial_rating=1000.0, k_factor=24.0,
+                 hands_per_match=200, min_games=3, evaluation_workers=2, latest_probability=0.5):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.pool_size = pool_size
+        self.initial_rating = initial_rating
+        self.k_factor = k_factor
+        self.hands_per_match = hands_per_match
+        self.min_games = min_games  # Matches needed before a checkpoint can be promoted
+        self.latest_probability = latest_probability  # Chance of training against the newest checkpoint
+        self.members = {}  # Name -> {'path', 'rating', 'games'}
+        self.order = []  # Names from oldest to newest
+        self.pending = {}  # Future -> (first name, second name)
+        self.best = None
+        self.match_count = 0
+        # Spawned workers do not inherit the trainer's torch threads or locks held mid-fork
+        self.executor = ProcessPoolExecutor(max_workers=evaluation_workers, initializer=_init_evaluation_worker,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        self.evaluation_workers = evaluation_workers
+
+    def add_checkpoint(self, agent, name):
+        """Saves the agent weights into the pool, dropping the oldest member if it is full."""
+        path = os.path.join(self.directory, f'{name}.pth')
+        agent.save(path)
+        # A new checkpoint starts from the rating of the newest one before it
+        rating = self.members[self.order[-1]]['rating'] if self.order else self.initial_rating
+        self.members[name] = {'path': path, 'rating': rating, 'games': 0}
+        self.order.append(name)
+        # The promoted checkpoint and those in a running match are never dropped
+        protected = {name, self.best}
+        for names in self.pending.values():
+            protected.update(names)
+        while len(self.order) > self.pool_size:
+            removable = [member for member in self.order if member not in protected]
+            if not removable:
+                break
+            self.order.remove(removable[0])
+            os.remove(self.members.pop(removable[0])['path'])
+
+    def sample_opponent(self):
+        """Returns the path of a pool checkpoint to train against."""
+        if not self.order:
+            return None
+        if random.random() < self.latest_probability:
+            return self.members[self.order[-1]]['path']
+        return self.members[random.choice(self.order)]['path']
+
+    def load_opponent(self, player):
+        """Loads a sampled pool checkpoint into a PokerBot that then plays greedily."""
+        path = self.sample_opponent()
+        if path is not None:
+            player.load_agent(path)
+            player.agent.epsilon = 0.0
+
+    def update(self):
+        """
+        Collects finished matches, updates ratings, schedules new matches on idle
+        workers and promotes the best-rated checkpoint. Never blocks on a match.
+        """
+        for future in [future for future in self.pending if future.done()]:
+            first, second = self.pending.pop(future)
+            if first in self.members and second in self.members:
+                self._update_ratings(first, second, future.result())
+        while len(self.pending) < self.evaluation_workers and len(self.order) >= 2:
+            first, second = self._next_pairing()
+            future = self.executor.submit(
+                play_match, self.members[first]['path'], self.members[second]['path'],
+                self.hands_per_match, self.match_count
+            )
+            self.match_count += 1
+            self.pending[future] = (first, second)
+        self._promote()
+
+    def _next_pairing(self):
+        """Pairs the least-played checkpoint with a random other member."""
+        first = min(self.order, key=lambda name: (self.members[name]['games'], -self.order.index(name)))
+        second = random.choice([name for name in self.order if name != first])
+        return first, second
+
+    def _update_ratings(self, first, second, score):
+        """Elo update from the first player's match score in [0, 1]."""
+        first_member = self.members[first]
+        second_member = self.members[second]
+        expected = 1.0 / (1.0 + 10 ** ((second_member['rating'] - first_member['rating']) / 400))
+        change = self.k_factor * (score - expected)
+        first_member['rating'] += change
+        second_member['rating'] -= change
+        first_member['games'] += 1
+        second_member['games'] += 1
+
+    def _promote(self):
+        """Marks the highest-rated sufficiently played checkpoint as best."""
+        candidates = [name for name in self.order if self.members[name]['games'] >= self.min_games]
+        if candidates:
+            self.best = max(candidates, key=lambda name: self.members[name]['rating'])
+
+    def promote_to(self, model_save_path):
+        """Copies the best checkpoint to model_save_path; returns its name or None."""
+        if self.best is None:
+            return None
+        shutil.copyfile(self.members[self.best]['path'], model_save_path)
+        return self.best
+
+    def ratings(self):
+        """Returns the ratings of the pool, best first."""
+        return sorted(((name, member['rating']) for name, member in self.members.items()),
+                      key=lambda item: item[1], reverse=True)
+
+    def save(self):
+        """Writes the pool and its ratings to league.json."""
+        with open(os.path.join(self.directory, 'league.json'), 'w') as f:
+            json.dump({'members': self.members, 'order': self.order, 'best': self.best}, f, indent=2)
+
+    def close(self, wait=True):
+        """Shuts the evaluation pool down."""
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,299 @@
+# memory_report.py
+
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import warnings
+from collections import deque
+from types import FunctionType, ModuleType
+import numpy as np
+import torch
+
+# Objects python_bytes never descends into; tensors, models and optimizers are counted on their own
+_OPAQUE_TYPES = (type, ModuleType, FunctionType, torch.Tensor, torch.nn.Module, torch.optim.Optimizer)
+_CONTAINERS = (list, tuple, set, frozenset, deque)
+
+def python_bytes(obj, seen=None, exclude=()):
+    """
+    Deep size of an object graph: sys.getsizeof of every object reachable through
+    containers and instance attributes, each counted once. NumPy arrays count their
+    data unless it is a view or a memory map; objects in exclude are skipped along
+    with everything only reachable through them.
+    """
+    seen = set() if seen is None else seen
+    excluded = {id(item) for item in exclude}
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or id(item) in excluded or isinstance(item, _OPAQUE_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, _CONTAINERS):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, np.ndarray):
+            stack.append(item.__dict__)
+    return total
+
+
+def array_bytes(obj, seen=None):
+    """
+    NumPy memory held by an object such as a replay buffer, as (in_memory, mapped).
+    np.zeros storage is only committed by the OS once written, so in_memory is an
+    upper bound on the resident size of a buffer that is not yet full; mapped
+    covers file-backed arrays, which the page cache can drop.
+    """
+    seen = set() if seen is None else seen
+    in_memory = mapped = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _OPAQUE_TYPES):
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.memmap):
+            mapped += item.nbytes
+        elif isinstance(item, np.ndarray):
+            if item.base is None:
+                in_memory += item.nbytes
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, _CONTAINERS):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+    return in_memory, mapped
+
+
+def tensor_bytes(tensors, seen=None):
+    """Bytes of the storages behind the given tensors, counting shared storage once."""
+    seen = set() if seen is None else seen
+    total = 0
+    for tensor in tensors:
+        storage = tensor.untyped_storage()
+        key = ('storage', tensor.device.type, storage.data_ptr())
+        if key not in seen:
+            seen.add(key)
+            total += storage.nbytes()
+    return total
+
+
+def module_bytes(module, seen=None):
+    return tensor_bytes(list(module.parameters()) + list(module.buffers()), seen)
+
+
+def optimizer_bytes(optimizer, seen=None):
+    """Bytes of optimizer state such as Adam's moment estimates (zero before the first step)."""
+    tensors = [value for state in optimizer.state.values() for value in state.values()
+               if isinstance(value, torch.Tensor)]
+    return tensor_bytes(tensors, seen)
+
+
+def agent_memory(agent, seen=None):
+    """Memory of a DQNAgent's networks, optimizer and replay buffer."""
+    seen = set() if seen is None else seen
+    if id(agent) in seen:
+        # Shared with a player already counted
+        return {'model': 0, 'target_model': 0, 'optimizer': 0, 'replay_buffer': 0, 'replay_buffer_mapped': 0}
+    seen.add(id(agent))
+    replay, mapped = array_bytes(agent.memory, seen)
+    return {
+        'model': module_bytes(agent.model, seen),
+        'target_model': module_bytes(agent.target_model, seen),
+        'optimizer': optimizer_bytes(agent.optimizer, seen),
+        'replay_buffer': replay,
+        'replay_buffer_mapped': mapped,
+    }
+
+
+def player_memory(player, seen=None, exclude=()):
+    """Memory of a Player or PokerBot: the object itself plus any agent it holds."""
+    seen = set() if seen is None else seen
+    agent = getattr(player, 'agent', None)
+    report = {'name': player.name, 'type': type(player).__name__}
+    report['object'] = python_bytes(player, seen, exclude=[agent, *exclude])
+    if agent is not None:
+        report.update(agent_memory(agent, seen))
+    report['total'] = sum(value for key, value in report.items() if key not in ('name', 'type', 'replay_buffer_mapped'))
+    return report
+
+
+def table_memory(game, seen=None):
+    """
+    Memory of one table (a GameLogic or GameEngine): its players, deck, board,
+    trackers and the table object itself. Objects shared between players, such as
+    one agent behind several bots, are counted once, at the first player holding
+    them. Mapped replay files are reported but not added to the total.
+    """
+    seen = set() if seen is None else seen
+    trackers = [tracker for tracker in (getattr(game, 'opponent_tracker', None),
+                                        getattr(game, 'range_tracker', None)) if tracker is not None]
+    players = [player_memory(player, seen, exclude=trackers) for player in game.players]
+    report = {
+        'players': players,
+        'deck': python_bytes(game.deck, seen),
+        'board': python_bytes(game.community_cards, seen),
+        'trackers': sum(python_bytes(tracker, seen) for tracker in trackers),
+    }
+    report['table_object'] = python_bytes(game, seen)
+    report['total'] = (sum(player['total'] for player in players) + report['deck'] + report['board']
+                       + report['trackers'] + report['table_object'])
+    return report
+
+
+def _proc_status():
+    """VmRSS and VmHWM from /proc/self/status in bytes, where available."""
+    values = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('VmRSS', 'VmHWM'):
+                    values[key] = int(rest.split()[0]) * 1024
+    except OSError:
+        pass
+    return values
+
+
+def process_memory(scan_tensors=True):
+    """
+    Memory of the current process. The torch heap is measured by walking the
+    objects tracked by the garbage collector and adding up the storage of every
+    live tensor, which takes a moment in large processes; pass scan_tensors=False
+    to skip it. CUDA figures come from the caching allocator.
+    """
+    status = _proc_status()
+    peak = status.get('VmHWM', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    report = {'pid': os.getpid(), 'rss': status.get('VmRSS'), 'peak_rss': peak,
+              'torch_threads': torch.get_num_threads()}
+    if scan_tensors:
+        with warnings.catch_warnings():
+            # isinstance on some deprecated torch aliases warns
+            warnings.simplefilter('ignore')
+            tensors = [obj for obj in gc.get_objects() if isinstance(obj, torch.Tensor)]
+        report['torch_tensors'] = len(tensors)
+        report['torch_tensor_bytes'] = tensor_bytes(tensors)
+    if torch.cuda.is_available():
+        report['cuda_allocated'] = torch.cuda.memory_allocated()
+        report['cuda_reserved'] = torch.cuda.memory_reserved()
+    if tracemalloc.is_tracing():
+        report['tracemalloc_current'], report['tracemalloc_peak'] = tracemalloc.get_traced_memory()
+    return report
+
+
+class TracemallocDiff:
+    """
+    Compares tracemalloc snapshots to find where Python and NumPy allocations grew
+    between two points in time. Torch tensors are allocated outside tracemalloc's
+    view; process_memory covers them.
+    """
+
+    def __init__(self, frames=1):
+        self.frames = frames
+        self.started_tracing = False
+        self.baseline = None
+
+    def start(self):
+        """Starts tracing if needed and takes the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started_tracing = True
+        self.baseline = self.snapshot()
+        return self
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ])
+
+    def diff(self, before=None, after=None, top=20, key_type='lineno'):
+        """Largest allocation changes from before (the baseline) to after (now)."""
+        before = before if before is not None else self.baseline
+        after = after if after is not None else self.snapshot()
+        return [
+            {'location': str(stat.traceback), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff,
+             'size': stat.size, 'count': stat.count}
+            for stat in after.compare_to(before, key_type)[:top]
+        ]
+
+    def stop(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+
+def memory_report(tables=(), tracemalloc_diff=None, scan_tensors=True):
+    """Process figures, per-table figures and, when given, the tracemalloc diff since its baseline."""
+    table_reports = [table_memory(game) for game in tables]
+    report = {
+        'time': time.time(),
+        'process': process_memory(scan_tensors),
+        'tables': table_reports,
+        'tables_total': sum(table['total'] for table in table_reports),
+    }
+    if tracemalloc_diff is not None:
+        report['tracemalloc'] = tracemalloc_diff.diff()
+    return report
+
+
+def dump_memory_report(path, tables=(), tracemalloc_diff=None, scan_tensors=True):
+    """Writes memory_report as JSON and returns it."""
+    report = memory_report(tables, tracemalloc_diff, scan_tensors)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(path + '.tmp', path)
+    return report
+
+
+def print_summary(report):
+    mb = 1024 * 1024
+    process = report['process']
+    print(f"Process {process['pid']}: RSS {(process['rss'] or 0) / mb:.1f} MB "
+          f"(peak {process['peak_rss'] / mb:.1f} MB), torch tensors "
+          f"{process.get('torch_tensor_bytes', 0) / mb:.1f} MB")
+    for index, table in enumerate(report['tables']):
+        print(f"Table {index}: {table['total'] / mb:.2f} MB")
+        for player in table['players']:
+            print(f"  {player['name']:<12}{player['total'] / mb:8.2f} MB  "
+                  f"model {player.get('model', 0) / 1024:.0f} KB, "
+                  f"target {player.get('target_model', 0) / 1024:.0f} KB, "
+                  f"optimizer {player.get('optimizer', 0) / 1024:.0f} KB, "
+                  f"replay {player.get('replay_buffer', 0) / mb:.1f} MB")
+
+
+if __name__ == '__main__':
+    from game_logic import GameLogic
+    from poker_bot import PokerBot
+    from player import Player
+
+    parser = argparse.ArgumentParser(description='Memory accounting for poker tables.')
+    parser.add_argument('--tables', type=int, default=2, help='Tables to create and measure')
+    parser.add_argument('--bots', type=int, default=5, help='PokerBots per table, next to one Player')
+    parser.add_argument('--output', default=None, help='Write the report to this JSON file')
+    parser.add_argument('--tracemalloc', action='store_true', help='Diff allocations made while building the tables')
+    args = parser.parse_args()
+
+    diff = TracemallocDiff().start() if args.tracemalloc else None
+    tables = []
+    for _ in range(args.tables):
+        game = GameLogic()
+        game.add_player(Player('Player'))
+        for index in range(args.bots):
+            game.add_player(PokerBot(f'AI Bot {index + 1}'))
+        game.shuffle_and_deal()
+        tables.append(game)
+    report = dump_memory_report(args.output, tables, diff) if args.output else memory_report(tables, diff)
+    print_summary(report)
+    if diff is not None:
+        for entry in report['tracemalloc'][:10]:
+            print(f"{entry['size_diff'] / 1024:10.1f} KB  {entry['location']}")
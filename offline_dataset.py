@@ -0,0 +1,336 @@
+# offline_dataset.py
+
+import argparse
+import json
+import os
+import shutil
+import time
+import numpy as np
+import torch
+from sqlalchemy import create_engine, text
+from game_logic import GameLogic
+from player import Player
+from poker_bot import PokerBot
+from transition_codec import StateCodec
+
+# HandHistory.hand_data holds one hand as JSON:
+#
+#     {
+#         "dealer_position": 0,
+#         "players": [{"name": "alice", "chips": 1000,
+#                      "hand": [{"value": "Ace", "suit": "Spades"}, ...]}, ...],
+#         "community_cards": [{"value": "10", "suit": "Hearts"}, ...],
+#         "actions": [{"player": "alice", "phase": "pre-flop", "action": "raise"}, ...]
+#     }
+#
+# Players whose hole cards were not revealed leave "hand" empty; they still act
+# in the replay but produce no transitions. A hand that reaches a showdown between
+# a known player and one whose cards are unknown has no known result and is
+# rejected.
+
+ACTION_INDEX = {'fold': 0, 'call': 1, 'check': 1, 'raise': 2}
+STREET_CARDS = [('flop', 3), ('turn', 1), ('river', 1)]
+PHASE_ORDER = ['pre-flop', 'flop', 'turn', 'river']
+
+class ReplaySeat(Player):
+    """
+    A logged seat. It encodes states with PokerBot's methods but, unlike a
+    PokerBot, does not build a DQNAgent (two networks, an optimizer and a replay
+    buffer) for every seat of every hand.
+    """
+
+    encode_game_state = PokerBot.encode_game_state
+    encode_cards = PokerBot.encode_cards
+    get_card_index = PokerBot.get_card_index
+    encode_phase = PokerBot.encode_phase
+
+    def __init__(self, name, chips, state_size):
+        super().__init__(name, chips)
+        self.state_size = state_size
+        self.opponent_tracker = None
+
+
+def terminal_reward(folded, chip_change):
+    """Final reward of a hand on PokerEnv's scale: win 1, loss -1, tie 0, fold -0.5."""
+    if folded:
+        return -0.5
+    return float(np.sign(chip_change))
+
+
+def replay_hand(hand, state_size=112):
+    """
+    Replays one logged hand through GameLogic and returns the transitions of
+    every player whose cards are known, as (state, action, reward, next_state,
+    done) tuples encoded with PokerBot.encode_game_state.
+    Raises ValueError for hands that do not fit the format, and for hands whose
+    showdown cannot be settled because a live player's cards are unknown.
+    """
+    game = GameLogic()
+    game.verbose = False
+    players = {}
+    for seat in hand['players']:
+        player = ReplaySeat(seat['name'], seat.get('chips', game.initial_chips), state_size)
+        player.hand = list(seat.get('hand') or [])
+        players[seat['name']] = player
+        game.add_player(player)
+    if len(players) < 2:
+        raise ValueError("A hand needs at least two players")
+    starting_chips = {name: player.chips for name, player in players.items()}
+
+    game.dealer_position = hand.get('dealer_position', 0) - 1  # prepare_round moves the button forward
+    game.prepare_round()
+    # deal_community_cards pops from the end of the deck
+    game.deck = list(reversed(hand.get('community_cards', [])))
+    known = {name for name, player in players.items() if len(player.hand) == 2}
+
+    transitions = []
+    pending = {}  # Player name -> (state, action) waiting for its next state
+    for entry in hand['actions']:
+        player = players.get(entry['player'])
+        action = entry['action']
+        if player is None or action not in ACTION_INDEX:
+            raise ValueError(f"Unknown player or action in {entry}")
+        _advance_to(game, entry.get('phase', game.game_phase))
+        if player.name in known:
+            state = player.encode_game_state(game)
+            if player.name in pending:
+                previous_state, previous_action = pending[player.name]
+                transitions.append((previous_state, previous_action, 0.0, state, False))
+            pending[player.name] = (state, ACTION_INDEX[action])
+        game.process_player_action(player, action)
+
+    folded = {name for name, player in players.items() if not player.is_active}
+    live = set(players) - folded
+    if len(live) > 1:
+        if live & known and live - known:
+            raise ValueError("Showdown against a player whose cards are unknown")
+        _advance_to(game, 'river')
+    game.game_phase = 'showdown'
+    game.showdown()
+    for name, (state, action) in pending.items():
+        player = players[name]
+        reward = terminal_reward(name in folded, player.chips - starting_chips[name])
+        transitions.append((state, action, reward, player.encode_game_state(game), True))
+    return transitions
+
+
+def _advance_to(game, phase):
+    """Deals community cards until the game reaches the given phase."""
+    if phase not in PHASE_ORDER:
+        raise ValueError(f"Unknown phase {phase}")
+    while PHASE_ORDER.index(game.game_phase) < PHASE_ORDER.index(phase):
+        next_phase, cards = STREET_CARDS[PHASE_ORDER.index(game.game_phase)]
+        if len(game.deck) < cards:
+            raise ValueError("Not enough community cards logged")
+        game.game_phase = next_phase
+        game.deal_community_cards(cards)
+        for player in game.players:
+            player.current_bet = 0
+
+
+def iter_hand_rows(engine, chunk_size=1000, start_after=0):
+    """
+    Yields (id, hand_data) rows of hand_histories in id order.
+    Each chunk is a keyset-paginated query (WHERE id > last id) read through a
+    server-side cursor, so neither the table nor a deep OFFSET is ever materialised.
+    """
+    query = text(
+        "SELECT id, hand_data FROM hand_histories WHERE id > :last_id ORDER BY id LIMIT :chunk_size"
+    )
+    last_id = start_after
+    with engine.connect() as connection:
+        connection = connection.execution_options(stream_results=True)
+        while True:
+            count = 0
+            for row in connection.execute(query, {'last_id': last_id, 'chunk_size': chunk_size}):
+                count += 1
+                last_id = row[0]
+                yield row[0], row[1]
+            if count < chunk_size:
+                return
+
+
+class ShardWriter:
+    """
+    Writes transitions in StateCodec format to numbered shard directories of
+    .npy files, each readable with np.load(mmap_mode='r'). A shard is written
+    under a temporary name and renamed into place, and manifest.json records the
+    last hand id read, skipped rows included, once the shards up to it are
+    written, so an interrupted build resumes after it.
+    """
+
+    def __init__(self, directory, state_size, shard_size=100000):
+        self.directory = directory
+        self.codec = StateCodec(state_size, 0)  # Replayed bots carry no opponent tracker
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest['state_size'] != state_size:
+                raise ValueError(f"Dataset in {directory} has state size {self.manifest['state_size']}")
+        else:
+            self.manifest = {'state_size': state_size, 'last_id': 0, 'shards': [], 'hands': 0}
+        self.buffer = []
+        self.hands = 0
+        self.last_id = self.manifest['last_id']
+
+    def add_hand(self, hand_id, transitions):
+        """Buffers one hand and writes a shard once enough transitions are waiting."""
+        self.buffer.extend(transitions)
+        self.hands += 1
+        self.last_id = hand_id
+        if len(self.buffer) >= self.shard_size:
+            self.flush()
+
+    def skip(self, hand_id):
+        """Records a row that could not be replayed, so a resumed build does not read it again."""
+        self.last_id = hand_id
+
+    def flush(self):
+        """Writes the buffered hands as one shard and records the last id read."""
+        if self.buffer:
+            self._write_shard()
+        if self.last_id != self.manifest['last_id']:
+            self.manifest['last_id'] = self.last_id
+            self._write_manifest()
+
+    def _write_shard(self):
+        states, actions, rewards, next_states, dones = zip(*self.buffer)
+        name = f'shard_{len(self.manifest["shards"]):05d}'
+        temporary = os.path.join(self.directory, name + '.tmp')
+        shutil.rmtree(temporary, ignore_errors=True)
+        os.makedirs(temporary)
+        for prefix, packed in (('states', self.codec.encode(np.stack(states))),
+                               ('next_states', self.codec.encode(np.stack(next_states)))):
+            for field, array in packed.items():
+                np.save(os.path.join(temporary, f'{prefix}_{field}.npy'), array)
+        np.save(os.path.join(temporary, 'actions.npy'), np.asarray(actions, dtype=np.uint8))
+        np.save(os.path.join(temporary, 'rewards.npy'), np.asarray(rewards, dtype=np.float32))
+        np.save(os.path.join(temporary, 'dones.npy'), np.asarray(dones, dtype=np.bool_))
+        os.replace(temporary, os.path.join(self.directory, name))
+
+        self.manifest['shards'].append({'name': name, 'transitions': len(self.buffer)})
+        self.manifest['hands'] += self.hands
+        self.buffer = []
+        self.hands = 0
+
+    def _write_manifest(self):
+        with open(self.manifest_path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+
+def build_dataset(database_url, directory='datasets/hand_histories', state_size=112, chunk_size=1000,
+                  shard_size=100000, report_interval=10000, resume=True):
+    """
+    Streams hand_histories into a sharded transition dataset.
+    Returns a dictionary with the number of hands, skipped rows and transitions.
+    """
+    engine = create_engine(database_url)
+    if not resume:
+        shutil.rmtree(directory, ignore_errors=True)
+    writer = ShardWriter(directory, state_size, shard_size)
+    start_after = writer.manifest['last_id'] if resume else 0
+    hands = skipped = transitions = 0
+    start = time.perf_counter()
+    for hand_id, hand_data in iter_hand_rows(engine, chunk_size, start_after):
+        try:
+            hand_transitions = replay_hand(json.loads(hand_data), state_size)
+        except (ValueError, KeyError, TypeError):
+            skipped += 1
+            writer.skip(hand_id)
+            continue
+        writer.add_hand(hand_id, hand_transitions)
+        hands += 1
+        transitions += len(hand_transitions)
+        if hands % report_interval == 0:
+            elapsed = time.perf_counter() - start
+            print(f"Hands: {hands} - Hands/s: {hands / elapsed:.0f} - Transitions: {transitions} - "
+                  f"Skipped: {skipped} - Last id: {hand_id}")
+    writer.flush()
+    engine.dispose()
+    elapsed = time.perf_counter() - start
+    print(f"Dataset complete: {hands} hands ({hands / max(elapsed, 1e-9):.0f} hands/s), "
+          f"{transitions} transitions, {skipped} skipped")
+    return {'hands': hands, 'skipped': skipped, 'transitions': transitions}
+
+
+class TransitionDataset:
+    """
+    Read-only view over the shards written by build_dataset.
+    Every shard is memory-mapped and decoded only when sampled. It offers the
+    sampling interface of ReplayBuffer, so DQNAgent(memory=TransitionDataset(...))
+    can pretrain on logged hands with agent.replay.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+        self.codec = StateCodec(manifest['state_size'], 0)
+        self.state_size = manifest['state_size']
+        self.shards = []
+        self.offsets = [0]
+        for shard in manifest['shards']:
+            path = os.path.join(directory, shard['name'])
+
+            def load(name):
+                return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+            fields = self.codec.empty(0)
+            self.shards.append({
+                'states': {field: load(f'states_{field}') for field in fields},
+                'next_states': {field: load(f'next_states_{field}') for field in fields},
+                'actions': load('actions'),
+                'rewards': load('rewards'),
+                'dones': load('dones'),
+            })
+            self.offsets.append(self.offsets[-1] + shard['transitions'])
+        self.size = self.offsets[-1]
+        self.capacity = self.size
+
+    def __len__(self):
+        return self.size
+
+    def sample_indices(self, batch_size):
+        return np.random.randint(0, self.size, size=batch_size)
+
+    def gather(self, indices, device='cpu'):
+        """Decodes the transitions at the given global indices into dense tensors."""
+        indices = np.asarray(indices)
+        states = np.empty((len(indices), self.state_size), dtype=np.float32)
+        next_states = np.empty_like(states)
+        actions = np.empty(len(indices), dtype=np.int64)
+        rewards = np.empty(len(indices), dtype=np.float32)
+        dones = np.empty(len(indices), dtype=np.float32)
+        shard_ids = np.searchsorted(self.offsets, indices, side='right') - 1
+        for shard_id in np.unique(shard_ids):
+            rows = np.flatnonzero(shard_ids == shard_id)
+            local = indices[rows] - self.offsets[shard_id]
+            shard = self.shards[shard_id]
+            states[rows] = self.codec.decode(shard['states'], local)
+            next_states[rows] = self.codec.decode(shard['next_states'], local)
+            actions[rows] = shard['actions'][local]
+            rewards[rows] = shard['rewards'][local]
+            dones[rows] = shard['dones'][local]
+        return tuple(torch.from_numpy(array).to(device) for array in (states, actions, rewards, next_states, dones))
+
+    def sample(self, batch_size, device='cpu'):
+        return self.gather(self.sample_indices(batch_size), device)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build an offline transition dataset from hand_histories.')
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help='SQLAlchemy URL of the poker_game database (defaults to $DATABASE_URL)')
+    parser.add_argument('--directory', default='datasets/hand_histories')
+    parser.add_argument('--state-size', type=int, default=112)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--shard-size', type=int, default=100000)
+    parser.add_argument('--restart', action='store_true', help='Ignore the manifest and read from the first row')
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error('--database-url or DATABASE_URL is required')
+    build_dataset(args.database_url, args.directory, args.state_size, args.chunk_size, args.shard_size,
+                  resume=not args.restart)
@@ -0,0 +1,162 @@
+# opponent_model.py
+
+import numpy as np
+
+# Columns of the per-player counter table
+HANDS = 0  # Hands dealt
+VPIP = 1  # Hands where money was put in voluntarily before the flop
+PFR = 2  # Hands raised before the flop
+AGGRESSIVE = 3  # Bets and raises
+PASSIVE = 4  # Calls
+FACED_RAISE = 5  # Decisions taken while facing a raise
+FOLDED_TO_RAISE = 6  # Folds while facing a raise
+SAW_FLOP = 7  # Hands that reached the flop
+SHOWDOWNS = 8  # Hands that went to showdown
+NUM_COUNTERS = 9
+
+# Per-hand flags, so each hand counts at most once per statistic
+_FLAG_VPIP = 1
+_FLAG_PFR = 2
+_FLAG_SAW_FLOP = 4
+
+# Features appended to the bot state: VPIP, PFR, aggression, fold to raise, showdown frequency
+NUM_FEATURES = 5
+
+
+class OpponentTracker:
+    """
+    Keeps running statistics for every player seen at the table.
+    Each player owns one fixed-size row of counters, so updates are O(1) and memory
+    grows with the number of players, never with the number of hands.
+    With decay set, counters fade by that factor per hand the player is dealt into,
+    so recent behaviour weighs more than old history.
+    """
+
+    def __init__(self, capacity=64, decay=None):
+        self.decay = decay
+        self.rows = {}  # Player name -> row in the counter table
+        self.counters = np.zeros((capacity, NUM_COUNTERS), dtype=np.float64)
+        self.hand_flags = np.zeros(capacity, dtype=np.uint8)
+
+    def _row(self, player):
+        """Returns the counter row of a player, allocating one on first sight."""
+        row = self.rows.get(player.name)
+        if row is None:
+            row = len(self.rows)
+            if row == len(self.counters):
+                # Double the table so allocation stays amortised O(1)
+                self.counters = np.concatenate([self.counters, np.zeros_like(self.counters)])
+                self.hand_flags = np.concatenate([self.hand_flags, np.zeros_like(self.hand_flags)])
+            self.rows[player.name] = row
+        return row
+
+    def start_hand(self, players):
+        """Registers a new hand for every player dealt in."""
+        for player in players:
+            row = self._row(player)
+            if self.decay is not None:
+                self.counters[row] *= self.decay
+            self.counters[row, HANDS] += 1
+            self.hand_flags[row] = 0
+
+    def record_action(self, player, action, game_phase, facing_raise):
+        """Updates the counters of a player for one action, before it is applied."""
+        row = self._row(player)
+        counters = self.counters[row]
+        flags = self.hand_flags[row]
+
+        if game_phase == 'flop':
+            flags = self._see_flop(row)
+
+        if facing_raise:
+            counters[FACED_RAISE] += 1
+            if action == 'fold':
+                counters[FOLDED_TO_RAISE] += 1
+
+        if action == 'raise':
+            counters[AGGRESSIVE] += 1
+        elif action == 'call':
+            counters[PASSIVE] += 1
+
+        if game_phase == 'pre-flop' and action in ('call', 'raise'):
+            if not flags & _FLAG_VPIP:
+                counters[VPIP] += 1
+                flags |= _FLAG_VPIP
+            if action == 'raise' and not flags & _FLAG_PFR:
+                counters[PFR] += 1
+                flags |= _FLAG_PFR
+
+        self.hand_flags[row] = flags
+
+    def record_flop(self, players):
+        """Counts the flop as seen for every player still in the hand, including those all-in."""
+        for player in players:
+            self._see_flop(self._row(player))
+
+    def record_showdown(self, players):
+        """
+        Counts a showdown for every player still in the hand. A showdown implies
+        the flop was seen, so showdown frequency never exceeds 1 even when the
+        flop was dealt without record_flop.
+        """
+        for player in players:
+            row = self._row(player)
+            self._see_flop(row)
+            self.counters[row, SHOWDOWNS] += 1
+
+    def _see_flop(self, row):
+        """Counts the flop for a row once per hand and returns its updated flags."""
+        flags = self.hand_flags[row]
+        if not flags & _FLAG_SAW_FLOP:
+            self.counters[row, SAW_FLOP] += 1
+            flags |= _FLAG_SAW_FLOP
+            self.hand_flags[row] = flags
+        return flags
+
+    def stats(self, player):
+        """Returns the raw statistics of a player as a dictionary."""
+        counters = self._counters(player)
+        return {
+            'hands': float(counters[HANDS]),
+            'vpip': self._ratio(counters, VPIP, HANDS),
+            'pfr': self._ratio(counters, PFR, HANDS),
+            'aggression_factor': self._ratio(counters, AGGRESSIVE, PASSIVE),
+            'fold_to_raise': self._ratio(counters, FOLDED_TO_RAISE, FACED_RAISE),
+            'showdown_frequency': self._ratio(counters, SHOWDOWNS, SAW_FLOP),
+        }
+
+    def features(self, player):
+        """
+        Returns the statistics of a player as a NUM_FEATURES vector in [0, 1].
+        The aggression factor is squashed to af / (1 + af) to keep it bounded.
+        """
+        counters = self._counters(player)
+        aggression = self._ratio(counters, AGGRESSIVE, PASSIVE)
+        return np.array([
+            self._ratio(counters, VPIP, HANDS),
+            self._ratio(counters, PFR, HANDS),
+            aggression / (1 + aggression),
+            self._ratio(counters, FOLDED_TO_RAISE, FACED_RAISE),
+            self._ratio(counters, SHOWDOWNS, SAW_FLOP),
+        ], dtype=np.float32)
+
+    def opponent_features(self, player, players):
+        """Returns the average features of the active opponents of a player."""
+        opponents = [other for other in players if other is not player and other.is_active]
+        if not opponents:
+            return np.zeros(NUM_FEATURES, dtype=np.float32)
+        return np.mean([self.features(opponent) for opponent in opponents], axis=0)
+
+    def _counters(self, player):
+        """Returns the counter row of a player, or zeros for an unknown player."""
+        row = self.rows.get(player.name)
+        if row is None:
+            return np.zeros(NUM_COUNTERS, dtype=np.float64)
+        return self.counters[row]
+
+    @staticmethod
+    def _ratio(counters, numerator, denominator):
+        """Divides two counters, returning 0 when there is no data yet."""
+        if counters[denominator] == 0:
+            return 0.0
+        return float(counters[numerator] / counters[denominator])
@@ -1,12 +1,18 @@
 # poker_bot.py
 
 import random
+import time
 from player import Player
 from dqn_agent import DQNAgent
+from decision_budget import DecisionBudget, DecisionMetrics
+from equity import heuristic_strength, estimate_equity
+from hand_evaluator import card_to_index
 import numpy as np
+import torch
 
 class PokerBot(Player):
-    def __init__(self, name, chips=1000, state_size=200, action_size=3, device='cpu'):
+    def __init__(self, name, chips=1000, state_size=200, action_size=3, device='cpu',
+                 decision_budget=0.05, equity_refinement=True, decision_metrics=None):
         super().__init__(name, chips)
         self.state_size = state_size  # Size of the encoded game state vector
         self.action_size = action_size  # Number of possible actions
@@ -23,6 +29,13 @@ class PokerBot(Player):
             1: 'call',
             2: 'raise'
         }
+        # Time allowed for each live decision, in seconds
+        self.decision_budget = decision_budget
+        self.equity_refinement = equity_refinement  # Refine with sampled equity when time allows
+        self.min_equity_samples = 50  # Fewer samples than this are too noisy to trust
+        self.raise_threshold = 0.75  # Strength or equity above which the bot raises
+        self.decision_metrics = decision_metrics if decision_metrics else DecisionMetrics()
+        self.opponent_tracker = None  # Optional OpponentTracker whose stats are appended to the state
 
     def make_decision(self, game_logic):
         """
@@ -35,6 +48,77 @@ class PokerBot(Player):
         action = self.action_map.get(action_index, 'fold')
         return action
 
+    def decide_action(self, game_logic, budget=None):
+        """
+        Decides an action for live play within a time budget.
+        Escalates from a cheap strength heuristic to the network and then to sampled
+        equity, skipping any tier whose expected cost no longer fits, and returns the
+        best answer available when time runs out.
+        """
+        budget = DecisionBudget(self.decision_budget if budget is None else budget)
+        metrics = self.decision_metrics
+
+        # Tier 1: cheap heuristic, always available
+        action = self.heuristic_action(game_logic)
+        tier = 'heuristic'
+
+        # Tier 2: the trained network
+        if budget.can_afford(metrics.tier_costs['network']):
+            started = time.perf_counter()
+            action = self.network_action(game_logic)
+            tier = 'network'
+            metrics.record_tier_cost('network', time.perf_counter() - started)
+
+        # Tier 3: sampled equity refinement until the deadline
+        if self.equity_refinement and budget.can_afford(metrics.tier_costs['equity']):
+            started = time.perf_counter()
+            num_opponents = max(1, sum(
+                1 for player in game_logic.players if player is not self and player.is_active
+            ))
+            equity, samples = estimate_equity(
+                self.hand, game_logic.community_cards, num_opponents,
+                deadline=budget.deadline
+            )
+            if samples >= self.min_equity_samples:
+                action = self.action_from_strength(equity, game_logic)
+                tier = 'equity'
+            # Track the cost of the minimum useful sample count, not of the whole window
+            elapsed = time.perf_counter() - started
+            if samples:
+                metrics.record_tier_cost('equity', elapsed * self.min_equity_samples / samples)
+
+        metrics.record_decision(tier, budget.elapsed(), budget.seconds)
+        return action
+
+    def heuristic_action(self, game_logic):
+        """
+        Picks an action from the Chen formula or the made-hand rank.
+        """
+        strength = heuristic_strength(self.hand, game_logic.community_cards)
+        return self.action_from_strength(strength, game_logic)
+
+    def network_action(self, game_logic):
+        """
+        Picks the greedy action of the DQN agent, without exploration.
+        """
+        state = torch.from_numpy(self.encode_game_state(game_logic)).to(self.agent.device)
+        self.agent.model.eval()
+        with torch.no_grad():
+            q_values = self.agent.model(state)
+        return self.action_map.get(int(torch.argmax(q_values).item()), 'fold')
+
+    def action_from_strength(self, strength, game_logic):
+        """
+        Maps a strength or equity estimate in [0, 1] to an action using pot odds.
+        """
+        call_amount = max(game_logic.current_bet - self.current_bet, 0)
+        pot_odds = call_amount / (game_logic.pot + call_amount) if call_amount else 0.0
+        if strength >= self.raise_threshold:
+            return 'raise'
+        if strength >= pot_odds:
+            return 'call'
+        return 'fold'
+
     def encode_game_state(self, game_logic):
         """
         Encodes the current game state into a numerical vector suitable for the DQN agent.
@@ -50,12 +134,11 @@ class PokerBot(Player):
         # Encode game phase
         phase = self.encode_phase(game_logic.game_phase)  # 5-dimensional one-hot vector
         # Combine all features into a single state vector
-        state_vector = np.concatenate([
-            own_cards,
-            community_cards,
-            [pot_size, current_bet, chips],
-            phase
-        ])
+        features = [own_cards, community_cards, [pot_size, current_bet, chips], phase]
+        if self.opponent_tracker:
+            # Average VPIP, PFR, aggression, fold to raise and showdown frequency of opponents
+            features.append(self.opponent_tracker.opponent_features(self, game_logic.players))
+        state_vector = np.concatenate(features)
         # Ensure the state vector has the correct size
         state_vector = np.resize(state_vector, self.state_size)
         # Convert to NumPy array of type float32
@@ -75,15 +158,7 @@ class PokerBot(Player):
         """
         Returns a unique index for a given card.
         """
-        suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-        values = [
-            '2', '3', '4', '5', '6', '7', '8', '9', '10',
-            'Jack', 'Queen', 'King', 'Ace'
-        ]
-        suit_index = suits.index(card['suit'])
-        value_index = values.index(card['value'])
-        card_index = suit_index * 13 + value_index
-        return card_index
+        return card_to_index(card)
 
     def encode_phase(self, phase):
         """
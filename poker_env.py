@@ -14,7 +14,7 @@ class PokerEnv(gym.Env):
 
     metadata = {'render.modes': ['human']}
 
-    def __init__(self):
+    def __init__(self, verbose=False, initial_chips=1000):
         super(PokerEnv, self).__init__()
         # Define action and observation space
         # Actions: fold=0, call=1, raise=2
@@ -27,22 +27,29 @@ class PokerEnv(gym.Env):
         )
 
         # Initialize the game logic
-        self.game_logic = GameLogic()
+        self.game_logic = GameLogic(initial_chips=initial_chips)
+        self.game_logic.verbose = verbose  # Training runs silently unless asked otherwise
         # Add players: the AI agent and opponents
-        self.agent_player = PokerBot(name="Agent", chips=1000)
-        self.opponent = PokerBot(name="Opponent", chips=1000)
+        self.agent_player = PokerBot(name="Agent", chips=initial_chips, state_size=self.state_size)
+        self.opponent = PokerBot(name="Opponent", chips=initial_chips, state_size=self.state_size)
         self.game_logic.add_player(self.agent_player)
         self.game_logic.add_player(self.opponent)
+        self.metrics = None  # Optional TrainingMetrics timing state encoding
         # Initialize game state
         self.current_player_index = 0  # Index of the current player
 
     def reset(self):
         """
         Resets the environment to an initial state and returns an initial observation.
+        Each episode is one hand: stacks are refilled, cards dealt and blinds posted,
+        and the agent then acts through step().
         """
-        self.game_logic.start_game()
+        for player in self.game_logic.players:
+            player.chips = self.game_logic.initial_chips
+        self.game_logic.shuffle_and_deal()
+        self.game_logic.prepare_round()
         self.current_player_index = 0
-        state = self.agent_player.encode_game_state(self.game_logic)
+        state = self.observe()
         return state
 
     def step(self, action):
@@ -53,19 +60,18 @@ class PokerEnv(gym.Env):
         action_map = {0: 'fold', 1: 'call', 2: 'raise'}
         action_str = action_map.get(action, 'fold')
 
-        # Save the current state
-        state = self.agent_player.encode_game_state(self.game_logic)
-
         # Process the agent's action
         self.game_logic.process_player_action(self.agent_player, action_str)
 
-        # Process the opponent's action (random for simplicity)
-        if self.opponent.is_active and not self.opponent.is_all_in:
+        # Process the opponent's action, unless the agent folded and the hand is over
+        hand_continues = self.agent_player.is_active
+        if hand_continues and self.opponent.is_active and not self.opponent.is_all_in:
             opponent_action = self.opponent.make_decision(self.game_logic)
             self.game_logic.process_player_action(self.opponent, opponent_action)
 
-        # Advance the game phase if needed
-        if self.game_logic.all_bets_equal(self.game_logic.players):
+        # Advance the game phase if needed, while both players are still in the hand
+        hand_continues = self.agent_player.is_active and self.opponent.is_active
+        if hand_continues and self.game_logic.all_bets_equal(self.game_logic.players):
             if self.game_logic.game_phase == 'pre-flop':
                 self.game_logic.game_phase = 'flop'
                 self.game_logic.deal_community_cards(3)
@@ -80,13 +86,13 @@ class PokerEnv(gym.Env):
                 self.game_logic.showdown()
                 done = True
                 reward = self.calculate_reward()
-                next_state = self.agent_player.encode_game_state(self.game_logic)
+                next_state = self.observe()
                 return next_state, reward, done, {}
             else:
                 pass  # Game continues
 
         # Get the next state
-        next_state = self.agent_player.encode_game_state(self.game_logic)
+        next_state = self.observe()
 
         # Check if the game is over
         done = not self.agent_player.is_active or not self.opponent.is_active
@@ -96,6 +102,17 @@ class PokerEnv(gym.Env):
 
         return next_state, reward, done, {}
 
+    def observe(self):
+        """
+        Encodes the agent's view of the game as the observation vector.
+        """
+        if self.metrics is None:
+            return self.agent_player.encode_game_state(self.game_logic)
+        self.metrics.start('encode')
+        state = self.agent_player.encode_game_state(self.game_logic)
+        self.metrics.stop()
+        return state
+
     def calculate_reward(self):
         """
         Calculates the reward for the agent based on the game outcome.
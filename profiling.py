@@ -0,0 +1,304 @@
+# profiling.py
+
+import atexit
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+# Subsystems a frame is attributed to, matched on its file (and function for encoding)
+SUBSYSTEMS = ['evaluator', 'engine', 'encoding', 'torch', 'database']
+EVALUATOR_FILES = {'hand_evaluator.py', 'equity.py', 'hand_range.py', 'card_abstraction.py', 'icm.py'}
+ENGINE_FILES = {'game_logic.py', 'game_engine.py', 'player.py', 'poker_bot.py', 'poker_env.py', 'vec_env.py',
+                'arena.py', 'evaluation.py', 'search_bot.py', 'decision_budget.py'}
+ENCODING_FILES = {'transition_codec.py', 'replay_buffer.py', 'opponent_model.py'}
+ENCODING_FUNCTIONS = {'encode_game_state', 'encode_cards', 'encode_phase', 'get_card_index', 'observe'}
+TORCH_FILES = {'dqn_agent.py'}
+DATABASE_FILES = {'models.py', 'offline_dataset.py'}
+DATABASE_PACKAGES = ('sqlalchemy', 'flask_sqlalchemy', 'pymysql', 'sqlite3')
+# Leaf frames of threads that are only waiting
+IDLE_FILES = {'threading.py', 'selectors.py', 'queue.py', 'socketserver.py', 'connection.py'}
+
+# Environment variables read by start_from_env and the --profile defaults
+ENV_MODE = 'POKER_PROFILE'  # 'sample' or 'cprofile'
+ENV_DIRECTORY = 'POKER_PROFILE_DIR'
+ENV_SECONDS = 'POKER_PROFILE_SECONDS'
+ENV_INTERVAL = 'POKER_PROFILE_INTERVAL'
+
+def classify(filename, function):
+    """Returns the subsystem of a frame, or None if it belongs to none of them."""
+    path = filename.replace('\\', '/')
+    name = os.path.basename(path)
+    if function in ENCODING_FUNCTIONS and name in ENGINE_FILES:
+        return 'encoding'
+    if name in EVALUATOR_FILES:
+        return 'evaluator'
+    if name in ENCODING_FILES:
+        return 'encoding'
+    if name in ENGINE_FILES:
+        return 'engine'
+    if name in TORCH_FILES or '/torch/' in path or (name == '~' and 'torch.' in function):
+        return 'torch'
+    if name in DATABASE_FILES or any(f'/{package}/' in path for package in DATABASE_PACKAGES):
+        return 'database'
+    return None
+
+
+def stack_subsystem(frames):
+    """Subsystem of a stack: that of the innermost frame belonging to one, else 'other'."""
+    for filename, function in reversed(frames):
+        subsystem = classify(filename, function)
+        if subsystem:
+            return subsystem
+    return 'other'
+
+
+def frame_label(filename, function):
+    name = os.path.basename(filename)
+    return f"{name[:-3] if name.endswith('.py') else name}:{function}"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the stacks of every other thread from a
+    background thread every interval seconds, so the profiled code runs without
+    any tracing hooks. Stacks are kept in collapsed form ("frame;frame;frame")
+    under their subsystem, ready for flamegraph.pl or speedscope.
+    Threads that are only waiting on a lock, socket or queue are skipped. The
+    sampler needs the GIL to run, so calls that release it (socket writes, large
+    torch or NumPy kernels) are sampled somewhat more often than pure Python code.
+    """
+
+    def __init__(self, interval=0.005, include_idle=False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks = Counter()  # (subsystem, collapsed stack) -> samples
+        self.samples = 0
+        self.thread = None
+        self.running = threading.Event()
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        self.running.set()
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.running.clear()
+            self.thread.join()
+            self.thread = None
+            self.elapsed += time.perf_counter() - self.started
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while self.running.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.sample(frame)
+            time.sleep(self.interval)
+
+    def sample(self, frame):
+        """Records one stack, given its innermost frame."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append((code.co_filename, getattr(code, 'co_qualname', code.co_name)))
+            frame = frame.f_back
+        frames.reverse()
+        if not frames:
+            return
+        if not self.include_idle and os.path.basename(frames[-1][0]) in IDLE_FILES:
+            return
+        collapsed = ';'.join(frame_label(filename, function) for filename, function in frames)
+        self.stacks[(stack_subsystem(frames), collapsed)] += 1
+        self.samples += 1
+
+    def collapsed_lines(self):
+        """Collapsed stacks rooted at their subsystem, one "stack count" line each."""
+        return [f"{subsystem};{stack} {count}" for (subsystem, stack), count in self.stacks.most_common()]
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.collapsed_lines()) + '\n')
+
+    def subsystem_totals(self):
+        totals = Counter()
+        for (subsystem, _), count in self.stacks.items():
+            totals[subsystem] += count
+        return totals
+
+    def top(self, n=20):
+        """
+        Hottest functions as (label, subsystem, self samples, inclusive samples),
+        sorted by self samples.
+        """
+        own = Counter()
+        inclusive = Counter()
+        for (subsystem, stack), count in self.stacks.items():
+            frames = stack.split(';')
+            own[(frames[-1], subsystem)] += count
+            for label in set(frames):
+                inclusive[label] += count
+        return [(label, subsystem, count, inclusive[label]) for (label, subsystem), count in own.most_common(n)]
+
+    def report(self, n=20):
+        total = max(self.samples, 1)
+        lines = [f"Sampling profile: {self.samples} samples over {self.elapsed:.1f}s"]
+        for subsystem, count in self.subsystem_totals().most_common():
+            lines.append(f"  {subsystem:<10}{100 * count / total:6.1f}%")
+        lines.append(f"{'Self %':>7}{'Total %':>9}  {'Subsystem':<10}Function")
+        for label, subsystem, count, inclusive in self.top(n):
+            lines.append(f"{100 * count / total:7.1f}{100 * inclusive / total:9.1f}  {subsystem:<10}{label}")
+        return '\n'.join(lines)
+
+
+class CProfileSession:
+    """
+    Deterministic profile of the calling thread with cProfile, from start() to
+    stop(). cProfile records caller/callee pairs rather than whole stacks, so this mode
+    writes a .prof file for pstats or snakeviz instead of collapsed stacks.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.active = False
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        self.profiler.enable()
+        self.active = True
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self.active:
+            self.profiler.disable()
+            self.active = False
+            self.elapsed += time.perf_counter() - self.started
+
+    def stats(self):
+        return pstats.Stats(self.profiler)
+
+    def top(self, n=20):
+        """Hottest functions as (label, subsystem, own seconds, cumulative seconds, calls)."""
+        rows = []
+        for (filename, _, function), (_, calls, own, cumulative, _) in self.stats().stats.items():
+            rows.append((frame_label(filename, function), classify(filename, function) or 'other',
+                         own, cumulative, calls))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:n]
+
+    def subsystem_totals(self):
+        totals = Counter()
+        for (filename, _, function), (_, _, own, _, _) in self.stats().stats.items():
+            totals[classify(filename, function) or 'other'] += own
+        return totals
+
+    def report(self, n=20):
+        totals = self.subsystem_totals()
+        total = sum(totals.values()) or 1.0
+        lines = [f"cProfile: {total:.2f}s of profiled time over {self.elapsed:.1f}s"]
+        for subsystem, seconds in totals.most_common():
+            lines.append(f"  {subsystem:<10}{100 * seconds / total:6.1f}%")
+        lines.append(f"{'Own s':>8}{'Cum s':>9}{'Calls':>10}  {'Subsystem':<10}Function")
+        for label, subsystem, own, cumulative, calls in self.top(n):
+            lines.append(f"{own:8.3f}{cumulative:9.3f}{calls:10d}  {subsystem:<10}{label}")
+        return '\n'.join(lines)
+
+
+def write_profile(profile, directory, name, top=30):
+    """Writes the top-N report, plus collapsed stacks or a .prof file. Returns the paths written."""
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, f'{name}-{os.getpid()}')
+    report = profile.report(top)
+    paths = [prefix + '-top.txt']
+    with open(paths[0], 'w') as f:
+        f.write(report + '\n')
+    if isinstance(profile, SamplingProfiler):
+        paths.append(prefix + '.collapsed')
+        profile.write_collapsed(paths[1])
+    else:
+        paths.append(prefix + '.prof')
+        profile.stats().dump_stats(paths[1])
+    print(report)
+    print(f"Profile written to {', '.join(paths)}")
+    return paths
+
+
+def start_profiling(mode, name, directory='profiles', seconds=None, interval=0.005):
+    """
+    Starts a profiler and writes its output when it finishes: after seconds when
+    given, otherwise at interpreter exit. mode is 'sample' or 'cprofile'; a
+    cProfile window is ended by SIGALRM, so it must be started on the main thread
+    and otherwise runs until exit.
+    Returns the profiler.
+    """
+    if mode == 'sample':
+        profile = SamplingProfiler(interval).start()
+    elif mode == 'cprofile':
+        profile = CProfileSession().start()
+    else:
+        raise ValueError(f"Unknown profiling mode {mode}")
+    written = []
+
+    def finish():
+        if not written:
+            profile.stop()
+            written.extend(write_profile(profile, directory, name))
+
+    atexit.register(finish)
+    if seconds and mode == 'sample':
+        timer = threading.Timer(seconds, finish)
+        timer.daemon = True
+        timer.start()
+    elif seconds and threading.current_thread() is threading.main_thread() and hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, lambda signum, frame: finish())
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+    return profile
+
+
+def start_from_env(name, threaded=False):
+    """
+    Starts profiling if POKER_PROFILE is set; returns the profiler or None.
+    Pass threaded=True when the work runs on threads other than the caller's,
+    e.g. a web server's request threads: cProfile only sees the calling thread,
+    so a cprofile request falls back to sampling, which covers every thread.
+    """
+    mode = os.environ.get(ENV_MODE)
+    if not mode:
+        return None
+    if threaded and mode == 'cprofile':
+        print(f"{ENV_MODE}=cprofile only profiles the calling thread; sampling all threads of {name} instead")
+        mode = 'sample'
+    seconds = os.environ.get(ENV_SECONDS)
+    return start_profiling(
+        mode, name, os.environ.get(ENV_DIRECTORY, 'profiles'),
+        float(seconds) if seconds else None, float(os.environ.get(ENV_INTERVAL, 0.005))
+    )
+
+
+def add_profile_arguments(parser):
+    """Adds --profile, --profile-seconds and --profile-dir, defaulting to the environment variables."""
+    seconds = os.environ.get(ENV_SECONDS)
+    parser.add_argument('--profile', choices=['sample', 'cprofile'], default=os.environ.get(ENV_MODE) or None,
+                        help=f'Profile this run (also enabled by {ENV_MODE})')
+    parser.add_argument('--profile-seconds', type=float, default=float(seconds) if seconds else None,
+                        help='Stop profiling after this many seconds instead of at exit')
+    parser.add_argument('--profile-dir', default=os.environ.get(ENV_DIRECTORY, 'profiles'))
+
+
+def start_from_args(args, name):
+    """Starts profiling when --profile was given."""
+    if not args.profile:
+        return None
+    return start_profiling(args.profile, name, args.profile_dir, args.profile_seconds,
+                           float(os.environ.get(ENV_INTERVAL, 0.005)))
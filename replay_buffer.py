@@ -0,0 +1,436 @@
+# replay_buffer.py
+
+import os
+from contextlib import contextmanager
+import numpy as np
+import torch
+from transition_codec import StateCodec
+
+class ReplayBuffer:
+    """
+    Experience replay buffer backed by preallocated contiguous NumPy arrays.
+    Transitions are written at a cursor that wraps around once the buffer is full,
+    and sampling gathers whole batches with index arrays, so the cost of a sample
+    does not depend on how many transitions are stored.
+    """
+
+    def __init__(self, capacity, state_size):
+        self.capacity = capacity
+        self.state_size = state_size
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.cursor = 0  # Index of the next write
+        self.size = 0  # Number of valid transitions
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """Total memory held by the buffer arrays, known at construction time."""
+        return sum(array.nbytes for array in (self.states, self.actions, self.rewards, self.next_states, self.dones))
+
+    def add(self, state, action, reward, next_state, done):
+        """Stores one transition, overwriting the oldest once the buffer is full."""
+        index = self.cursor
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.dones[index] = done
+        self.cursor = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Stores several transitions with one vectorised write; returns their indices."""
+        indices = (self.cursor + np.arange(len(actions))) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones
+        self.cursor = (self.cursor + len(actions)) % self.capacity
+        self.size = min(self.size + len(actions), self.capacity)
+        return indices
+
+    def sample_indices(self, batch_size):
+        """Draws batch_size indices of stored transitions uniformly, with replacement."""
+        return np.random.randint(0, self.size, size=batch_size)
+
+    def gather(self, indices, device='cpu'):
+        """
+        Returns the transitions at the given indices as batched tensors
+        (states, actions, rewards, next_states, dones).
+        """
+        return (
+            torch.from_numpy(self.states[indices]).to(device),
+            torch.from_numpy(self.actions[indices]).to(device),
+            torch.from_numpy(self.rewards[indices]).to(device),
+            torch.from_numpy(self.next_states[indices]).to(device),
+            torch.from_numpy(self.dones[indices]).to(device),
+        )
+
+    def sample(self, batch_size, device='cpu'):
+        """Samples a uniform batch of transitions as tensors."""
+        return self.gather(self.sample_indices(batch_size), device)
+
+    def state_dict(self):
+        """Copies the stored transitions and write position, e.g. for a checkpoint."""
+        return {
+            'cursor': self.cursor,
+            'size': self.size,
+            'states': self.states[:self.size].copy(),
+            'actions': self.actions[:self.size].copy(),
+            'rewards': self.rewards[:self.size].copy(),
+            'next_states': self.next_states[:self.size].copy(),
+            'dones': self.dones[:self.size].copy(),
+        }
+
+    def load_state_dict(self, state):
+        """Restores transitions copied by state_dict."""
+        size = state['size']
+        if size > self.capacity:
+            raise ValueError(f"Checkpoint holds {size} transitions, more than the capacity {self.capacity}")
+        for name in ('states', 'actions', 'rewards', 'next_states', 'dones'):
+            getattr(self, name)[:size] = state[name]
+        self.cursor = state['cursor'] % self.capacity
+        self.size = size
+
+
+class CompactReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer that keeps states bit-packed with StateCodec: about 50 bytes per
+    transition instead of two dense float32 vectors. Sampled batches are decoded
+    into dense tensors, so the agent sees the same shapes as with ReplayBuffer.
+    extra_features is the number of features PokerBot appends after the core
+    state (opponent statistics); left as None, it is read from the first states
+    stored (see StateCodec) and the storage for them is allocated then.
+    """
+
+    def __init__(self, capacity, state_size, extra_features=None):
+        self.capacity = capacity
+        self.state_size = state_size
+        self.codec = StateCodec(state_size, extra_features)
+        self.states = self.codec.empty(capacity)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = self.codec.empty(capacity)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.cursor = 0
+        self.size = 0
+
+    @property
+    def nbytes(self):
+        return (self.codec.nbytes(self.states) + self.codec.nbytes(self.next_states)
+                + self.actions.nbytes + self.rewards.nbytes + self.dones.nbytes)
+
+    def _write(self, indices, states, actions, rewards, next_states, dones):
+        for storage, packed in ((self.states, self.codec.encode(states)),
+                                (self.next_states, self.codec.encode(next_states))):
+            self._match_layout(storage)
+            for name, array in packed.items():
+                storage[name][indices] = array
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.dones[indices] = dones
+
+    def add(self, state, action, reward, next_state, done):
+        self._write([self.cursor], state, action, reward, next_state, done)
+        self.cursor = (self.cursor + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        indices = (self.cursor + np.arange(len(actions))) % self.capacity
+        self._write(indices, states, actions, rewards, next_states, dones)
+        self.cursor = (self.cursor + len(actions)) % self.capacity
+        self.size = min(self.size + len(actions), self.capacity)
+        return indices
+
+    def gather(self, indices, device='cpu'):
+        """Decodes the transitions at the given indices into dense batched tensors."""
+        return (
+            torch.from_numpy(self.codec.decode(self.states, indices)).to(device),
+            torch.from_numpy(self.actions[indices].astype(np.int64)).to(device),
+            torch.from_numpy(self.rewards[indices]).to(device),
+            torch.from_numpy(self.codec.decode(self.next_states, indices)).to(device),
+            torch.from_numpy(self.dones[indices].astype(np.float32)).to(device),
+        )
+
+    def state_dict(self):
+        return {
+            'cursor': self.cursor,
+            'size': self.size,
+            'states': {name: array[:self.size].copy() for name, array in self.states.items()},
+            'actions': self.actions[:self.size].copy(),
+            'rewards': self.rewards[:self.size].copy(),
+            'next_states': {name: array[:self.size].copy() for name, array in self.next_states.items()},
+            'dones': self.dones[:self.size].copy(),
+        }
+
+    def _match_layout(self, storage):
+        """Reallocates the extras once the codec has learned how many there are; nothing is stored before that."""
+        if storage['extras'].shape[1] != self.codec.extra_features:
+            storage['extras'] = np.zeros((self.capacity, self.codec.extra_features), dtype=np.float16)
+
+    def load_state_dict(self, state):
+        size = state['size']
+        if size > self.capacity:
+            raise ValueError(f"Checkpoint holds {size} transitions, more than the capacity {self.capacity}")
+        if self.codec.period is None:
+            self.codec.set_extra_features(state['states']['extras'].shape[1])
+        for storage, saved in ((self.states, state['states']), (self.next_states, state['next_states'])):
+            self._match_layout(storage)
+            for name, array in saved.items():
+                storage[name][:size] = array
+        self.actions[:size] = state['actions']
+        self.rewards[:size] = state['rewards']
+        self.dones[:size] = state['dones']
+        self.cursor = state['cursor'] % self.capacity
+        self.size = size
+
+
+class SumTree:
+    """
+    Binary tree whose leaves hold priorities and whose inner nodes hold the sum of
+    their children. Updates and prefix-sum lookups are O(log n) and are applied to
+    whole batches at once, one tree level at a time.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.leaf_offset = 1
+        while self.leaf_offset < capacity:
+            self.leaf_offset *= 2
+        # Node 1 is the root; leaves start at leaf_offset
+        self.nodes = np.zeros(2 * self.leaf_offset, dtype=np.float64)
+
+    @property
+    def total(self):
+        """Sum of all priorities."""
+        return self.nodes[1]
+
+    def update(self, indices, priorities):
+        """Sets the priorities of the given leaves and refreshes their ancestors."""
+        positions = np.asarray(indices, dtype=np.int64) + self.leaf_offset
+        self.nodes[positions] = priorities
+        positions = np.unique(positions // 2)
+        while positions[0] >= 1:
+            self.nodes[positions] = self.nodes[2 * positions] + self.nodes[2 * positions + 1]
+            if positions[0] == 1:
+                break
+            positions = np.unique(positions // 2)
+
+    def find(self, values):
+        """Returns, for each value, the leaf whose prefix-sum interval contains it."""
+        values = np.array(values, dtype=np.float64)
+        positions = np.ones(len(values), dtype=np.int64)
+        while positions[0] < self.leaf_offset:
+            left = 2 * positions
+            go_right = values > self.nodes[left]
+            values = np.where(go_right, values - self.nodes[left], values)
+            positions = left + go_right
+        return np.minimum(positions - self.leaf_offset, self.capacity - 1)
+
+    def get(self, indices):
+        """Returns the priorities of the given leaves."""
+        return self.nodes[np.asarray(indices, dtype=np.int64) + self.leaf_offset]
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer that samples transitions in proportion to priority ** alpha.
+    New transitions get the highest priority seen so far so they are replayed at
+    least once. Samples carry importance-sampling weights whose exponent beta is
+    annealed from beta_start to 1 over beta_steps samples.
+    """
+
+    def __init__(self, capacity, state_size, alpha=0.6, beta_start=0.4, beta_steps=100000, epsilon=1e-5,
+                 **storage_kwargs):
+        # storage_kwargs reach the storage class, e.g. extra_features for CompactPrioritizedReplayBuffer
+        super().__init__(capacity, state_size, **storage_kwargs)
+        self.alpha = alpha
+        self.beta_start = beta_start
+        self.beta_steps = beta_steps
+        self.epsilon = epsilon  # Keeps every transition sampleable
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+        self.sample_count = 0
+
+    @property
+    def beta(self):
+        """Current importance-sampling exponent."""
+        progress = min(self.sample_count / self.beta_steps, 1.0)
+        return self.beta_start + progress * (1.0 - self.beta_start)
+
+    def add(self, state, action, reward, next_state, done):
+        index = self.cursor
+        super().add(state, action, reward, next_state, done)
+        self.tree.update([index], self.max_priority ** self.alpha)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        indices = super().add_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(indices, np.full(len(indices), self.max_priority ** self.alpha))
+        return indices
+
+    def sample_indices(self, batch_size):
+        """Draws one index from each of batch_size equal slices of the priority mass."""
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + np.random.rand(batch_size)) * segment
+        # Rounding can push the last value just past the filled leaves
+        return np.minimum(self.tree.find(values), self.size - 1)
+
+    def sample(self, batch_size, device='cpu'):
+        """
+        Samples a prioritised batch.
+        Returns (states, actions, rewards, next_states, dones, weights, indices); pass
+        the indices back to update_priorities once the TD errors are known.
+        """
+        indices = self.sample_indices(batch_size)
+        probabilities = self.tree.get(indices) / self.tree.total
+        weights = (self.size * probabilities) ** (-self.beta)
+        weights /= weights.max()
+        self.sample_count += 1
+        batch = self.gather(indices, device)
+        return batch + (torch.from_numpy(weights.astype(np.float32)).to(device), indices)
+
+    def update_priorities(self, indices, td_errors):
+        """Sets the priorities of sampled transitions from their absolute TD errors."""
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        # Later duplicates win, matching a sequential update
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def state_dict(self):
+        state = super().state_dict()
+        state['priorities'] = self.tree.get(np.arange(self.size))
+        state['max_priority'] = self.max_priority
+        state['sample_count'] = self.sample_count
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.tree = SumTree(self.capacity)
+        if self.size:
+            self.tree.update(np.arange(self.size), state['priorities'])
+        self.max_priority = state['max_priority']
+        self.sample_count = state['sample_count']
+
+
+class CompactPrioritizedReplayBuffer(PrioritizedReplayBuffer, CompactReplayBuffer):
+    """Prioritised sampling over bit-packed storage."""
+
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer kept in fixed-record memory-mapped files inside a directory.
+    A small header file holds the capacity, state size, cursor and size, so several
+    processes can open the same directory: appends take an exclusive file lock,
+    reads go straight to the shared mapping, and a restarted run picks up the
+    transitions collected before it stopped. Pickling the buffer (for example to
+    hand it to a worker process) only sends the directory path. The lock uses
+    fcntl, so the store is only available on POSIX systems.
+    """
+
+    _HEADER_FIELDS = 4  # capacity, state_size, cursor, size
+
+    def __init__(self, directory, capacity, state_size):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        header_path = os.path.join(directory, 'header.dat')
+        self._lock_file = open(os.path.join(directory, 'lock'), 'a+')
+        with self._locked():
+            # Checked under the lock, so only one process creates the store
+            exists = os.path.exists(header_path)
+            if exists:
+                self.header = np.memmap(header_path, dtype=np.int64, mode='r+', shape=(self._HEADER_FIELDS,))
+                if tuple(self.header[:2]) != (capacity, state_size):
+                    raise ValueError(
+                        f"Replay store in {directory} holds capacity {self.header[0]} and state size "
+                        f"{self.header[1]}, not {capacity} and {state_size}"
+                    )
+            mode = 'r+' if exists else 'w+'
+            self.capacity = capacity
+            self.state_size = state_size
+            self.states = self._open('states', np.float32, (capacity, state_size), mode)
+            self.actions = self._open('actions', np.int64, (capacity,), mode)
+            self.rewards = self._open('rewards', np.float32, (capacity,), mode)
+            self.next_states = self._open('next_states', np.float32, (capacity, state_size), mode)
+            self.dones = self._open('dones', np.float32, (capacity,), mode)
+            if not exists:
+                # The header goes last, so a store interrupted while being created is not mistaken for one
+                header = np.memmap(header_path + '.tmp', dtype=np.int64, mode='w+', shape=(self._HEADER_FIELDS,))
+                header[:2] = (capacity, state_size)
+                header.flush()
+                del header
+                os.replace(header_path + '.tmp', header_path)
+                self.header = np.memmap(header_path, dtype=np.int64, mode='r+', shape=(self._HEADER_FIELDS,))
+
+    def _open(self, name, dtype, shape, mode):
+        return np.memmap(os.path.join(self.directory, f'{name}.dat'), dtype=dtype, mode=mode, shape=shape)
+
+    @contextmanager
+    def _locked(self):
+        """Holds the exclusive lock shared by every process using the directory."""
+        import fcntl  # POSIX only; importing it here keeps the module importable on Windows
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @property
+    def cursor(self):
+        return int(self.header[2])
+
+    @cursor.setter
+    def cursor(self, value):
+        self.header[2] = value
+
+    @property
+    def size(self):
+        return int(self.header[3])
+
+    @size.setter
+    def size(self, value):
+        self.header[3] = value
+
+    def add(self, state, action, reward, next_state, done):
+        with self._locked():
+            super().add(state, action, reward, next_state, done)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Appends several transitions under a single lock acquisition."""
+        with self._locked():
+            return super().add_batch(states, actions, rewards, next_states, dones)
+
+    def view(self, start, stop):
+        """
+        Returns tensors over a contiguous slice of the store without copying;
+        they share memory with the mapped files.
+        """
+        return tuple(
+            torch.from_numpy(array[start:stop])
+            for array in (self.states, self.actions, self.rewards, self.next_states, self.dones)
+        )
+
+    def flush(self):
+        """Writes dirty pages back to the files."""
+        for array in (self.states, self.actions, self.rewards, self.next_states, self.dones, self.header):
+            array.flush()
+
+    def state_dict(self):
+        """The transitions already live on disk; flush them and record where."""
+        self.flush()
+        return {'directory': self.directory}
+
+    def load_state_dict(self, state):
+        pass
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'capacity': self.capacity, 'state_size': self.state_size}
+
+    def __setstate__(self, state):
+        self.__init__(state['directory'], state['capacity'], state['state_size'])
@@ -1,4 +1,6 @@
 from app import app
+from profiling import start_from_env
 
 if __name__ == '__main__':
+    start_from_env('webapp', threaded=True)  # Opt-in with POKER_PROFILE=sample; requests run on Flask's threads
     app.run()
@@ -0,0 +1,122 @@
+# search_bot.py
+
+import math
+import random
+from poker_bot import PokerBot
+from decision_budget import DecisionBudget
+
+class SearchBot(PokerBot):
+    """
+    Bot that decides by sampled rollouts from the current GameLogic state.
+    Each rollout deals the opponents fresh hole cards from the cards the bot cannot
+    see, plays the candidate action, lets everyone else follow a fast default policy
+    and runs the hand to showdown. Actions are chosen by UCB1 over the rollouts that
+    fit in the decision budget, so the number of rollouts per second sets how strong
+    the bot plays.
+    """
+
+    def __init__(self, name, chips=1000, exploration=1.0, **kwargs):
+        super().__init__(name, chips, **kwargs)
+        self.exploration = exploration  # UCB1 exploration constant
+        self.search_stats = {}  # Figures of the last search
+        self.total_rollouts = 0
+        self.total_search_seconds = 0.0
+
+    def decide_action(self, game_logic, budget=None):
+        """
+        Runs rollouts until the budget runs out and returns the action with the best
+        average chip result. Folding forfeits nothing beyond what is already in the pot,
+        so its value is exactly zero and it is never simulated.
+        """
+        budget = DecisionBudget(self.decision_budget if budget is None else budget)
+        root = game_logic.snapshot()
+        saved = (game_logic.verbose, game_logic.opponent_tracker, game_logic.range_tracker)
+        # Rollouts must neither print nor feed the trackers
+        game_logic.verbose = False
+        game_logic.opponent_tracker = None
+        game_logic.range_tracker = None
+
+        candidates = ['call', 'raise']
+        totals = {action: 0.0 for action in candidates}
+        visits = {action: 0 for action in candidates}
+        rollouts = 0
+        scale = max(game_logic.pot + self.chips, 1)  # Keeps rewards roughly within [-1, 1]
+        try:
+            while budget.remaining() > 0:
+                action = self._select(candidates, totals, visits, rollouts)
+                totals[action] += self._rollout(game_logic, root, action) / scale
+                visits[action] += 1
+                rollouts += 1
+        finally:
+            game_logic.restore(root)
+            game_logic.verbose, game_logic.opponent_tracker, game_logic.range_tracker = saved
+
+        elapsed = budget.elapsed()
+        self.total_rollouts += rollouts
+        self.total_search_seconds += elapsed
+        self.search_stats = {
+            'rollouts': rollouts,
+            'seconds': elapsed,
+            'rollouts_per_second': rollouts / elapsed if elapsed > 0 else 0.0,
+            'values': {action: totals[action] / visits[action] * scale
+                       for action in candidates if visits[action]},
+        }
+
+        if not all(visits.values()):
+            # Not enough time for a single rollout of every action
+            action = self.heuristic_action(game_logic)
+            tier = 'heuristic'
+        else:
+            values = {action: totals[action] / visits[action] for action in candidates}
+            values['fold'] = 0.0
+            action = max(values, key=values.get)
+            tier = 'search'
+        self.decision_metrics.record_decision(tier, budget.elapsed(), budget.seconds)
+        return action
+
+    def rollouts_per_second(self):
+        """Returns the average rollout rate over every search so far."""
+        if self.total_search_seconds == 0:
+            return 0.0
+        return self.total_rollouts / self.total_search_seconds
+
+    def _select(self, candidates, totals, visits, rollouts):
+        """Picks the next action to simulate with UCB1."""
+        for action in candidates:
+            if visits[action] == 0:
+                return action
+        log_total = math.log(rollouts)
+        return max(
+            candidates,
+            key=lambda action: totals[action] / visits[action]
+            + self.exploration * math.sqrt(log_total / visits[action])
+        )
+
+    def _rollout(self, game_logic, root, action):
+        """Plays one sampled continuation of the hand and returns the chip change."""
+        game_logic.restore(root)
+        chips_before = self.chips
+        others = [player for player in game_logic.players if player is not self]
+
+        # Deal the opponents new hole cards from every card the bot cannot see
+        unseen = game_logic.deck + [card for player in others for card in player.hand]
+        random.shuffle(unseen)
+        for player in others:
+            player.hand = [unseen.pop(), unseen.pop()]
+        game_logic.deck = unseen
+
+        game_logic.process_player_action(self, action)
+        for player in others:
+            if player.is_active and not player.is_all_in:
+                game_logic.process_player_action(player, self.default_policy(player, game_logic))
+
+        missing = 5 - len(game_logic.community_cards)
+        if missing > 0:
+            game_logic.deal_community_cards(missing)
+        game_logic.game_phase = 'showdown'
+        game_logic.showdown()
+        return self.chips - chips_before
+
+    def default_policy(self, player, game_logic):
+        """Fast policy for the other players during rollouts: always call."""
+        return 'call'
@@ -0,0 +1,177 @@
+# sweep.py
+
+import argparse
+import contextlib
+import csv
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import torch
+from checkpoint import atomic_save, load_checkpoint
+from dqn_agent import DQNAgent, configure_threads
+from poker_env import PokerEnv
+from training_loop import train_agent
+
+# Parameter -> ('log', low, high) for a log-uniform draw, or ('choice', options)
+SEARCH_SPACE = {
+    'learning_rate': ('log', 1e-4, 3e-3),
+    'gamma': ('choice', [0.9, 0.95, 0.99]),
+    'epsilon_decay': ('choice', [0.99, 0.995, 0.999]),
+    'hidden_size': ('choice', [64, 128, 256]),
+    'batch_size': ('choice', [32, 64, 128]),
+}
+
+RESULT_FIELDS = ['trial', 'rung', 'episodes', 'score', 'seconds', 'status'] + list(SEARCH_SPACE)
+
+def sample_config(rng, space=SEARCH_SPACE):
+    """Draws one configuration from the search space."""
+    config = {}
+    for name, spec in space.items():
+        if spec[0] == 'log':
+            config[name] = float(math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2]))))
+        else:
+            config[name] = spec[1][rng.randrange(len(spec[1]))]
+    return config
+
+
+def evaluate_policy(agent, episodes, seed=0):
+    """Mean reward of the greedy policy over fresh PokerEnv hands."""
+    random.seed(seed)
+    np.random.seed(seed)
+    env = PokerEnv()
+    epsilon = agent.epsilon
+    agent.epsilon = 0.0
+    total = 0.0
+    for _ in range(episodes):
+        state = env.reset()
+        for _ in range(100):
+            state, reward, done, _ = env.step(agent.act(state))
+            total += reward
+            if done:
+                break
+    agent.epsilon = epsilon
+    return total / episodes
+
+
+def rung_seed(seed, trial, rung):
+    """Seed of one trial at one rung, so later rungs do not replay the random streams of the first."""
+    return int(np.random.SeedSequence([seed, trial, rung]).generate_state(1)[0])
+
+
+def run_rung(trial, config, episodes, directory, eval_episodes, seed, rung=0):
+    """
+    Continues one trial for the given number of episodes and scores it.
+    The trial's full training state is kept in its own directory between rungs,
+    so a promoted trial picks up where it stopped. At rung 0 the directory is
+    cleared, so a rerun into the same sweep directory starts every trial fresh.
+    """
+    configure_threads(1, 1)
+    trial_dir = os.path.join(directory, f'trial_{trial:03d}')
+    state_path = os.path.join(trial_dir, 'state.pt')
+    if rung == 0:
+        shutil.rmtree(trial_dir, ignore_errors=True)
+    trial_seed = rung_seed(seed, trial, rung)
+    random.seed(trial_seed)
+    np.random.seed(trial_seed)
+    torch.manual_seed(trial_seed)
+    env = PokerEnv()
+    agent = DQNAgent(
+        state_size=env.observation_space.shape[0], action_size=env.action_space.n,
+        learning_rate=config['learning_rate'], gamma=config['gamma'],
+        epsilon_decay=config['epsilon_decay'], hidden_size=config['hidden_size']
+    )
+    if rung > 0:
+        agent.load_training_state(load_checkpoint(state_path))
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        train_agent(env, agent, num_episodes=episodes, batch_size=config['batch_size'],
+                    save_interval=episodes + 1, model_save_path=os.path.join(trial_dir, 'model.pth'))
+    atomic_save(agent.training_state(), state_path)
+    score = evaluate_policy(agent, eval_episodes, seed)
+    return score, time.perf_counter() - start
+
+
+def successive_halving(num_trials=27, min_episodes=100, eta=3, max_rungs=None, eval_episodes=200,
+                       processes=None, directory='sweeps', seed=0):
+    """
+    Runs a sweep over SEARCH_SPACE with successive halving.
+    Every trial trains min_episodes episodes and is scored on greedy play; the best
+    1/eta of the trials then train eta times as long in total, and so on until one
+    trial is left or max_rungs is reached. Rungs run on a process pool of
+    single-threaded workers, so processes sets the CPU budget. Every result is
+    appended to results.csv in the sweep directory.
+    Returns the rows of the final rung, best first.
+    """
+    os.makedirs(directory, exist_ok=True)
+    results_path = os.path.join(directory, 'results.csv')
+    rng = random.Random(seed)
+    configs = {trial: sample_config(rng) for trial in range(num_trials)}
+    survivors = list(configs)
+    trained = 0
+    rung = 0
+    rows = []
+
+    context = multiprocessing.get_context('spawn')  # Forked trials would inherit torch's thread state
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1, mp_context=context) as executor, \
+            open(results_path, 'a', newline='') as results_file:
+        writer = csv.DictWriter(results_file, fieldnames=RESULT_FIELDS)
+        if results_file.tell() == 0:
+            writer.writeheader()
+        while True:
+            total = min_episodes * eta ** rung
+            futures = {
+                executor.submit(run_rung, trial, configs[trial], total - trained, directory, eval_episodes, seed,
+                                rung): trial
+                for trial in survivors
+            }
+            rows = []
+            for future in as_completed(futures):
+                trial = futures[future]
+                score, seconds = future.result()
+                rows.append(dict(configs[trial], trial=trial, rung=rung, episodes=total,
+                                 score=score, seconds=round(seconds, 2)))
+            rows.sort(key=lambda row: row['score'], reverse=True)
+
+            last = len(survivors) <= eta or (max_rungs is not None and rung + 1 >= max_rungs)
+            keep = len(rows) if last else max(1, len(rows) // eta)
+            for position, row in enumerate(rows):
+                row['status'] = 'final' if last else 'promoted' if position < keep else 'stopped'
+                writer.writerow(row)
+            results_file.flush()
+            print(f"Rung {rung}: {len(rows)} trials at {total} episodes - best score {rows[0]['score']:.3f} "
+                  f"(trial {rows[0]['trial']})")
+            if last:
+                return rows
+            survivors = [row['trial'] for row in rows[:keep]]
+            trained = total
+            rung += 1
+
+
+def print_table(rows):
+    """Prints the final rung as a table."""
+    print(f"\n{'Trial':>5}{'Score':>9}{'LR':>10}{'Gamma':>7}{'Decay':>7}{'Hidden':>8}{'Batch':>7}")
+    for row in rows:
+        print(f"{row['trial']:>5}{row['score']:>9.3f}{row['learning_rate']:>10.5f}{row['gamma']:>7}"
+              f"{row['epsilon_decay']:>7}{row['hidden_size']:>8}{row['batch_size']:>7}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Successive-halving hyperparameter sweep for the DQN agent.')
+    parser.add_argument('--trials', type=int, default=27)
+    parser.add_argument('--min-episodes', type=int, default=100)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--eval-episodes', type=int, default=200)
+    parser.add_argument('--processes', type=int, default=None, help='Worker processes, i.e. the CPU budget')
+    parser.add_argument('--directory', default='sweeps')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print_table(successive_halving(
+        num_trials=args.trials, min_episodes=args.min_episodes, eta=args.eta,
+        eval_episodes=args.eval_episodes, processes=args.processes, directory=args.directory, seed=args.seed
+    ))
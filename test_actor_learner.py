@@ -0,0 +1,61 @@
+# test_actor_learner.py
+
+import sys
+import unittest
+import torch
+import torch.multiprocessing as mp
+from actor_learner import SharedWeights, actor_epsilon, check_actors, sync_actor
+from dqn_agent import DQNAgent
+
+
+class TestSharedWeights(unittest.TestCase):
+
+    def setUp(self):
+        self.learner = DQNAgent(state_size=8, action_size=3)
+        self.actor = DQNAgent(state_size=8, action_size=3)
+        self.shared = SharedWeights(self.learner.model)
+
+    def test_actor_picks_up_published_weights(self):
+        """Publishing bumps the version and actors copy the new weights."""
+        with torch.no_grad():
+            for param in self.learner.model.parameters():
+                param.add_(1.0)
+        self.shared.publish(self.learner.model)
+        version = self.shared.load_into(self.actor.model, 0)
+        self.assertEqual(version, 1)
+        for actor_param, learner_param in zip(self.actor.model.parameters(), self.learner.model.parameters()):
+            self.assertTrue(torch.equal(actor_param, learner_param))
+
+    def test_no_copy_when_version_is_current(self):
+        """Actors skip the copy when nothing new was published."""
+        version = self.shared.load_into(self.actor.model, -1)
+        with torch.no_grad():
+            next(self.actor.model.parameters()).zero_()
+        self.assertEqual(self.shared.load_into(self.actor.model, version), version)
+        self.assertEqual(next(self.actor.model.parameters()).detach().abs().sum().item(), 0.0)
+
+    def test_opponent_follows_actor(self):
+        """Published weights reach the actor's opponent as well."""
+        opponent = DQNAgent(state_size=8, action_size=3)
+        self.shared.publish(self.learner.model)
+        self.assertEqual(sync_actor(self.shared, self.actor, opponent, 0), 1)
+        for opponent_param, learner_param in zip(opponent.model.parameters(), self.learner.model.parameters()):
+            self.assertTrue(torch.equal(opponent_param, learner_param))
+
+    def test_dead_actors_raise(self):
+        """The learner stops waiting once every actor has exited."""
+        actor = mp.Process(target=sys.exit, args=(3,))
+        actor.start()
+        actor.join()
+        with self.assertRaises(RuntimeError):
+            check_actors([actor])
+
+    def test_actor_epsilons_spread(self):
+        """Actors explore at different fixed rates."""
+        epsilons = [actor_epsilon(actor_id, 4) for actor_id in range(4)]
+        self.assertEqual(epsilons[0], 0.4)
+        self.assertEqual(epsilons, sorted(epsilons, reverse=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
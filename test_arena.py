@@ -0,0 +1,100 @@
+# test_arena.py
+
+import asyncio
+import os
+import tempfile
+import unittest
+from arena import ArenaServer, ArenaTable, make_house_bot, play_client
+from player import Player
+
+
+def calling_strategy(state):
+    return 'c'
+
+
+def raising_strategy(state):
+    return 'r'
+
+
+class TestArenaTable(unittest.TestCase):
+
+    def test_match_state_hides_other_hands(self):
+        table = ArenaTable([Player('a'), Player('b')])
+        table.players[0].hand = [{'value': 'Ace', 'suit': 'Hearts'}, {'value': '10', 'suit': 'Spades'}]
+        table.players[1].hand = [{'value': '2', 'suit': 'Clubs'}, {'value': '7', 'suit': 'Diamonds'}]
+        table.community_cards = [{'value': 'King', 'suit': 'Clubs'}, {'value': '9', 'suit': 'Hearts'},
+                                 {'value': '4', 'suit': 'Spades'}, {'value': 'Jack', 'suit': 'Diamonds'}]
+        table.betting = [['r', 'c'], ['c']]
+        self.assertEqual(table.match_state(0), '0:0:rc/c:AhTs|/Kc9h4s/Jd')
+        table.revealed = {0, 1}
+        self.assertEqual(table.match_state(1), '1:0:rc/c:AhTs|2c7d/Kc9h4s/Jd')
+
+
+class TestArenaServer(unittest.TestCase):
+
+    def run_clients(self, server, strategies, path=None):
+        async def scenario():
+            address = await server.start(port=0, path=path)
+            port = None if path else address[1]
+            try:
+                return await asyncio.gather(*(play_client(strategy, port=port, path=path) for strategy in strategies))
+            finally:
+                await server.close()
+        return asyncio.run(scenario())
+
+    def test_paired_match_is_zero_sum(self):
+        server = ArenaServer(hands_per_match=10)
+        totals = self.run_clients(server, [calling_strategy, calling_strategy])
+        self.assertEqual(sum(totals), 0)
+        stats = server.stats()
+        self.assertEqual((stats['matches'], stats['hands'], stats['active_matches']), (1, 10, 0))
+        self.assertGreater(stats['matches_per_second'], 0)
+
+    def test_slow_bot_times_out_and_folds(self):
+        """A seat that misses its deadline is dropped and folds every later hand."""
+        server = ArenaServer(hands_per_match=5, action_timeout=0.05)
+
+        async def scenario():
+            address = await server.start(port=0)
+            reader, writer = await asyncio.open_connection('127.0.0.1', address[1])
+            writer.write(b'VERSION:2.0.0\r\n')
+            caller = asyncio.create_task(play_client(calling_strategy, port=address[1]))
+            total = await caller
+            writer.close()
+            await server.close()
+            return total
+        total = asyncio.run(scenario())
+        self.assertEqual(server.stats()['timeout'], 1)
+        self.assertGreater(total, 0)
+
+    def test_always_raising_bot_finishes(self):
+        """Raises are capped per street and never return chips, so a raise-only seat cannot stall a hand."""
+        server = ArenaServer(hands_per_match=20)
+        totals = self.run_clients(server, [raising_strategy, calling_strategy])
+        self.assertEqual(sum(totals), 0)
+        self.assertEqual(server.stats()['hands'], 20)
+        self.assertEqual(server.stats()['invalid'], 0)
+
+    def test_raises_put_chips_in(self):
+        """A short stack raising goes all-in above the bet; one that cannot top it calls."""
+        table = ArenaTable([Player('a', chips=100), Player('b', chips=300)])
+        short, deep = table.players
+        table.current_bet = 80
+        short.current_bet, short.chips = 40, 60
+        table.process_player_action(short, table.legal_action(short, 'raise'))
+        self.assertEqual((short.chips, short.current_bet, table.current_bet, short.is_all_in), (0, 100, 100, True))
+        self.assertEqual(table.pot, 60)
+        deep.current_bet, deep.chips = 0, 50
+        self.assertEqual(table.legal_action(deep, 'raise'), 'call')
+
+    def test_house_match_over_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            server = ArenaServer(hands_per_match=3, house_bot=make_house_bot())
+            totals = self.run_clients(server, [calling_strategy] * 2, path=os.path.join(directory, 'arena.sock'))
+        self.assertEqual(len(totals), 2)
+        self.assertEqual(server.stats()['matches'], 2)
+        self.assertEqual(server.house_created, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
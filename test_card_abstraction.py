@@ -0,0 +1,62 @@
+# test_card_abstraction.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from card_abstraction import CardAbstraction, build_buckets, canonical_keys, hole_classes, street_situations
+
+
+class TestCanonicalKeys(unittest.TestCase):
+
+    def test_suit_relabelling_gives_same_key(self):
+        """Renaming the suits of a situation does not change its key."""
+        rng = np.random.default_rng(0)
+        cards = np.array([rng.permutation(52)[:7] for _ in range(200)])
+        permutation = np.array([2, 0, 3, 1])
+        relabelled = permutation[cards // 13] * 13 + cards % 13
+        np.testing.assert_array_equal(canonical_keys(cards[:, :2], cards[:, 2:]),
+                                      canonical_keys(relabelled[:, :2], relabelled[:, 2:]))
+
+    def test_hole_and_board_are_distinguished(self):
+        """Swapping a hole card with a board card is a different situation."""
+        self.assertNotEqual(canonical_keys([[0, 1]], [[13, 14, 15]])[0], canonical_keys([[0, 13]], [[1, 14, 15]])[0])
+
+    def test_class_counts(self):
+        """Enumeration finds the known 169 preflop and 1,286,792 flop situations."""
+        classes = hole_classes()
+        self.assertEqual(len(classes), 169)
+        self.assertEqual(sum(len(street_situations(hole, 3)[0]) for hole in classes), 1286792)
+
+
+class TestBuildBuckets(unittest.TestCase):
+
+    def test_build_lookup_and_resume(self):
+        """A small job writes lookup tables, skips finished chunks and orders buckets by strength."""
+        classes = hole_classes()
+        aces = int(np.flatnonzero((classes % 13 == 12).all(axis=1))[0])
+        deuce_three = int(np.flatnonzero((np.sort(classes % 13, axis=1) == [0, 1]).all(axis=1)
+                                         & (classes[:, 0] // 13 != classes[:, 1] // 13))[0])
+        with tempfile.TemporaryDirectory() as directory:
+            options = dict(streets=('preflop', 'flop'), buckets={'preflop': 2, 'flop': 4}, runouts=4,
+                           opponents=2, classes=[aces, deuce_three], processes=1)
+            build_buckets(directory, **options)
+            chunk = os.path.join(directory, 'flop', f'{aces:03d}.npz')
+            written = os.path.getmtime(chunk)
+            os.remove(os.path.join(directory, 'flop_keys.npy'))
+            build_buckets(directory, **options)
+            self.assertEqual(os.path.getmtime(chunk), written)
+
+            abstraction = CardAbstraction(directory)
+            aces_bucket = abstraction.bucket([{'value': 'Ace', 'suit': 'Clubs'}, {'value': 'Ace', 'suit': 'Spades'}], [])
+            weak_bucket = abstraction.bucket([{'value': '2', 'suit': 'Clubs'}, {'value': '3', 'suit': 'Hearts'}], [])
+            self.assertGreater(aces_bucket, weak_bucket)
+
+            keys, boards = street_situations(classes[aces], 3)
+            holes = np.broadcast_to(classes[aces], (len(boards), 2))
+            self.assertTrue((abstraction.lookup(holes, boards) >= 0).all())
+            self.assertEqual(abstraction.lookup([[0, 1]], [[2, 3, 4]])[0], -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# test_cfr_solver.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from cfr_solver import CFRSolver, Blueprint, GameTree, FOLD, CALL, RAISE
+from hand_range import NUM_COMBOS
+
+
+class TestCFRSolver(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a three-bucket abstraction where higher buckets are stronger."""
+        self.num_buckets = 3
+        self.combo_buckets = np.arange(NUM_COMBOS) * self.num_buckets // NUM_COMBOS
+        self.chance = np.full((3, 3), 1 / 9)
+        self.equity = np.array([
+            [0.5, 0.3, 0.1],
+            [0.7, 0.5, 0.3],
+            [0.9, 0.7, 0.5],
+        ])
+
+    def test_tree_matches_action_map(self):
+        """The root offers fold, call and raise to the small blind."""
+        tree = GameTree(max_raises=2)
+        self.assertTrue(tree.root['legal'][[FOLD, CALL, RAISE]].all())
+        self.assertEqual(set(tree.history_ids), {'', 'c', 'cr', 'crr', 'r', 'rr'})
+        # The big blind cannot fold after a limp, and the last raise is capped
+        self.assertFalse(tree.nodes[tree.history_ids['c']]['legal'][FOLD])
+        self.assertFalse(tree.nodes[tree.history_ids['rr']]['legal'][RAISE])
+
+    def test_exploitability_decreases(self):
+        """CFR+ drives exploitability towards zero."""
+        solver = CFRSolver(self.combo_buckets, self.chance, self.equity)
+        initial = solver.exploitability()
+        for _ in range(300):
+            solver.iterate()
+        self.assertLess(solver.exploitability(), initial / 50)
+
+    def test_checkpoint_and_blueprint_round_trip(self):
+        """A checkpoint resumes the solver and the blueprint answers lookups."""
+        solver = CFRSolver(self.combo_buckets, self.chance, self.equity)
+        for _ in range(50):
+            solver.iterate()
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'solver.npz')
+            solver.save_checkpoint(checkpoint)
+            restored = CFRSolver.load_checkpoint(checkpoint)
+            self.assertEqual(restored.iteration, 50)
+            self.assertTrue(np.array_equal(restored.regrets, solver.regrets))
+
+            blueprint_path = os.path.join(directory, 'blueprint.npz')
+            solver.export_blueprint(blueprint_path)
+            blueprint = Blueprint.load(blueprint_path)
+
+        aces = [{'value': 'Ace', 'suit': 'Clubs'}, {'value': 'Ace', 'suit': 'Spades'}]
+        probabilities = blueprint.action_probabilities(['call'], aces)
+        self.assertAlmostEqual(float(probabilities.sum()), 1.0, places=2)
+        self.assertEqual(probabilities[FOLD], 0)
+        self.assertIsNone(blueprint.action_probabilities(['raise'] * 5, aces))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# test_checkpoint.py
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import torch
+from checkpoint import CheckpointWriter, latest_checkpoint, list_checkpoints, load_checkpoint
+from dqn_agent import DQNAgent
+from poker_env import PokerEnv
+from training_loop import train_agent
+
+
+class TestCheckpointWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_keeps_last_checkpoints(self):
+        """Only the newest keep_last checkpoints stay on disk, with no temporary files."""
+        writer = CheckpointWriter(self.directory, keep_last=2)
+        for episode in range(1, 5):
+            writer.save_training_state({'episode': episode}, episode)
+            writer.wait()
+        writer.close()
+        self.assertEqual(len(list_checkpoints(self.directory)), 2)
+        self.assertEqual(load_checkpoint(latest_checkpoint(self.directory))['episode'], 4)
+        self.assertFalse([name for name in os.listdir(self.directory) if name.endswith('.tmp')])
+
+    def test_resume_matches_uninterrupted_run(self):
+        """Training resumed from a checkpoint ends with the same weights as one long run."""
+        def run(checkpoint_dir, resume):
+            random.seed(0)
+            np.random.seed(0)
+            torch.manual_seed(0)
+            env = PokerEnv()
+            agent = DQNAgent(state_size=112, action_size=3, memory_size=500)
+            train_agent(env, agent, num_episodes=6, batch_size=4, save_interval=100,
+                        model_save_path=os.path.join(self.directory, 'model.pth'),
+                        checkpoint_dir=checkpoint_dir, checkpoint_interval=3, resume=resume)
+            return agent
+
+        full_dir = os.path.join(self.directory, 'full')
+        uninterrupted = run(full_dir, False)
+        resumed_dir = os.path.join(self.directory, 'resumed')
+        os.makedirs(resumed_dir)
+        shutil.copy(os.path.join(full_dir, 'checkpoint_00000003.pt'), resumed_dir)
+        resumed = run(resumed_dir, True)
+        self.assertEqual(resumed.train_steps, uninterrupted.train_steps)
+        self.assertEqual(resumed.epsilon, uninterrupted.epsilon)
+        for a, b in zip(resumed.model.parameters(), uninterrupted.model.parameters()):
+            self.assertTrue(torch.equal(a, b))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# test_dqn_agent.py
+
+import unittest
+import numpy as np
+import torch
+from dqn_agent import DQNAgent
+
+
+class TestDQNAgent(unittest.TestCase):
+
+    def setUp(self):
+        """Set up an agent with a small replay memory of random transitions."""
+        torch.manual_seed(0)
+        np.random.seed(0)
+        self.agent = DQNAgent(state_size=8, action_size=3, target_update_interval=2)
+        for _ in range(64):
+            state = np.random.rand(8).astype(np.float32)
+            next_state = np.random.rand(8).astype(np.float32)
+            self.agent.remember(state, np.random.randint(3), np.random.rand(), next_state, np.random.rand() < 0.5)
+
+    def test_replay_changes_online_network_only(self):
+        """A gradient step moves the online network but not the target network."""
+        online_before = [param.clone() for param in self.agent.model.parameters()]
+        target_before = [param.clone() for param in self.agent.target_model.parameters()]
+        self.agent.replay(32)
+        self.assertEqual(self.agent.train_steps, 1)
+        self.assertFalse(all(torch.equal(a, b) for a, b in zip(online_before, self.agent.model.parameters())))
+        self.assertTrue(all(torch.equal(a, b) for a, b in zip(target_before, self.agent.target_model.parameters())))
+
+    def test_target_network_hard_sync(self):
+        """The target network is copied from the online network every interval."""
+        self.agent.replay(32)
+        self.agent.replay(32)
+        for target, online in zip(self.agent.target_model.parameters(), self.agent.model.parameters()):
+            self.assertTrue(torch.equal(target, online))
+
+    def test_polyak_update(self):
+        """With tau set, the target network moves part of the way each step."""
+        self.agent.tau = 0.5
+        target_before = [param.clone() for param in self.agent.target_model.parameters()]
+        self.agent.replay(32)
+        for before, target, online in zip(target_before, self.agent.target_model.parameters(),
+                                          self.agent.model.parameters()):
+            self.assertTrue(torch.allclose(target, 0.5 * before + 0.5 * online))
+
+    def test_done_transitions_ignore_next_state(self):
+        """Terminal transitions are trained towards the reward alone."""
+        agent = DQNAgent(state_size=4, action_size=2, learning_rate=0.05)
+        state = np.ones(4, dtype=np.float32)
+        for _ in range(32):
+            agent.remember(state, 0, 1.0, np.full(4, 100.0, dtype=np.float32), True)
+        for _ in range(200):
+            agent.replay(32)
+        with torch.no_grad():
+            q_value = agent.model(torch.from_numpy(state))[0].item()
+        self.assertAlmostEqual(q_value, 1.0, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# test_evaluation.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from dqn_agent import DQNAgent
+from evaluation import DuplicateGame, GreedyBot, allin_equity, evaluate_duplicate, play_hand
+
+
+def card(value, suit):
+    return {'value': value, 'suit': suit}
+
+
+class TestDuplicateEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'agent.pth')
+        DQNAgent(state_size=112, action_size=3).save(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_deck_same_cards_per_seat(self):
+        """A deck seed deals the same hole cards and board to each seat."""
+        game = DuplicateGame()
+        first = GreedyBot('First', state_size=112)
+        second = GreedyBot('Second', state_size=112)
+        play_hand(game, (first, second), deck_seed=7)
+        seat_cards = [first.hand[:], second.hand[:]]
+        play_hand(game, (second, first), deck_seed=7)
+        self.assertEqual([second.hand, first.hand], seat_cards)
+
+    def test_allin_equity(self):
+        """Aces are about a 4 to 1 favourite over kings and river equity is exact."""
+        aces = [card('Ace', 'Hearts'), card('Ace', 'Spades')]
+        kings = [card('King', 'Hearts'), card('King', 'Spades')]
+        equity = allin_equity(aces, kings, [], samples=4000, rng=np.random.default_rng(0))
+        self.assertAlmostEqual(equity, 0.82, delta=0.03)
+        board = [card('2', 'Clubs'), card('7', 'Diamonds'), card('9', 'Clubs'), card('Jack', 'Diamonds'),
+                 card('4', 'Hearts')]
+        self.assertEqual(allin_equity(aces, kings, board), 1.0)
+
+    def test_self_match_cancels_luck(self):
+        """A checkpoint against itself scores exactly zero on every duplicate pair."""
+        report = evaluate_duplicate(self.path, self.path, max_pairs=20, min_pairs=10, batch_pairs=10,
+                                    processes=1)
+        self.assertEqual(report['bb_per_100'], 0.0)
+        self.assertEqual(report['pairs'], 10)
+        self.assertTrue(report['stopped_early'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
 # test_hand_evaluator.py
 
 import unittest
-from hand_evaluator import evaluate_hand, HAND_RANKS
+import random
+from hand_evaluator import evaluate_hand, evaluate_hands_batch, cards_to_indices, score_category, HAND_RANKS
 
 class TestHandEvaluator(unittest.TestCase):
 
@@ -189,5 +190,24 @@ class TestHandEvaluator(unittest.TestCase):
         # Compare high cards
         self.assertTrue(high_cards1 < high_cards2)  # Hand2 should win due to higher kickers
 
+    def test_batch_matches_evaluate_hand(self):
+        # The batch scores must order random hands exactly like evaluate_hand
+        rng = random.Random(42)
+        suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+        values = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
+        deck = [{'value': value, 'suit': suit} for suit in suits for value in values]
+        # Two suits and few values make flushes, straights and full houses common
+        small_deck = [card for card in deck if card['suit'] in suits[:2] and card['value'] in values[8:]]
+        hands = [rng.sample(deck, 7) for _ in range(500)] + [rng.sample(small_deck, 7) for _ in range(500)]
+        results = [evaluate_hand(hand) for hand in hands]
+        scores = evaluate_hands_batch([cards_to_indices(hand) for hand in hands])
+
+        for result, category in zip(results, score_category(scores)):
+            self.assertEqual(result[0], category)
+        for i in range(len(hands) - 1):
+            expected = (results[i] > results[i + 1]) - (results[i] < results[i + 1])
+            actual = int(scores[i] > scores[i + 1]) - int(scores[i] < scores[i + 1])
+            self.assertEqual(expected, actual)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,164 @@
+# test_hand_range.py
+
+import time
+import unittest
+import numpy as np
+from game_logic import GameLogic
+from player import Player
+from hand_evaluator import card_to_index, cards_to_indices, index_to_card
+from hand_evaluator import evaluate_hands_batch
+from hand_range import (HandRange, RangeTracker, NUM_COMBOS, COMBOS, PREFLOP_STRENGTH, blocked_combos,
+                        combo_scores, combo_strength, _postflop_strength, parse_range, range_equity)
+from poker_bot import PokerBot
+
+
+class TestHandRange(unittest.TestCase):
+
+    def test_starts_uniform(self):
+        """A new range gives every combo the same weight."""
+        hand_range = HandRange()
+        self.assertEqual(NUM_COMBOS, 1326)
+        self.assertTrue(np.allclose(hand_range.weights, 1 / 1326))
+
+    def test_known_cards_block_combos(self):
+        """Removing a card drops the 51 combos that contain it."""
+        hand_range = HandRange()
+        hand_range.remove([card_to_index({'value': 'Ace', 'suit': 'Spades'})])
+        self.assertEqual(np.count_nonzero(hand_range.weights), 1326 - 51)
+        self.assertAlmostEqual(hand_range.weights.sum(), 1.0)
+
+    def test_raise_shifts_weight_to_strong_combos(self):
+        """After a raise, strong combos gain weight relative to weak ones."""
+        game = GameLogic()
+        tracker = RangeTracker()
+        game.range_tracker = tracker
+        alice = Player(name="Alice", chips=1000)
+        game.players = [alice]
+        tracker.start_hand(game.players)
+        game.current_bet = 20
+        game.process_player_action(alice, 'raise')
+        weights = tracker.range_for(alice).weights
+        strongest = np.argmax(PREFLOP_STRENGTH)
+        weakest = np.argmin(PREFLOP_STRENGTH)
+        self.assertGreater(weights[strongest], 10 * weights[weakest])
+        self.assertAlmostEqual(weights.sum(), 1.0)
+
+    def test_river_equity_is_exact(self):
+        """On the river, the nut hand has full equity against any range."""
+        board = cards_to_indices([
+            {'value': 'Queen', 'suit': 'Hearts'},
+            {'value': 'Jack', 'suit': 'Hearts'},
+            {'value': '10', 'suit': 'Hearts'},
+            {'value': '2', 'suit': 'Clubs'},
+            {'value': '3', 'suit': 'Diamonds'},
+        ])
+        hand = cards_to_indices([
+            {'value': 'Ace', 'suit': 'Hearts'},
+            {'value': 'King', 'suit': 'Hearts'},
+        ])
+        self.assertEqual(HandRange().equity_vs_hand(hand, board), 1.0)
+
+    def test_board_strength_is_cached(self):
+        """Boards in any card order share one read-only strength array."""
+        strength = combo_strength([40, 3, 17])
+        self.assertIs(combo_strength([3, 17, 40]), strength)
+        self.assertFalse(strength.flags.writeable)
+
+    def test_combo_scores_match_full_evaluation(self):
+        """Scoring rank pairs and suited hole ranks gives the evaluator's scores on every live combo."""
+        rng = np.random.default_rng(0)
+        boards = [rng.choice(52, size, replace=False) for size in (3, 4, 5) for _ in range(20)]
+        boards += [[0, 2, 4], [0, 2, 4, 9], [0, 1, 2, 3, 30], [13, 15, 17, 19, 21], [26, 27, 28, 29, 30]]
+        for board in boards:
+            board = np.asarray(board)
+            live = ~blocked_combos(board)
+            full = evaluate_hands_batch(np.hstack([COMBOS, np.broadcast_to(board, (NUM_COMBOS, len(board)))]))
+            np.testing.assert_array_equal(combo_scores(board)[live], full[live])
+
+    def test_new_board_update_latency(self):
+        """The first update on a board nobody has seen stays well under a millisecond."""
+        rng = np.random.default_rng(1)
+        tracker = RangeTracker()
+        player = Player('villain')
+        timings = []
+        for _ in range(100):
+            board = [index_to_card(int(card)) for card in rng.choice(52, int(rng.integers(3, 6)), replace=False)]
+            tracker.start_hand([player])
+            _postflop_strength.cache_clear()
+            start = time.perf_counter()
+            tracker.record_action(player, 'call', board, False)
+            timings.append(time.perf_counter() - start)
+        self.assertLess(np.median(timings), 0.001)
+
+    def test_card_index_matches_bot_encoding(self):
+        """PokerBot encodes cards with the evaluator's indices."""
+        bot = PokerBot('bot')
+        for card in ({'value': '2', 'suit': 'Hearts'}, {'value': '10', 'suit': 'Clubs'},
+                     {'value': 'Ace', 'suit': 'Spades'}):
+            self.assertEqual(bot.get_card_index(card), card_to_index(card))
+
+    def test_preflop_equity_of_aces(self):
+        """Pocket aces win about 85% against a random hand."""
+        hand = cards_to_indices([
+            {'value': 'Ace', 'suit': 'Hearts'},
+            {'value': 'Ace', 'suit': 'Spades'},
+        ])
+        equity = HandRange().equity_vs_hand(hand, [], num_runouts=64, rng=np.random.default_rng(7))
+        self.assertAlmostEqual(equity, 0.85, delta=0.05)
+
+
+class TestRangeNotation(unittest.TestCase):
+
+    def test_combo_counts(self):
+        counts = {'TT+': 30, 'AKs': 4, 'KQo': 12, 'AK': 16, '76s-54s': 12, 'TT-77': 24,
+                  'KTs-K7s': 16, 'A9s+': 20, 'AhKd': 1, 'TT+, AKs, KQo, 76s-54s': 58}
+        for notation, expected in counts.items():
+            self.assertEqual(np.count_nonzero(parse_range(notation)), expected, notation)
+
+    def test_specific_combo_and_weight(self):
+        weights = parse_range('AKs, AhKh:0.5')
+        ace, king = card_to_index({'value': 'Ace', 'suit': 'Hearts'}), card_to_index({'value': 'King', 'suit': 'Hearts'})
+        combo = np.flatnonzero((COMBOS == sorted((ace, king))).all(axis=1))[0]
+        self.assertEqual(weights[combo], 0.5)
+        self.assertEqual(weights.sum(), 3.5)
+
+    def test_invalid_notation(self):
+        for notation in ['AXs', 'AAs', '76s-54o', 'AKs-Q9s', 'AK:x']:
+            with self.assertRaises(ValueError):
+                parse_range(notation)
+
+
+class TestRangeEquity(unittest.TestCase):
+
+    def test_matches_brute_force_on_turn(self):
+        """Exact enumeration agrees with comparing every live pair of combos on every river."""
+        board = cards_to_indices([{'value': 'King', 'suit': 'Clubs'}, {'value': '9', 'suit': 'Hearts'},
+                                  {'value': '4', 'suit': 'Spades'}, {'value': '9', 'suit': 'Clubs'}])
+        hero, villain = parse_range('TT+, AKs, 76s'), parse_range('KQo, K9s, 44, AcQc')
+        equity, combo_equity = range_equity(hero, villain, board)
+
+        wins = total = 0.0
+        for river in set(range(52)) - set(board):
+            cards = board + [river]
+            for a in np.flatnonzero(hero):
+                for b in np.flatnonzero(villain):
+                    used = set(COMBOS[a]) | set(COMBOS[b])
+                    if len(used) < 4 or used & set(cards):
+                        continue
+                    first, second = evaluate_hands_batch([list(COMBOS[a]) + cards, list(COMBOS[b]) + cards])
+                    wins += (first > second) + 0.5 * (first == second)
+                    total += 1
+        self.assertAlmostEqual(equity, wins / total)
+        self.assertTrue(np.isnan(combo_equity[np.flatnonzero(hero == 0)]).all())
+
+    def test_symmetry_and_sampling(self):
+        flop = [0, 14, 30]
+        forward, _ = range_equity('22+, A2s+', 'KTo+, 65s', flop)
+        backward, _ = range_equity('KTo+, 65s', '22+, A2s+', flop)
+        self.assertAlmostEqual(forward + backward, 1.0)
+        preflop, _ = range_equity(HandRange.from_notation('AA'), 'KK', rng=np.random.default_rng(0))
+        self.assertAlmostEqual(preflop, 0.82, delta=0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
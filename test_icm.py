@@ -0,0 +1,68 @@
+# test_icm.py
+
+import itertools
+import unittest
+import numpy as np
+from icm import icm, icm_equities, push_fold_decision, push_fold_outcomes, sample_icm_equities
+
+
+def harville(stacks, payouts):
+    """Reference ICM by enumerating every finishing order."""
+    equity = np.zeros(len(stacks))
+    for order in itertools.permutations(range(len(stacks))):
+        probability, remaining = 1.0, sum(stacks)
+        for player in order:
+            probability *= stacks[player] / remaining
+            remaining -= stacks[player]
+        for place, player in enumerate(order[:len(payouts)]):
+            equity[player] += probability * payouts[place]
+    return equity
+
+
+class TestICM(unittest.TestCase):
+
+    def test_heads_up(self):
+        np.testing.assert_allclose(icm_equities([3000, 1000], [70, 30]), [60, 40])
+
+    def test_matches_enumeration(self):
+        stacks, payouts = [5000, 3000, 2000, 1000, 500], [50, 30, 20]
+        np.testing.assert_allclose(icm_equities(stacks, payouts), harville(stacks, payouts))
+
+    def test_batch_matches_single_tables(self):
+        tables = np.random.default_rng(0).integers(100, 5000, size=(6, 6))
+        payouts = [40, 25, 15, 10]
+        batch = icm_equities(tables, payouts)
+        for stacks, row in zip(tables, batch):
+            np.testing.assert_allclose(row, icm_equities(stacks, payouts))
+        np.testing.assert_allclose(batch.sum(axis=1), sum(payouts))
+
+    def test_busted_players_finish_last(self):
+        np.testing.assert_allclose(icm_equities([1000, 0, 0], [50, 30, 20]), [50, 25, 25])
+
+    def test_sampling_is_close_to_exact(self):
+        stacks, payouts = [5000, 3000, 2000, 1000, 500], [50, 30, 20]
+        sampled = sample_icm_equities(stacks, payouts, samples=100000, rng=np.random.default_rng(1))
+        np.testing.assert_allclose(sampled, icm_equities(stacks, payouts), atol=0.5)
+
+    def test_large_field_is_sampled(self):
+        stacks = np.random.default_rng(2).integers(100, 10000, 50)
+        equity = icm(stacks, [30, 20, 10], samples=2000, rng=np.random.default_rng(3))
+        self.assertAlmostEqual(equity.sum(), 60)
+
+
+class TestPushFold(unittest.TestCase):
+
+    def test_outcomes_conserve_chips(self):
+        stacks, posted = [990, 480, 1500], [10, 20, 0]
+        outcomes = push_fold_outcomes(stacks, posted, hero=0, villain=1)
+        np.testing.assert_allclose(outcomes.sum(axis=1), sum(stacks) + sum(posted))
+        self.assertEqual(outcomes[3, 0], 500)  # Hero covers villain's 500 and keeps the rest
+
+    def test_decision(self):
+        stacks, posted, payouts = [990, 1980, 3000, 4000], [10, 20, 0, 0], [50, 30, 20]
+        self.assertEqual(push_fold_decision(stacks, posted, payouts, 0, 1, 0.85, 1.0)[0], 'push')
+        self.assertEqual(push_fold_decision(stacks, posted, payouts, 0, 1, 0.25, 1.0)[0], 'fold')
+
+
+if __name__ == '__main__':
+    unittest.main()
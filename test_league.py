@@ -0,0 +1,76 @@
+# test_league.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from dqn_agent import DQNAgent
+from league import League, hand_result, play_match
+from poker_env import PokerEnv
+
+
+class TestLeague(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.league = League(self.directory, pool_size=3, hands_per_match=4, min_games=1, evaluation_workers=1)
+        self.agent = DQNAgent(state_size=112, action_size=3)
+
+    def tearDown(self):
+        self.league.close()
+        shutil.rmtree(self.directory)
+
+    def test_pool_drops_oldest_checkpoint(self):
+        """The pool keeps at most pool_size checkpoints, newest last."""
+        for episode in range(5):
+            self.league.add_checkpoint(self.agent, f'episode_{episode}')
+        self.assertEqual(self.league.order, ['episode_2', 'episode_3', 'episode_4'])
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'episode_0.pth')))
+
+    def test_elo_update_is_zero_sum(self):
+        """A win moves rating from the loser to the winner."""
+        self.league.add_checkpoint(self.agent, 'a')
+        self.league.add_checkpoint(self.agent, 'b')
+        self.league._update_ratings('a', 'b', 1.0)
+        ratings = dict(self.league.ratings())
+        self.assertGreater(ratings['a'], 1000)
+        self.assertAlmostEqual(ratings['a'] + ratings['b'], 2000)
+        self.league._promote()
+        self.assertEqual(self.league.best, 'a')
+
+    def test_background_match_updates_ratings(self):
+        """Matches scheduled by update are collected by a later update."""
+        self.league.add_checkpoint(self.agent, 'a')
+        self.league.add_checkpoint(self.agent, 'b')
+        self.league.update()
+        for future in list(self.league.pending):
+            future.result(timeout=60)
+        self.league.update()
+        games = sum(member['games'] for member in self.league.members.values())
+        self.assertEqual(games, 2)
+        self.assertIsNotNone(self.league.best)
+
+    def test_play_match_score_range(self):
+        """Match scores are a share of hands won."""
+        path = os.path.join(self.directory, 'self.pth')
+        self.agent.save(path)
+        score = play_match(path, path, num_hands=4)
+        self.assertGreaterEqual(score, 0.0)
+        self.assertLessEqual(score, 1.0)
+
+    def test_opponent_fold_is_a_win(self):
+        """A hand the opponent folds counts as won even though PokerEnv rewards it with 0."""
+        env = PokerEnv()
+        env.reset()
+        env.opponent.make_decision = lambda game: 'fold'
+        _, reward, done, _ = env.step(1)
+        self.assertTrue(done)
+        self.assertEqual(reward, 0)
+        self.assertEqual(hand_result(env), 1.0)
+        env.reset()
+        env.step(0)
+        self.assertEqual(hand_result(env), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# test_memory_report.py
+
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from game_logic import GameLogic
+from memory_report import (TracemallocDiff, dump_memory_report, process_memory, python_bytes,
+                           table_memory)
+from player import Player
+from poker_bot import PokerBot
+
+
+def parameter_bytes(model):
+    return sum(parameter.numel() * parameter.element_size() for parameter in model.parameters())
+
+
+class TestTableMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.game = GameLogic()
+        self.game.add_player(Player('Player'))
+        self.bot = PokerBot('Bot', state_size=112)
+        self.game.add_player(self.bot)
+        self.game.shuffle_and_deal()
+
+    def test_bot_components(self):
+        report = table_memory(self.game)
+        bot = report['players'][1]
+        agent = self.bot.agent
+        self.assertEqual(bot['model'], parameter_bytes(agent.model))
+        self.assertEqual(bot['target_model'], parameter_bytes(agent.target_model))
+        self.assertEqual(bot['replay_buffer'], agent.memory.nbytes)
+        self.assertEqual(bot['optimizer'], 0)
+        self.assertEqual(report['total'], sum(player['total'] for player in report['players'])
+                         + report['deck'] + report['board'] + report['trackers'] + report['table_object'])
+
+        for _ in range(8):
+            agent.remember(np.zeros(112, dtype=np.float32), 1, 0.0, np.zeros(112, dtype=np.float32), False)
+        agent.replay(8)
+        # Adam keeps two moment estimates per parameter
+        self.assertGreaterEqual(table_memory(self.game)['players'][1]['optimizer'], 2 * parameter_bytes(agent.model))
+
+    def test_shared_agent_counted_once(self):
+        other = PokerBot('Other', state_size=112)
+        other.agent = self.bot.agent
+        self.game.add_player(other)
+        players = table_memory(self.game)['players']
+        self.assertGreater(players[1]['model'], 0)
+        self.assertEqual(players[2]['model'], 0)
+        self.assertEqual(players[2]['replay_buffer'], 0)
+
+    def test_python_bytes_counts_shared_objects_once(self):
+        card = {'value': 'Ace', 'suit': 'Spades'}
+        self.assertEqual(python_bytes([card, card]) - python_bytes([card]), python_bytes([None, None]) - python_bytes([None]))
+
+
+class TestProcessReport(unittest.TestCase):
+
+    def test_dump_and_tracemalloc_diff(self):
+        diff = TracemallocDiff().start()
+        retained = [bytearray(1024) for _ in range(200)]
+        game = GameLogic()
+        game.add_player(PokerBot('Bot', state_size=112))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'memory.json')
+            dump_memory_report(path, [game], diff)
+            with open(path) as f:
+                report = json.load(f)
+        diff.stop()
+        self.assertGreater(report['process']['rss'], 0)
+        self.assertGreater(report['process']['torch_tensor_bytes'], 0)
+        self.assertEqual(len(report['tables']), 1)
+        # The bot's replay buffer outgrows the bytearrays, so look the test's own line up
+        growth = [entry for entry in report['tracemalloc'] if 'test_memory_report.py' in entry['location']]
+        self.assertGreaterEqual(growth[0]['size_diff'], 200 * 1024)
+        self.assertEqual(len(retained), 200)
+
+    def test_tensor_scan_is_optional(self):
+        self.assertNotIn('torch_tensor_bytes', process_memory(scan_tensors=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# test_offline_dataset.py
+
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from sqlalchemy import create_engine, text
+from dqn_agent import DQNAgent
+from game_logic import GameLogic
+from offline_dataset import ReplaySeat, TransitionDataset, build_dataset, replay_hand
+from poker_bot import PokerBot
+
+
+def card(value, suit):
+    return {'value': value, 'suit': suit}
+
+
+def logged_hand(fold=False):
+    """A heads-up hand in the hand_data format."""
+    actions = [
+        {'player': 'alice', 'phase': 'pre-flop', 'action': 'raise'},
+        {'player': 'bob', 'phase': 'pre-flop', 'action': 'fold' if fold else 'call'},
+    ]
+    if not fold:
+        actions += [
+            {'player': 'alice', 'phase': 'flop', 'action': 'check'},
+            {'player': 'bob', 'phase': 'flop', 'action': 'check'},
+            {'player': 'alice', 'phase': 'river', 'action': 'call'},
+            {'player': 'bob', 'phase': 'river', 'action': 'call'},
+        ]
+    return {
+        'dealer_position': 0,
+        'players': [
+            {'name': 'alice', 'chips': 1000, 'hand': [card('Ace', 'Spades'), card('Ace', 'Hearts')]},
+            {'name': 'bob', 'chips': 1000, 'hand': [card('7', 'Clubs'), card('2', 'Diamonds')]},
+        ],
+        'community_cards': [card('King', 'Clubs'), card('9', 'Hearts'), card('4', 'Spades'),
+                            card('Jack', 'Diamonds'), card('3', 'Clubs')],
+        'actions': actions,
+    }
+
+
+class TestReplayHand(unittest.TestCase):
+
+    def test_transitions_and_rewards(self):
+        """Each known player gets a chain of transitions ending with the hand's result."""
+        transitions = replay_hand(logged_hand())
+        self.assertEqual(len(transitions), 6)
+        terminal = [t for t in transitions if t[4]]
+        self.assertEqual(sorted(t[2] for t in terminal), [-1.0, 1.0])
+        self.assertEqual(transitions[0][0].shape, (112,))
+
+    def test_fold_reward(self):
+        """A fold ends the folding player's chain with -0.5."""
+        rewards = sorted(t[2] for t in replay_hand(logged_hand(fold=True)) if t[4])
+        self.assertEqual(rewards, [-0.5, 1.0])
+
+    def test_unknown_cards_at_showdown(self):
+        """A showdown against hidden cards has no result; a hidden player who folds is fine."""
+        hand = logged_hand()
+        hand['players'][0]['hand'] = [card('2', 'Clubs'), card('3', 'Diamonds')]
+        hand['players'][1]['hand'] = []
+        with self.assertRaises(ValueError):
+            replay_hand(hand)
+        hand = logged_hand(fold=True)
+        hand['players'][1]['hand'] = []
+        self.assertEqual([t[2] for t in replay_hand(hand) if t[4]], [1.0])
+
+    def test_seat_encodes_like_a_bot(self):
+        """Replay seats produce PokerBot's state vectors without building an agent."""
+        game = GameLogic()
+        game.community_cards = [card('King', 'Clubs'), card('9', 'Hearts'), card('4', 'Spades')]
+        game.pot, game.game_phase = 60, 'flop'
+        seat, bot = ReplaySeat('alice', 970, 112), PokerBot('alice', chips=970, state_size=112)
+        seat.hand = bot.hand = [card('Ace', 'Spades'), card('Ace', 'Hearts')]
+        np.testing.assert_array_equal(seat.encode_game_state(game), bot.encode_game_state(game))
+        self.assertFalse(hasattr(seat, 'agent'))
+
+    def test_rejects_unknown_action(self):
+        hand = logged_hand()
+        hand['actions'][0]['action'] = 'bluff'
+        with self.assertRaises(ValueError):
+            replay_hand(hand)
+
+
+class TestBuildDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.url = 'sqlite:///' + os.path.join(self.directory.name, 'poker.db')
+        self.engine = create_engine(self.url)
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE hand_histories (id INTEGER PRIMARY KEY, game_session_id INTEGER, "
+                "user_id INTEGER, hand_data TEXT, result TEXT)"
+            ))
+        self.insert([logged_hand(fold=i % 3 == 0) for i in range(9)] + ['not json'])
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.directory.cleanup()
+
+    def insert(self, hands):
+        with self.engine.begin() as connection:
+            for hand in hands:
+                data = hand if isinstance(hand, str) else json.dumps(hand)
+                connection.execute(text(
+                    "INSERT INTO hand_histories (game_session_id, user_id, hand_data) VALUES (1, 1, :data)"
+                ), {'data': data})
+
+    def test_build_resume_and_sample(self):
+        """Rows stream into shards, a rerun only reads new rows, and the shards train an agent."""
+        output = os.path.join(self.directory.name, 'dataset')
+        report = build_dataset(self.url, output, chunk_size=4, shard_size=10)
+        self.assertEqual((report['hands'], report['skipped']), (9, 1))
+        with open(os.path.join(output, 'manifest.json')) as f:
+            self.assertEqual(json.load(f)['last_id'], 10)  # The unreadable last row is not read again
+        self.insert([logged_hand()])
+        report = build_dataset(self.url, output, chunk_size=4, shard_size=10)
+        self.assertEqual((report['hands'], report['skipped']), (1, 0))
+
+        dataset = TransitionDataset(output)
+        expected = [t for hand in [logged_hand(fold=i % 3 == 0) for i in range(9)] + [logged_hand()]
+                    for t in replay_hand(hand)]
+        self.assertEqual(len(dataset), len(expected))
+        states, actions, rewards, next_states, dones = dataset.gather(np.arange(len(dataset)))
+        np.testing.assert_allclose(states.numpy(), np.stack([t[0] for t in expected]), rtol=1e-3)
+        np.testing.assert_array_equal(rewards.numpy(), [t[2] for t in expected])
+
+        agent = DQNAgent(state_size=112, action_size=3, memory=dataset)
+        agent.replay(16)
+        self.assertEqual(agent.train_steps, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
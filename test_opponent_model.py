@@ -0,0 +1,87 @@
+# test_opponent_model.py
+
+import unittest
+from game_logic import GameLogic
+from player import Player
+from poker_bot import PokerBot
+from opponent_model import OpponentTracker, NUM_FEATURES, SAW_FLOP
+
+
+class TestOpponentTracker(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a table with an opponent tracker attached."""
+        self.game = GameLogic()
+        self.tracker = OpponentTracker(capacity=1)
+        self.game.opponent_tracker = self.tracker
+        self.alice = Player(name="Alice", chips=1000)
+        self.bob = Player(name="Bob", chips=1000)
+        self.game.players = [self.alice, self.bob]
+        self.game.current_bet = 20
+
+    def test_preflop_raise_counts_vpip_and_pfr_once(self):
+        """Several pre-flop raises in one hand count as one VPIP and one PFR."""
+        self.tracker.start_hand(self.game.players)
+        self.game.process_player_action(self.alice, 'raise')
+        self.game.process_player_action(self.alice, 'raise')
+        stats = self.tracker.stats(self.alice)
+        self.assertEqual(stats['hands'], 1)
+        self.assertEqual(stats['vpip'], 1.0)
+        self.assertEqual(stats['pfr'], 1.0)
+
+    def test_fold_to_raise(self):
+        """Folding against a raise is counted as fold to raise."""
+        self.tracker.start_hand(self.game.players)
+        self.game.process_player_action(self.alice, 'raise')
+        self.game.process_player_action(self.bob, 'fold')
+        self.assertEqual(self.tracker.stats(self.bob)['fold_to_raise'], 1.0)
+        self.assertEqual(self.tracker.stats(self.bob)['vpip'], 0.0)
+
+    def test_all_in_preflop_sees_the_flop(self):
+        """A player all-in before the flop still sees it, so showdown frequency stays at most 1."""
+        for _ in range(3):
+            self.game.shuffle_and_deal()
+            self.game.process_player_action(self.alice, 'raise')
+            self.alice.is_all_in = True
+            self.game.process_player_action(self.bob, 'call')
+            self.game.game_phase = 'flop'
+            self.game.deal_community_cards(3)
+            self.game.process_player_action(self.bob, 'call')
+            self.game.deal_community_cards(1)
+            self.tracker.record_showdown(self.game.players)
+        self.assertEqual(self.tracker.stats(self.alice)['showdown_frequency'], 1.0)
+        self.assertEqual(self.tracker.stats(self.bob)['showdown_frequency'], 1.0)
+        self.assertEqual(self.tracker.counters[self.tracker.rows['Bob'], SAW_FLOP], 3)
+
+    def test_decay_fades_old_hands(self):
+        """With decay, old hands weigh less than recent ones."""
+        tracker = OpponentTracker(decay=0.5)
+        tracker.start_hand([self.alice])
+        tracker.record_action(self.alice, 'call', 'pre-flop', False)
+        tracker.start_hand([self.alice])
+        tracker.record_action(self.alice, 'fold', 'pre-flop', False)
+        # VPIP = 0.5 / (0.5 + 1)
+        self.assertAlmostEqual(tracker.stats(self.alice)['vpip'], 1 / 3)
+
+    def test_table_grows_with_players_not_hands(self):
+        """Playing many hands does not allocate more rows."""
+        for _ in range(1000):
+            self.tracker.start_hand(self.game.players)
+        self.assertEqual(len(self.tracker.counters), 2)
+        self.assertEqual(self.tracker.stats(self.bob)['hands'], 1000)
+
+    def test_bot_state_includes_opponent_features(self):
+        """The bot state carries the opponent statistics when a tracker is set."""
+        bot = PokerBot(name="Bot", chips=1000, state_size=112 + NUM_FEATURES)
+        bot.opponent_tracker = self.tracker
+        self.game.players = [bot, self.bob]
+        self.tracker.start_hand(self.game.players)
+        self.game.process_player_action(self.bob, 'raise')
+        state = bot.encode_game_state(self.game)
+        self.assertEqual(state.shape, (112 + NUM_FEATURES,))
+        self.assertEqual(state[112], 1.0)  # Bob's VPIP
+        self.assertEqual(state[113], 1.0)  # Bob's PFR
+
+
+if __name__ == '__main__':
+    unittest.main()
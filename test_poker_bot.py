@@ -0,0 +1,66 @@
+# test_poker_bot.py
+
+import unittest
+from game_logic import GameLogic
+from poker_bot import PokerBot
+from decision_budget import DecisionMetrics
+
+
+class TestPokerBotDecisions(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a heads-up table with a bot holding pocket aces."""
+        self.game = GameLogic()
+        self.bot = PokerBot(name="Bot", chips=1000)
+        self.opponent = PokerBot(name="Opponent", chips=1000)
+        self.game.players = [self.bot, self.opponent]
+        self.bot.hand = [
+            {'value': 'Ace', 'suit': 'Hearts'},
+            {'value': 'Ace', 'suit': 'Spades'}
+        ]
+        self.opponent.hand = [
+            {'value': '7', 'suit': 'Clubs'},
+            {'value': '2', 'suit': 'Diamonds'}
+        ]
+        self.game.pot = 30
+        self.game.current_bet = 20
+        self.bot.current_bet = 10
+
+    def test_zero_budget_uses_heuristic(self):
+        """With no time left only the heuristic tier may answer."""
+        action = self.bot.decide_action(self.game, budget=0)
+        self.assertEqual(action, 'raise')
+        self.assertEqual(self.bot.decision_metrics.tier_counts['heuristic'], 1)
+
+    def test_equity_tier_answers_with_enough_time(self):
+        """A generous budget lets the sampled equity tier answer."""
+        action = self.bot.decide_action(self.game, budget=0.5)
+        self.assertEqual(action, 'raise')
+        self.assertEqual(self.bot.decision_metrics.tier_counts['equity'], 1)
+
+    def test_network_tier_without_refinement(self):
+        """Without equity refinement the network answers."""
+        self.bot.equity_refinement = False
+        action = self.bot.decide_action(self.game, budget=0.5)
+        self.assertIn(action, ['fold', 'call', 'raise'])
+        self.assertEqual(self.bot.decision_metrics.tier_counts['network'], 1)
+
+    def test_weak_hand_folds_to_a_bet(self):
+        """The heuristic folds a weak hand when facing a large bet."""
+        self.opponent.current_bet = 0
+        self.game.current_bet = 400
+        self.assertEqual(self.opponent.decide_action(self.game, budget=0), 'fold')
+
+    def test_metrics_track_overruns(self):
+        """Decisions that finish after their deadline are counted as overruns."""
+        metrics = DecisionMetrics()
+        metrics.record_decision('network', 0.02, 0.01)
+        metrics.record_decision('heuristic', 0.001, 0.01)
+        summary = metrics.summary()
+        self.assertEqual(summary['decisions'], 2)
+        self.assertEqual(summary['overruns'], 1)
+        self.assertEqual(summary['tiers'], {'network': 1, 'heuristic': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
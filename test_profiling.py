@@ -0,0 +1,76 @@
+# test_profiling.py
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import numpy as np
+from hand_evaluator import evaluate_hands_batch
+from profiling import (CProfileSession, SamplingProfiler, classify, start_from_env, start_profiling,
+                       write_profile, ENV_DIRECTORY, ENV_MODE, ENV_SECONDS)
+
+
+def evaluate_for(seconds):
+    hands = np.random.default_rng(0).integers(0, 52, size=(2000, 7))
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        evaluate_hands_batch(hands)
+
+
+class TestClassify(unittest.TestCase):
+
+    def test_subsystems(self):
+        self.assertEqual(classify('/app/hand_evaluator.py', 'evaluate_hands_batch'), 'evaluator')
+        self.assertEqual(classify('/app/poker_bot.py', 'encode_game_state'), 'encoding')
+        self.assertEqual(classify('/app/poker_bot.py', 'decide_action'), 'engine')
+        self.assertEqual(classify('/venv/site-packages/torch/nn/modules/linear.py', 'forward'), 'torch')
+        self.assertEqual(classify('/venv/site-packages/sqlalchemy/engine/base.py', 'execute'), 'database')
+        self.assertEqual(classify('~', "<built-in method torch._C._nn.linear>"), 'torch')
+        self.assertIsNone(classify('/usr/lib/python3/json/decoder.py', 'decode'))
+
+
+class TestProfilers(unittest.TestCase):
+
+    def test_sampling_attributes_stacks(self):
+        profiler = SamplingProfiler(interval=0.001).start()
+        evaluate_for(0.3)
+        profiler.stop()
+        self.assertGreater(profiler.samples, 10)
+        self.assertEqual(profiler.subsystem_totals().most_common(1)[0][0], 'evaluator')
+        stack, count = profiler.collapsed_lines()[0].rsplit(' ', 1)
+        self.assertTrue(stack.startswith('evaluator;'))
+        self.assertGreater(int(count), 0)
+
+    def test_cprofile_report_and_files(self):
+        session = CProfileSession().start()
+        evaluate_for(0.1)
+        session.stop()
+        labels = {(label, subsystem) for label, subsystem, *_ in session.top(50)}
+        self.assertIn(('hand_evaluator:evaluate_hands_batch', 'evaluator'), labels)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_profile(session, directory, 'test')
+            self.assertTrue(paths[1].endswith('.prof'))
+            self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+
+    def test_fixed_window(self):
+        """A sampling window writes its output once it ends, without waiting for exit."""
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = start_profiling('sample', 'window', directory, seconds=0.2, interval=0.001)
+            evaluate_for(0.5)
+            self.assertIsNone(profiler.thread)
+            self.assertEqual(sorted(name.rsplit('.', 1)[-1] for name in os.listdir(directory)), ['collapsed', 'txt'])
+
+    def test_threaded_env_samples_instead_of_cprofile(self):
+        """A threaded program asking for cprofile is sampled, so work on other threads is seen."""
+        with tempfile.TemporaryDirectory() as directory:
+            environ = {ENV_MODE: 'cprofile', ENV_DIRECTORY: directory, ENV_SECONDS: '0.2'}
+            with mock.patch.dict(os.environ, environ):
+                profiler = start_from_env('threaded', threaded=True)
+            self.assertIsInstance(profiler, SamplingProfiler)
+            evaluate_for(0.5)
+            self.assertIsNone(profiler.thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+# test_replay_buffer.py
+
+import multiprocessing
+import pickle
+import tempfile
+import unittest
+import numpy as np
+import torch
+from replay_buffer import (ReplayBuffer, PrioritizedReplayBuffer, SumTree, MemmapReplayBuffer,
+                           CompactReplayBuffer, CompactPrioritizedReplayBuffer)
+from transition_codec import StateCodec
+from dqn_agent import DQNAgent
+from game_logic import GameLogic
+from opponent_model import OpponentTracker
+from poker_bot import PokerBot
+
+
+class TestReplayBuffer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small buffer."""
+        self.buffer = ReplayBuffer(capacity=4, state_size=3)
+
+    def add_transitions(self, count):
+        for i in range(count):
+            state = np.full(3, i, dtype=np.float32)
+            self.buffer.add(state, i % 3, float(i), state + 1, i % 2 == 0)
+
+    def test_wraps_around_when_full(self):
+        """The oldest transitions are overwritten once the buffer is full."""
+        self.add_transitions(6)
+        self.assertEqual(len(self.buffer), 4)
+        self.assertEqual(self.buffer.cursor, 2)
+        self.assertEqual(sorted(self.buffer.rewards.tolist()), [2.0, 3.0, 4.0, 5.0])
+
+    def test_sample_returns_batched_tensors(self):
+        """Samples come back as batched tensors that line up with each other."""
+        self.add_transitions(4)
+        states, actions, rewards, next_states, dones = self.buffer.sample(16)
+        self.assertEqual(states.shape, (16, 3))
+        self.assertEqual(actions.dtype, torch.int64)
+        self.assertTrue(torch.equal(states[:, 0], rewards))
+        self.assertTrue(torch.equal(next_states, states + 1))
+
+    def test_memory_known_up_front(self):
+        """The buffer size in bytes does not change as it fills."""
+        before = self.buffer.nbytes
+        self.add_transitions(10)
+        self.assertEqual(self.buffer.nbytes, before)
+        self.assertEqual(before, 4 * (3 * 4 * 2 + 8 + 4 + 4))
+
+
+class TestPrioritizedReplay(unittest.TestCase):
+
+    def test_sum_tree_totals_and_lookup(self):
+        """The root holds the total and lookups land in the right leaf."""
+        tree = SumTree(5)
+        tree.update([0, 1, 2, 3, 4], [1.0, 2.0, 3.0, 4.0, 0.0])
+        self.assertEqual(tree.total, 10.0)
+        self.assertEqual(tree.find([0.5, 1.5, 3.5, 9.9]).tolist(), [0, 1, 2, 3])
+        tree.update([1, 1], [5.0, 0.0])
+        self.assertEqual(tree.total, 8.0)
+
+    def test_sampling_follows_priorities(self):
+        """High-priority transitions are sampled far more often."""
+        np.random.seed(0)
+        buffer = PrioritizedReplayBuffer(capacity=100, state_size=2, alpha=1.0)
+        for i in range(100):
+            buffer.add(np.zeros(2), 0, 0.0, np.zeros(2), False)
+        buffer.update_priorities(np.arange(100), np.where(np.arange(100) == 7, 99.0, 0.0))
+        indices = buffer.sample_indices(1000)
+        self.assertGreater(np.mean(indices == 7), 0.9)
+
+    def test_weights_anneal_towards_one(self):
+        """Beta grows to 1 and weights are normalised to at most 1."""
+        buffer = PrioritizedReplayBuffer(capacity=10, state_size=2, beta_start=0.4, beta_steps=10)
+        for i in range(10):
+            buffer.add(np.zeros(2), 0, 0.0, np.zeros(2), False)
+        buffer.update_priorities(np.arange(10), np.arange(10) + 1.0)
+        for _ in range(10):
+            *_, weights, indices = buffer.sample(8)
+        self.assertEqual(buffer.beta, 1.0)
+        self.assertLessEqual(float(weights.max()), 1.0)
+
+    def test_agent_updates_priorities(self):
+        """A prioritised agent writes TD errors back as priorities."""
+        agent = DQNAgent(state_size=4, action_size=2, prioritized=True, memory_size=64)
+        for _ in range(64):
+            agent.remember(np.random.rand(4), 0, 1.0, np.random.rand(4), True)
+        agent.replay(32)
+        priorities = agent.memory.tree.get(np.arange(64))
+        self.assertFalse(np.allclose(priorities, priorities[0]))
+
+
+def _append_from_worker(buffer, worker):
+    """Appends ten transitions tagged with the worker number."""
+    for _ in range(10):
+        buffer.add(np.full(2, worker), worker, float(worker), np.zeros(2), False)
+
+
+def _create_and_append(path, worker):
+    """Opens (or creates) the store at path and appends from this worker."""
+    _append_from_worker(MemmapReplayBuffer(path, capacity=100, state_size=2), worker)
+
+
+def played_states(state_size, tracker=False, hands=20):
+    """Encodes the states a bot sees over a few random hands."""
+    game = GameLogic()
+    game.verbose = False
+    bot = PokerBot('Bot', state_size=state_size)
+    other = PokerBot('Other', state_size=state_size)
+    game.add_player(bot)
+    game.add_player(other)
+    if tracker:
+        bot.opponent_tracker = game.opponent_tracker = OpponentTracker()
+    states = []
+    for _ in range(hands):
+        game.shuffle_and_deal()
+        game.prepare_round()
+        for phase, cards in (('pre-flop', 0), ('flop', 3), ('turn', 1), ('river', 1)):
+            game.game_phase = phase
+            game.deal_community_cards(cards)
+            game.process_player_action(other, ['call', 'raise'][np.random.randint(2)])
+            states.append(bot.encode_game_state(game))
+    return np.array(states)
+
+
+class TestCompactReplayBuffer(unittest.TestCase):
+
+    def test_codec_round_trip(self):
+        """Cards, phase and padding decode exactly and scalars to float16 precision."""
+        for state_size, tracker, extras in ((200, False, 0), (112, False, 0), (200, True, 5)):
+            states = played_states(state_size, tracker)
+            codec = StateCodec(state_size, extras)
+            decoded = codec.decode(codec.encode(states))
+            np.testing.assert_allclose(decoded, states, rtol=1e-3, atol=1e-6)
+            np.testing.assert_array_equal(decoded[:, :104], states[:, :104])
+            np.testing.assert_array_equal(decoded[:, 107:112], states[:, 107:112])
+
+    def test_samples_match_dense_buffer(self):
+        """The compact buffer returns the same batches as the dense one, in a tenth of the memory."""
+        states = played_states(200)
+        dense = ReplayBuffer(100, 200)
+        compact = CompactReplayBuffer(100, 200)
+        actions = np.arange(len(states) - 1) % 3
+        rewards = np.linspace(-1, 1, len(states) - 1)
+        dones = actions == 0
+        for buffer in (dense, compact):
+            buffer.add_batch(states[:-1], actions, rewards, states[1:], dones)
+        indices = np.arange(len(dense))
+        for a, b in zip(dense.gather(indices), compact.gather(indices)):
+            self.assertEqual(a.dtype, b.dtype)
+            self.assertTrue(torch.allclose(a, b, rtol=1e-3, atol=1e-6))
+        self.assertLess(compact.nbytes * 10, dense.nbytes)
+
+    def test_agent_keeps_opponent_features(self):
+        """The agent's compact storage detects tracker features; a codec told there are none refuses them."""
+        states = played_states(200, tracker=True)
+        for prioritized in (False, True):
+            agent = DQNAgent(state_size=200, action_size=3, prioritized=prioritized, compact_memory=True)
+            agent.memory.add_batch(states[:-1], np.ones(len(states) - 1), np.zeros(len(states) - 1),
+                                   states[1:], np.zeros(len(states) - 1))
+            self.assertEqual(agent.memory.codec.extra_features, 5)
+            decoded = agent.memory.gather(np.arange(len(states) - 1))[0].numpy()
+            np.testing.assert_allclose(decoded, states[:-1], rtol=1e-3, atol=1e-6)
+        with self.assertRaises(ValueError):
+            StateCodec(200, 0).encode(states)
+
+    def test_agent_compact_memory_ratio(self):
+        """At the bot's default state size the agent's compact storage is over ten times smaller than dense."""
+        states = played_states(200)
+        agent = DQNAgent(state_size=200, action_size=3, compact_memory=True, memory_size=10000)
+        dense = ReplayBuffer(10000, 200)
+        for buffer in (agent.memory, dense):
+            buffer.add_batch(states[:-1], np.ones(len(states) - 1), np.zeros(len(states) - 1),
+                             states[1:], np.zeros(len(states) - 1))
+        self.assertEqual(agent.memory.codec.extra_features, 0)
+        self.assertGreater(dense.nbytes / agent.memory.nbytes, 10)
+
+    def test_agent_trains_on_compact_prioritized_memory(self):
+        """Prioritised replay works on the compact storage too."""
+        agent = DQNAgent(state_size=200, action_size=3, prioritized=True, compact_memory=True)
+        self.assertIsInstance(agent.memory, CompactPrioritizedReplayBuffer)
+        states = played_states(200)
+        for state, next_state in zip(states[:-1], states[1:]):
+            agent.remember(state, 1, 0.5, next_state, False)
+        agent.replay(8)
+        self.assertEqual(agent.train_steps, 1)
+
+
+class TestMemmapReplayBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_survives_reopen(self):
+        """Transitions written before a restart are still there after reopening."""
+        buffer = MemmapReplayBuffer(self.path, capacity=8, state_size=2)
+        for i in range(5):
+            buffer.add(np.full(2, i), i, float(i), np.zeros(2), False)
+        buffer.flush()
+        del buffer
+        reopened = MemmapReplayBuffer(self.path, capacity=8, state_size=2)
+        self.assertEqual(len(reopened), 5)
+        self.assertEqual(reopened.cursor, 5)
+        self.assertEqual(reopened.rewards[:5].tolist(), [0.0, 1.0, 2.0, 3.0, 4.0])
+
+    def test_rejects_mismatched_layout(self):
+        """Reopening with a different layout is an error."""
+        MemmapReplayBuffer(self.path, capacity=8, state_size=2)
+        with self.assertRaises(ValueError):
+            MemmapReplayBuffer(self.path, capacity=8, state_size=3)
+
+    def test_concurrent_appends_from_processes(self):
+        """Appends from several processes all land in the shared store."""
+        buffer = MemmapReplayBuffer(self.path, capacity=100, state_size=2)
+        self.assertLess(len(pickle.dumps(buffer)), 1000)  # Only the path travels
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=_append_from_worker, args=(buffer, worker)) for worker in range(1, 3)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+        self.assertEqual(len(buffer), 20)
+        self.assertEqual(sorted(np.bincount(buffer.actions[:20]).tolist()), [0, 10, 10])
+
+    def test_processes_create_one_store(self):
+        """Processes opening a new directory at once share one store instead of each creating it."""
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=_create_and_append, args=(self.path, worker)) for worker in range(1, 4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+        buffer = MemmapReplayBuffer(self.path, capacity=100, state_size=2)
+        self.assertEqual(len(buffer), 30)
+        self.assertEqual(sorted(np.bincount(buffer.actions[:30]).tolist()), [0, 10, 10, 10])
+
+    def test_zero_copy_view_and_agent_training(self):
+        """Views share memory with the files and a DQNAgent can train from the store."""
+        buffer = MemmapReplayBuffer(self.path, capacity=64, state_size=4)
+        agent = DQNAgent(state_size=4, action_size=2, memory=buffer)
+        for _ in range(64):
+            agent.remember(np.random.rand(4), 1, 1.0, np.random.rand(4), True)
+        states, *_ = buffer.view(0, 8)
+        self.assertEqual(states.data_ptr(), buffer.states.ctypes.data)
+        agent.replay(32)
+        self.assertEqual(agent.train_steps, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
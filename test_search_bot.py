@@ -0,0 +1,68 @@
+# test_search_bot.py
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from game_logic import GameLogic
+from search_bot import SearchBot
+from player import Player
+
+
+class TestSearchBot(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a heads-up table on the flop."""
+        self.game = GameLogic()
+        self.bot = SearchBot(name="Searcher", chips=1000)
+        self.opponent = Player(name="Opponent", chips=1000)
+        self.game.players = [self.bot, self.opponent]
+        self.game.deck = self.game.create_deck()
+        self.bot.hand = [
+            {'value': 'Ace', 'suit': 'Hearts'},
+            {'value': 'Ace', 'suit': 'Spades'}
+        ]
+        self.opponent.hand = [
+            {'value': '7', 'suit': 'Clubs'},
+            {'value': '2', 'suit': 'Diamonds'}
+        ]
+        self.game.community_cards = [
+            {'value': 'Ace', 'suit': 'Clubs'},
+            {'value': 'King', 'suit': 'Diamonds'},
+            {'value': '4', 'suit': 'Spades'}
+        ]
+        dealt = self.bot.hand + self.opponent.hand + self.game.community_cards
+        self.game.deck = [card for card in self.game.deck if card not in dealt]
+        self.game.game_phase = 'flop'
+        self.game.pot = 40
+        self.game.current_bet = 20
+
+    def test_snapshot_restore_round_trip(self):
+        """Restoring a snapshot undoes every change made to the hand."""
+        snapshot = self.game.snapshot()
+        self.game.verbose = False
+        self.game.process_player_action(self.bot, 'raise')
+        self.game.deal_community_cards(2)
+        self.game.showdown()
+        self.game.restore(snapshot)
+        self.assertEqual(self.game.snapshot(), snapshot)
+
+    def test_search_is_silent_and_restores_state(self):
+        """A search prints nothing and leaves the game untouched."""
+        snapshot = self.game.snapshot()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            action = self.bot.decide_action(self.game, budget=0.1)
+        self.assertEqual(output.getvalue(), '')
+        self.assertEqual(self.game.snapshot(), snapshot)
+        self.assertTrue(self.game.verbose)
+        self.assertIn(action, ['call', 'raise'])
+
+    def test_reports_rollout_rate(self):
+        """The bot reports how many rollouts it completed per second."""
+        self.bot.decide_action(self.game, budget=0.05)
+        self.assertGreater(self.bot.search_stats['rollouts'], 0)
+        self.assertGreater(self.bot.rollouts_per_second(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
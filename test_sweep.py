@@ -0,0 +1,49 @@
+# test_sweep.py
+
+import csv
+import os
+import random
+import tempfile
+import unittest
+from dqn_agent import DQNAgent
+from sweep import SEARCH_SPACE, rung_seed, run_rung, sample_config, successive_halving
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_sample_config_within_space(self):
+        """Sampled values come from the search space."""
+        config = sample_config(random.Random(0))
+        low, high = SEARCH_SPACE['learning_rate'][1:]
+        self.assertTrue(low <= config['learning_rate'] <= high)
+        self.assertIn(config['hidden_size'], SEARCH_SPACE['hidden_size'][1])
+
+    def test_hidden_size(self):
+        """The network width follows hidden_size."""
+        agent = DQNAgent(state_size=8, action_size=3, hidden_size=16)
+        self.assertEqual(agent.model[0].out_features, 16)
+
+    def test_rerun_starts_fresh(self):
+        """Rung 0 ignores state left by an earlier sweep, even with another network width."""
+        config = {'learning_rate': 1e-3, 'gamma': 0.9, 'epsilon_decay': 0.99, 'hidden_size': 16, 'batch_size': 32}
+        with tempfile.TemporaryDirectory() as directory:
+            run_rung(0, config, 2, directory, 1, seed=0)
+            run_rung(0, dict(config, hidden_size=32), 2, directory, 1, seed=0)
+            run_rung(0, dict(config, hidden_size=32), 2, directory, 1, seed=0, rung=1)
+        self.assertNotEqual(rung_seed(0, 0, 0), rung_seed(0, 0, 1))
+
+    def test_successive_halving(self):
+        """Weak trials stop after the first rung and every result lands in the table."""
+        with tempfile.TemporaryDirectory() as directory:
+            final = successive_halving(num_trials=4, min_episodes=4, eta=2, eval_episodes=3,
+                                       processes=1, directory=directory)
+            with open(os.path.join(directory, 'results.csv')) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(final), 2)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(sum(row['status'] == 'stopped' for row in rows), 2)
+        self.assertEqual({row['episodes'] for row in rows if row['rung'] == '1'}, {'8'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# test_training_loop.py
+
+import os
+import tempfile
+import unittest
+import torch
+from dqn_agent import DQNAgent, configure_threads
+from poker_env import PokerEnv
+from training_loop import train_agent, train_agent_vectorized
+from vec_env import PokerVecEnv
+
+
+class CountingAgent(DQNAgent):
+    """DQNAgent that records the env step at which each gradient step ran."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.steps_seen = 0
+        self.update_steps = []
+
+    def remember(self, *args):
+        super().remember(*args)
+        self.steps_seen += 1
+
+    def remember_batch(self, states, *args):
+        super().remember_batch(states, *args)
+        self.steps_seen += len(states)
+
+    def replay(self, batch_size, decay_epsilon=True):
+        self.update_steps.append((self.steps_seen, batch_size))
+        super().replay(batch_size, decay_epsilon)
+
+
+class TestUpdateSchedule(unittest.TestCase):
+
+    def test_schedule(self):
+        """Updates start after warmup and run gradient_steps times every update_interval steps."""
+        agent = CountingAgent(state_size=112, action_size=3)
+        with tempfile.TemporaryDirectory() as directory:
+            train_agent(PokerEnv(), agent, num_episodes=40, batch_size=8, save_interval=100,
+                        model_save_path=os.path.join(directory, 'model.pth'),
+                        warmup_steps=20, update_interval=4, gradient_steps=2)
+        steps = [step for step, _ in agent.update_steps]
+        self.assertTrue(steps)
+        self.assertGreater(min(steps), 20)
+        self.assertTrue(all(step % 4 == 0 for step in steps))
+        self.assertTrue(all(steps.count(step) == 2 for step in set(steps)))
+        self.assertEqual({batch for _, batch in agent.update_steps}, {8})
+        decays = agent.steps_seen - 20
+        self.assertAlmostEqual(agent.epsilon, agent.epsilon_decay ** decays, places=6)
+
+    def test_vectorized_schedule(self):
+        """The vectorised loop follows the same env-step schedule across its environments."""
+        agent = CountingAgent(state_size=112, action_size=3)
+        vec_env = PokerVecEnv(4)
+        with tempfile.TemporaryDirectory() as directory:
+            train_agent_vectorized(vec_env, agent, num_episodes=40, batch_size=8, save_interval=100,
+                                   model_save_path=os.path.join(directory, 'model.pth'),
+                                   warmup_steps=20, update_interval=8, gradient_steps=2)
+        vec_env.close()
+        steps = [step for step, _ in agent.update_steps]
+        self.assertGreater(min(steps), 20)
+        self.assertTrue(all(step % 8 == 0 for step in steps))
+        self.assertEqual(len(steps), 2 * (agent.steps_seen // 8 - 20 // 8))
+        decays = agent.steps_seen - 20
+        self.assertAlmostEqual(agent.epsilon, agent.epsilon_decay ** decays, places=6)
+
+    def test_time_budget(self):
+        """Both loops stop once the wall-clock budget is used, long before num_episodes."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.pth')
+            rewards, _ = train_agent(PokerEnv(), DQNAgent(state_size=112, action_size=3), num_episodes=10 ** 6,
+                                     save_interval=10 ** 7, model_save_path=path, time_budget=0.5)
+            self.assertLess(len(rewards), 10 ** 6)
+            vec_env = PokerVecEnv(2)
+            rewards, _ = train_agent_vectorized(vec_env, DQNAgent(state_size=112, action_size=3),
+                                                num_episodes=10 ** 6, save_interval=10 ** 7,
+                                                model_save_path=path, time_budget=0.5)
+            vec_env.close()
+            self.assertLess(len(rewards), 10 ** 6)
+
+    def test_configure_threads(self):
+        """The intra-op thread count follows the request."""
+        previous = torch.get_num_threads()
+        try:
+            self.assertEqual(configure_threads(1)[0], 1)
+        finally:
+            torch.set_num_threads(previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
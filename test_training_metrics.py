@@ -0,0 +1,65 @@
+# test_training_metrics.py
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from dqn_agent import DQNAgent
+from poker_env import PokerEnv
+from training_loop import train_agent
+from training_metrics import TrainingMetrics, RotatingWriter, FIELDS
+
+
+class TestTrainingMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_nested_sections_exclude_inner_time(self):
+        """Time spent in a nested section is not counted twice."""
+        metrics = TrainingMetrics(summary_interval=1e9)
+        metrics.start('env_step')
+        metrics.start('encode')
+        time.sleep(0.02)
+        metrics.stop()
+        metrics.stop()
+        self.assertGreaterEqual(metrics.section_times['encode'], 0.02)
+        self.assertLess(metrics.section_times['env_step'], 0.01)
+
+    def test_writer_rotates(self):
+        """Files past max_bytes are rotated and each CSV file starts with a header."""
+        path = os.path.join(self.directory, 'metrics.csv')
+        writer = RotatingWriter(path, max_bytes=300, backups=2)
+        for step in range(20):
+            writer.write({'env_steps': step})
+        writer.close()
+        self.assertTrue(os.path.exists(path + '.1'))
+        self.assertFalse(os.path.exists(path + '.3'))
+        with open(path + '.1') as f:
+            self.assertEqual(next(csv.reader(f)), FIELDS)
+
+    def test_train_agent_streams_records(self):
+        """A short training run writes records with throughput and learning stats."""
+        path = os.path.join(self.directory, 'metrics.jsonl')
+        metrics = TrainingMetrics(path, log_interval=5, summary_interval=1e9)
+        agent = DQNAgent(state_size=112, action_size=3)
+        train_agent(PokerEnv(), agent, num_episodes=10, batch_size=4, save_interval=100,
+                    model_save_path=os.path.join(self.directory, 'model.pth'), metrics=metrics)
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertTrue(records)
+        last = records[-1]
+        self.assertGreater(last['env_steps_per_s'], 0)
+        self.assertIn('loss', last)
+        self.assertGreater(last['buffer_fill'], 0)
+        self.assertLessEqual(sum(last[f'{s}_fraction'] for s in ('env_step', 'encode', 'act', 'sample', 'backprop')), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
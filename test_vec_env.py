@@ -0,0 +1,54 @@
+# test_vec_env.py
+
+import tempfile
+import os
+import unittest
+import numpy as np
+from vec_env import PokerVecEnv
+from dqn_agent import DQNAgent
+from training_loop import train_agent_vectorized
+
+
+class TestPokerVecEnv(unittest.TestCase):
+
+    def check_backend(self, backend):
+        vec_env = PokerVecEnv(4, backend=backend, num_workers=2)
+        try:
+            observations = vec_env.reset()
+            self.assertEqual(observations.shape, (4, vec_env.state_size))
+            self.assertEqual(observations.dtype, np.float32)
+            finished = 0
+            for _ in range(50):
+                # Folding ends every episode at once
+                observations, rewards, dones, infos = vec_env.step(np.zeros(4, dtype=np.int64))
+                self.assertTrue(dones.all())
+                finished += int(dones.sum())
+                for info in infos:
+                    self.assertEqual(info['terminal_observation'].shape, (vec_env.state_size,))
+            self.assertEqual(finished, 200)
+            # Auto-reset leaves a fresh pre-flop observation in every row
+            self.assertEqual(observations[:, :52].sum(axis=1).tolist(), [2.0] * 4)
+        finally:
+            vec_env.close()
+
+    def test_inprocess_backend(self):
+        self.check_backend('inprocess')
+
+    def test_subprocess_backend(self):
+        self.check_backend('subprocess')
+
+    def test_vectorized_training_loop(self):
+        """The training loop collects K transitions per forward pass."""
+        vec_env = PokerVecEnv(4)
+        agent = DQNAgent(state_size=vec_env.state_size, action_size=3)
+        with tempfile.TemporaryDirectory() as directory:
+            rewards, epsilons = train_agent_vectorized(
+                vec_env, agent, num_episodes=20, batch_size=8, save_interval=100,
+                model_save_path=os.path.join(directory, 'agent.pth')
+            )
+        self.assertEqual(len(rewards), 20)
+        self.assertEqual(len(agent.memory) % 4, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
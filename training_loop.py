@@ -1,10 +1,18 @@
 # training_loop.py
 
+import argparse
+import time
 import gym
 import numpy as np
 import torch
 from poker_env import PokerEnv
-from dqn_agent import DQNAgent
+from vec_env import PokerVecEnv
+from actor_learner import train_actor_learner
+from league import League
+from training_metrics import TrainingMetrics
+from checkpoint import CheckpointWriter, latest_checkpoint, load_checkpoint, rng_state, set_rng_state
+from dqn_agent import DQNAgent, configure_threads
+from profiling import add_profile_arguments, start_from_args
 from collections import deque
 import os
 
@@ -15,10 +23,36 @@ def train_agent(
     max_steps_per_episode=100,
     batch_size=32,
     save_interval=100,
-    model_save_path='models/poker_dqn_agent.pth'
+    model_save_path='models/poker_dqn_agent.pth',
+    league=None,
+    league_interval=50,
+    checkpoint_dir=None,
+    checkpoint_interval=100,
+    keep_checkpoints=3,
+    resume=False,
+    metrics=None,
+    warmup_steps=0,
+    update_interval=1,
+    gradient_steps=1,
+    target_reward=None,
+    target_window=100,
+    time_budget=None
 ):
     """
     Trains the DQN agent in the PokerEnv environment.
+    Learning starts after warmup_steps env steps and then runs gradient_steps
+    replay updates of batch_size every update_interval env steps; exploration
+    decays once per env step whatever the schedule. With target_reward, training
+    stops early once the mean reward over the last target_window episodes reaches it,
+    and with time_budget once that many seconds have passed.
+    With a League, a checkpoint joins the pool every league_interval episodes, the
+    opponent is redrawn from the pool, and the saved best model is the league's
+    highest-rated checkpoint instead of the best single-episode reward.
+    With checkpoint_dir, the full training state is checkpointed every
+    checkpoint_interval episodes and every save is written by a background thread;
+    resume=True continues from the newest checkpoint in that directory.
+    A TrainingMetrics instance, if given, times each part of a step and records
+    loss, Q-values and buffer fill.
     """
     # Create a directory for saving models if it doesn't exist
     os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
@@ -27,9 +61,37 @@ def train_agent(
     rewards_all_episodes = []
     epsilon_history = []
     max_reward = float('-inf')
+    start_episode = 1
+    env_steps = 0
+    start_time = time.perf_counter()
+
+    writer = CheckpointWriter(checkpoint_dir, keep_last=keep_checkpoints) if checkpoint_dir else None
+    if metrics is not None:
+        agent.metrics = metrics
+        env.metrics = metrics
+
+    def save_model():
+        if writer is not None:
+            writer.submit(agent.model_state(), model_save_path)
+        else:
+            agent.save(model_save_path)
+
+    if resume and checkpoint_dir:
+        path = latest_checkpoint(checkpoint_dir)
+        if path is not None:
+            checkpoint = load_checkpoint(path)
+            agent.load_training_state(checkpoint['agent'])
+            set_rng_state(checkpoint['rng'])
+            env.game_logic.dealer_position = checkpoint['dealer_position']
+            rewards_all_episodes = checkpoint['rewards']
+            epsilon_history = checkpoint['epsilons']
+            max_reward = checkpoint['max_reward']
+            env_steps = checkpoint.get('env_steps', 0)
+            start_episode = checkpoint['episode'] + 1
+            print(f"Resumed from {path} at episode {start_episode}")
 
     # Loop over episodes
-    for episode in range(1, num_episodes + 1):
+    for episode in range(start_episode, num_episodes + 1):
         state = env.reset()
         done = False
         total_reward = 0
@@ -37,16 +99,30 @@ def train_agent(
         # Loop over steps within an episode
         for step in range(max_steps_per_episode):
             # Agent selects an action
+            if metrics is not None:
+                metrics.start('act')
             action = agent.act(state)
+            if metrics is not None:
+                metrics.stop()
+                metrics.start('env_step')
 
             # Environment processes the action
             next_state, reward, done, info = env.step(action)
+            if metrics is not None:
+                metrics.stop()
 
             # Agent stores the experience
             agent.remember(state, action, reward, next_state, done)
 
-            # Agent learns from experience
-            agent.replay(batch_size)
+            # Agent learns from experience on the update schedule
+            env_steps += 1
+            if env_steps > warmup_steps and len(agent.memory) >= batch_size:
+                if env_steps % update_interval == 0:
+                    for _ in range(gradient_steps):
+                        agent.replay(batch_size, decay_epsilon=False)
+                agent.decay_epsilon()
+            if metrics is not None:
+                metrics.record_env_steps()
 
             # Update state
             state = next_state
@@ -69,23 +145,203 @@ def train_agent(
 
         # Save the model at regular intervals
         if episode % save_interval == 0:
-            agent.save(model_save_path)
+            save_model()
             print(f"Model saved at episode {episode}")
 
+        if league is not None and episode % league_interval == 0:
+            league.add_checkpoint(agent, f'episode_{episode}')
+            league.update()
+            league.load_opponent(env.opponent)
+            promoted = league.promote_to(model_save_path)
+            if promoted is not None:
+                print(f"League best: {promoted} (Elo {league.members[promoted]['rating']:.0f})")
+
         # Update max_reward and save the best model
-        if total_reward > max_reward:
+        if league is None and total_reward > max_reward:
             max_reward = total_reward
-            agent.save(model_save_path)
+            save_model()
             print(f"New best model saved with reward {max_reward:.2f} at episode {episode}")
 
+        if writer is not None and episode % checkpoint_interval == 0:
+            writer.save_training_state({
+                'episode': episode,
+                'agent': agent.training_state(),
+                'rng': rng_state(),
+                'dealer_position': env.game_logic.dealer_position,
+                'rewards': list(rewards_all_episodes),
+                'epsilons': list(epsilon_history),
+                'max_reward': max_reward,
+                'env_steps': env_steps,
+            }, episode)
+
+        if target_reward is not None and len(rewards_all_episodes) >= target_window:
+            if np.mean(rewards_all_episodes[-target_window:]) >= target_reward:
+                print(f"Target reward {target_reward} reached at episode {episode}")
+                break
+        if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+            print(f"Time budget of {time_budget}s used at episode {episode}")
+            break
+
     # After training is complete, save the final model
-    agent.save(model_save_path)
+    if metrics is not None:
+        metrics.close()
+    if writer is not None:
+        writer.close()
+    if league is not None:
+        league.save()
+        if league.promote_to(model_save_path) is None:
+            agent.save(model_save_path)
+    else:
+        agent.save(model_save_path)
     print("Training complete. Final model saved.")
 
     # Return the performance history
     return rewards_all_episodes, epsilon_history
 
+def train_agent_vectorized(
+    vec_env,
+    agent,
+    num_episodes=1000,
+    batch_size=32,
+    save_interval=100,
+    model_save_path='models/poker_dqn_agent.pth',
+    metrics=None,
+    warmup_steps=0,
+    update_interval=None,
+    gradient_steps=1,
+    target_reward=None,
+    target_window=100,
+    time_budget=None
+):
+    """
+    Trains the DQN agent on a PokerVecEnv.
+    Each iteration chooses actions for all K environments with one forward pass
+    and stores the K transitions with one batched write. Updates follow the
+    schedule of train_agent, counted in env steps across all environments:
+    gradient_steps updates every update_interval steps once warmup_steps have
+    passed, with exploration decaying once per env step. update_interval defaults
+    to K, one update per iteration. target_reward and time_budget stop training
+    early as in train_agent. State encoding is only timed separately with the in-process backend.
+    """
+    os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+
+    rewards_all_episodes = []
+    epsilon_history = []
+    episode_rewards = np.zeros(vec_env.num_envs)
+    env_steps = 0
+    update_interval = update_interval or vec_env.num_envs
+    stop = False
+    start_time = time.perf_counter()
+    if metrics is not None:
+        agent.metrics = metrics
+        for env in getattr(vec_env, 'envs', []):
+            env.metrics = metrics
+
+    states = vec_env.reset()
+    while len(rewards_all_episodes) < num_episodes and not stop:
+        if metrics is not None:
+            metrics.start('act')
+        actions = agent.act_batch(states)
+        if metrics is not None:
+            metrics.stop()
+            metrics.start('env_step')
+        next_states, rewards, dones, infos = vec_env.step(actions)
+        if metrics is not None:
+            metrics.stop()
+
+        # Finished environments were reset already; learn from their true final state
+        final_states = next_states.copy()
+        for i in np.flatnonzero(dones):
+            final_states[i] = infos[i]['terminal_observation']
+        agent.remember_batch(states, actions, rewards, final_states, dones)
+
+        # Run the updates falling due among these K env steps
+        previous_steps = env_steps
+        env_steps += vec_env.num_envs
+        if env_steps > warmup_steps and len(agent.memory) >= batch_size:
+            updates = env_steps // update_interval - max(previous_steps, warmup_steps) // update_interval
+            for _ in range(updates * gradient_steps):
+                agent.replay(batch_size, decay_epsilon=False)
+            for _ in range(min(env_steps - warmup_steps, vec_env.num_envs)):
+                agent.decay_epsilon()
+        if metrics is not None:
+            metrics.record_env_steps(vec_env.num_envs)
+
+        states = next_states
+        episode_rewards += rewards
+
+        for i in np.flatnonzero(dones):
+            rewards_all_episodes.append(episode_rewards[i])
+            epsilon_history.append(agent.epsilon)
+            episode_rewards[i] = 0
+            episode = len(rewards_all_episodes)
+            if episode % 10 == 0:
+                avg_reward = np.mean(rewards_all_episodes[-10:])
+                steps_per_second = env_steps / (time.perf_counter() - start_time)
+                print(f"Episode {episode}/{num_episodes} - Average Reward: {avg_reward:.2f} - "
+                      f"Epsilon: {agent.epsilon:.4f} - Env steps/s: {steps_per_second:.0f}")
+            if episode % save_interval == 0:
+                agent.save(model_save_path)
+                print(f"Model saved at episode {episode}")
+            if target_reward is not None and episode >= target_window and not stop:
+                if np.mean(rewards_all_episodes[-target_window:]) >= target_reward:
+                    print(f"Target reward {target_reward} stop at episode {episode}")
+                    stop = True
+        if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+            print(f"Time budget of {time_budget}s used at episode {len(rewards_all_episodes)}")
+            stop = True
+
+    if metrics is not None:
+        metrics.close()
+    agent.save(model_save_path)
+    print("Training complete. Final model saved.")
+    return rewards_all_episodes[:num_episodes], epsilon_history[:num_episodes]
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the poker DQN agent.')
+    parser.add_argument('--num-envs', type=int, default=1, help='Environments stepped per policy forward pass')
+    parser.add_argument('--backend', choices=['inprocess', 'subprocess'], default='inprocess',
+                        help='Where the vectorised environments run')
+    parser.add_argument('--actors', type=int, default=0,
+                        help='Train with this many actor processes feeding one learner')
+    parser.add_argument('--league', action='store_true',
+                        help='Self-play against a rated checkpoint pool evaluated in the background')
+    parser.add_argument('--checkpoint-dir', default='checkpoints',
+                        help='Directory for full training-state checkpoints')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from the newest checkpoint in --checkpoint-dir')
+    parser.add_argument('--metrics', default=None,
+                        help='Stream training metrics to this .jsonl or .csv file')
+    parser.add_argument('--warmup-steps', type=int, default=0, help='Env steps collected before learning starts')
+    parser.add_argument('--update-interval', type=int, default=None,
+                        help='Env steps between replay updates (default 1, or --num-envs when vectorised)')
+    parser.add_argument('--gradient-steps', type=int, default=1, help='Gradient steps per replay update')
+    parser.add_argument('--batch-size', type=int, default=32, help='Replay batch size')
+    parser.add_argument('--compact-replay', action='store_true', help='Keep replay states bit-packed')
+    parser.add_argument('--torch-threads', type=int, default=None, help='Intra-op threads for torch')
+    parser.add_argument('--interop-threads', type=int, default=None, help='Inter-op threads for torch')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    # Options each training mode cannot honour are rejected rather than silently dropped
+    if args.actors > 0:
+        unsupported = {
+            '--num-envs': args.num_envs > 1, '--league': args.league, '--resume': args.resume,
+            '--metrics': args.metrics, '--compact-replay': args.compact_replay,
+            '--warmup-steps': args.warmup_steps, '--update-interval': args.update_interval is not None,
+            '--gradient-steps': args.gradient_steps != 1,
+        }
+        mode = '--actors'
+    elif args.num_envs > 1:
+        unsupported = {'--league': args.league, '--resume': args.resume}
+        mode = '--num-envs > 1'
+    else:
+        unsupported = {}
+    rejected = [option for option, given in unsupported.items() if given]
+    if rejected:
+        parser.error(f"{', '.join(rejected)} cannot be combined with {mode}")
+    start_from_args(args, 'training')
+    configure_threads(args.torch_threads, args.interop_threads)
+
     # Initialize the environment
     env = PokerEnv()
 
@@ -95,18 +351,57 @@ if __name__ == '__main__':
 
     # Initialize the agent
     device = 'cuda' if torch.cuda.is_available() else 'cpu'
-    agent = DQNAgent(state_size=state_size, action_size=action_size, device=device)
+    agent = DQNAgent(state_size=state_size, action_size=action_size, device=device,
+                     compact_memory=args.compact_replay)
+
+    metrics = TrainingMetrics(args.metrics) if args.metrics else None
 
     # Train the agent
-    rewards, epsilons = train_agent(
-        env=env,
-        agent=agent,
-        num_episodes=1000,
-        max_steps_per_episode=100,
-        batch_size=32,
-        save_interval=100,
-        model_save_path='models/poker_dqn_agent.pth'
-    )
+    if args.actors > 0:
+        agent = train_actor_learner(
+            num_actors=args.actors,
+            num_updates=10000,
+            batch_size=args.batch_size,
+            model_save_path='models/poker_dqn_agent.pth',
+            device=device,
+            learner_threads=args.torch_threads
+        )
+        rewards = []
+    elif args.num_envs > 1:
+        vec_env = PokerVecEnv(args.num_envs, backend=args.backend)
+        rewards, epsilons = train_agent_vectorized(
+            vec_env=vec_env,
+            agent=agent,
+            num_episodes=1000,
+            batch_size=args.batch_size,
+            save_interval=100,
+            model_save_path='models/poker_dqn_agent.pth',
+            metrics=metrics,
+            warmup_steps=args.warmup_steps,
+            update_interval=args.update_interval,
+            gradient_steps=args.gradient_steps
+        )
+        vec_env.close()
+    else:
+        league = League() if args.league else None
+        rewards, epsilons = train_agent(
+            env=env,
+            agent=agent,
+            num_episodes=1000,
+            max_steps_per_episode=100,
+            batch_size=args.batch_size,
+            save_interval=100,
+            model_save_path='models/poker_dqn_agent.pth',
+            league=league,
+            checkpoint_dir=args.checkpoint_dir,
+            resume=args.resume,
+            metrics=metrics,
+            warmup_steps=args.warmup_steps,
+            update_interval=args.update_interval or 1,
+            gradient_steps=args.gradient_steps
+        )
+        if league is not None:
+            league.close(wait=False)
 
     # Plotting the results (optional)
     try:
@@ -0,0 +1,180 @@
+# training_metrics.py
+
+import csv
+import io
+import json
+import os
+import time
+
+# Timed sections of a training step
+SECTIONS = ['env_step', 'encode', 'act', 'sample', 'backprop']
+
+FIELDS = (
+    ['time', 'env_steps', 'updates', 'env_steps_per_s', 'updates_per_s']
+    + [f'{section}_fraction' for section in SECTIONS]
+    + ['loss', 'q_mean', 'q_max', 'q_min', 'buffer_size', 'buffer_fill']
+)
+
+class RotatingWriter:
+    """
+    Appends JSONL or CSV records to a file, rotating it to path.1, path.2, ... once
+    it grows past max_bytes. The format follows the file extension (.csv or JSONL).
+    """
+
+    def __init__(self, path, max_bytes=10000000, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.csv = path.endswith('.csv')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    def _open(self):
+        self.file = open(self.path, 'a', newline='')
+        if self.csv and self.file.tell() == 0:
+            csv.writer(self.file).writerow(FIELDS)
+
+    def write(self, record):
+        if self.csv:
+            line = io.StringIO()
+            csv.writer(line).writerow([record.get(field, '') for field in FIELDS])
+            self.file.write(line.getvalue())
+        else:
+            self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        if self.file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self.file.close()
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f'{self.path}.{index}'):
+                os.replace(f'{self.path}.{index}', f'{self.path}.{index + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def close(self):
+        self.file.close()
+
+
+class TrainingMetrics:
+    """
+    Throughput and learning statistics for the training loop.
+    Sections are timed with start/stop pairs that may nest; a section's time
+    excludes the sections nested inside it, so the fractions add up to the share
+    of wall time spent in instrumented code. Counters accumulate over a window that
+    is written as one record every log_interval env steps, and a summary line is
+    printed every summary_interval seconds.
+    """
+
+    def __init__(self, path=None, log_interval=1000, summary_interval=10.0, max_bytes=10000000, backups=3):
+        self.writer = RotatingWriter(path, max_bytes, backups) if path else None
+        self.log_interval = log_interval
+        self.summary_interval = summary_interval
+        self.total_env_steps = 0
+        self.total_updates = 0
+        self.buffer_size = 0
+        self.buffer_capacity = 0
+        self._stack = []  # [section, start time, time spent in nested sections]
+        self.start_time = time.perf_counter()
+        self.last_summary = self.start_time
+        self.last_record = None
+        self._reset_window()
+
+    def _reset_window(self):
+        self.window_start = time.perf_counter()
+        self.section_times = dict.fromkeys(SECTIONS, 0.0)
+        self.env_steps = 0
+        self.updates = 0
+        self.loss_sum = 0.0
+        self.q_sum = 0.0
+        self.q_max = float('-inf')
+        self.q_min = float('inf')
+
+    def start(self, section):
+        """Starts timing a section."""
+        self._stack.append([section, time.perf_counter(), 0.0])
+
+    def stop(self):
+        """Stops the innermost running section."""
+        section, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.section_times[section] += elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def record_update(self, loss, q_mean, q_max, q_min):
+        """Records one gradient update with its loss and Q-value statistics."""
+        self.updates += 1
+        self.total_updates += 1
+        self.loss_sum += loss
+        self.q_sum += q_mean
+        self.q_max = max(self.q_max, q_max)
+        self.q_min = min(self.q_min, q_min)
+
+    def record_buffer(self, size, capacity):
+        """Records the replay buffer fill level."""
+        self.buffer_size = size
+        self.buffer_capacity = capacity
+
+    def record_env_steps(self, count=1):
+        """Counts env steps and writes or prints once an interval has passed."""
+        self.env_steps += count
+        self.total_env_steps += count
+        if self.env_steps >= self.log_interval:
+            self.flush()
+        if time.perf_counter() - self.last_summary >= self.summary_interval:
+            self.print_summary()
+
+    def snapshot(self):
+        """Returns the statistics of the current window as a record."""
+        elapsed = max(time.perf_counter() - self.window_start, 1e-9)
+        record = {
+            'time': round(time.perf_counter() - self.start_time, 3),
+            'env_steps': self.total_env_steps,
+            'updates': self.total_updates,
+            'env_steps_per_s': self.env_steps / elapsed,
+            'updates_per_s': self.updates / elapsed,
+        }
+        for section in SECTIONS:
+            record[f'{section}_fraction'] = self.section_times[section] / elapsed
+        if self.updates:
+            record['loss'] = self.loss_sum / self.updates
+            record['q_mean'] = self.q_sum / self.updates
+            record['q_max'] = self.q_max
+            record['q_min'] = self.q_min
+        record['buffer_size'] = self.buffer_size
+        record['buffer_fill'] = self.buffer_size / self.buffer_capacity if self.buffer_capacity else 0.0
+        return record
+
+    def flush(self):
+        """Writes the current window as one record and starts a new window."""
+        if self.env_steps == 0 and self.updates == 0:
+            return
+        self.last_record = self.snapshot()
+        if self.writer is not None:
+            self.writer.write(self.last_record)
+        self._reset_window()
+
+    def print_summary(self):
+        """Prints a one-line summary of the most recent statistics."""
+        self.last_summary = time.perf_counter()
+        record = self.snapshot() if self.env_steps else self.last_record
+        if record is None:
+            return
+        split = ' '.join(f"{section} {record[f'{section}_fraction'] * 100:.0f}%" for section in SECTIONS)
+        loss = f"{record['loss']:.4f}" if 'loss' in record else '-'
+        q_mean = f"{record['q_mean']:.3f}" if 'q_mean' in record else '-'
+        print(f"Env steps/s: {record['env_steps_per_s']:.0f} - Updates/s: {record['updates_per_s']:.0f} - "
+              f"Loss: {loss} - Q mean: {q_mean} - Buffer: {record['buffer_fill'] * 100:.0f}% - Time: {split}")
+
+    def close(self):
+        """Writes the last partial window and closes the file."""
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,106 @@
+# transition_codec.py
+
+import numpy as np
+
+# Layout of PokerBot.encode_game_state before np.resize
+CARD_SLOTS = 52
+SCALARS = 3  # Pot, current bet and chips, each divided by 10000
+PHASES = ['pre-flop', 'flop', 'turn', 'river', 'showdown']
+CORE_SIZE = 2 * CARD_SLOTS + SCALARS + len(PHASES)  # 112
+NO_PHASE = len(PHASES)  # Stored when no phase slot is set
+
+_CARD_BITS = np.uint64(1) << np.arange(CARD_SLOTS, dtype=np.uint64)
+_PHASE_ONE_HOT = np.vstack([np.eye(len(PHASES), dtype=np.float32), np.zeros(len(PHASES), dtype=np.float32)])
+
+class StateCodec:
+    """
+    Compact storage for PokerBot state vectors.
+    A state is stored as two 64-bit card masks (own and community cards), the
+    three scalars and any opponent features as float16, and the phase as one
+    byte. Decoding rebuilds the dense float32 vector, including the cyclic
+    padding np.resize adds when state_size is larger than the features.
+    Cards and phase round-trip exactly; scalars keep about three significant digits.
+    With extra_features=None the number of opponent features is read from the
+    first states encoded, as the period with which they repeat; otherwise encode
+    raises ValueError when the padding does not repeat the first CORE_SIZE +
+    extra_features values.
+    """
+
+    def __init__(self, state_size, extra_features=None):
+        if state_size < CORE_SIZE:
+            raise ValueError(f"State size {state_size} is smaller than the {CORE_SIZE} core features")
+        self.state_size = state_size
+        self.period = None  # Length of the vector np.resize repeats, once known
+        self.extra_features = 0
+        self.tile_index = np.arange(state_size) % CORE_SIZE
+        if extra_features is not None:
+            self.set_extra_features(extra_features)
+
+    def set_extra_features(self, extra_features):
+        self.period = CORE_SIZE + extra_features
+        self.extra_features = min(extra_features, self.state_size - CORE_SIZE)  # Extras that survive truncation
+        self.tile_index = np.arange(self.state_size) % self.period
+
+    def detect_period(self, states):
+        """
+        Shortest length from CORE_SIZE up with which every state repeats, i.e. the
+        feature count before np.resize padded it, or state_size without padding.
+        The two own hole cards rule out a shorter false period.
+        """
+        for period in range(CORE_SIZE, self.state_size):
+            if np.array_equal(states[:, period:], states[:, :self.state_size - period]):
+                return period
+        return self.state_size
+
+    def empty(self, capacity):
+        """Returns zeroed storage for capacity states."""
+        return {
+            'own_cards': np.zeros(capacity, dtype=np.uint64),
+            'community_cards': np.zeros(capacity, dtype=np.uint64),
+            'scalars': np.zeros((capacity, SCALARS), dtype=np.float16),
+            'phase': np.full(capacity, NO_PHASE, dtype=np.uint8),
+            'extras': np.zeros((capacity, self.extra_features), dtype=np.float16),
+        }
+
+    @staticmethod
+    def nbytes(storage):
+        """Memory held by storage returned from empty or encode."""
+        return sum(array.nbytes for array in storage.values())
+
+    def encode(self, states):
+        """Packs an (N, state_size) array of dense states."""
+        states = np.asarray(states, dtype=np.float32).reshape(-1, self.state_size)
+        if self.period is None and len(states):
+            self.set_extra_features(self.detect_period(states) - CORE_SIZE)
+        padded = self.period is not None and self.state_size > self.period
+        if padded and not np.array_equal(states[:, self.period:], states[:, self.tile_index[self.period:]]):
+            raise ValueError(f"States do not repeat every {self.period} features; "
+                             f"extra_features={self.extra_features} does not match their layout")
+        phase_slots = states[:, 2 * CARD_SLOTS + SCALARS:CORE_SIZE]
+        phase = np.where(phase_slots.max(axis=1) > 0.5, phase_slots.argmax(axis=1), NO_PHASE)
+        return {
+            'own_cards': self._card_mask(states[:, :CARD_SLOTS]),
+            'community_cards': self._card_mask(states[:, CARD_SLOTS:2 * CARD_SLOTS]),
+            'scalars': states[:, 2 * CARD_SLOTS:2 * CARD_SLOTS + SCALARS].astype(np.float16),
+            'phase': phase.astype(np.uint8),
+            'extras': states[:, CORE_SIZE:CORE_SIZE + self.extra_features].astype(np.float16),
+        }
+
+    def decode(self, storage, indices=None):
+        """Rebuilds dense float32 states, optionally only those at indices."""
+        if indices is not None:
+            storage = {name: array[indices] for name, array in storage.items()}
+        count = len(storage['phase'])
+        core = np.zeros((count, CORE_SIZE + self.extra_features), dtype=np.float32)
+        core[:, :CARD_SLOTS] = (storage['own_cards'][:, None] & _CARD_BITS) != 0
+        core[:, CARD_SLOTS:2 * CARD_SLOTS] = (storage['community_cards'][:, None] & _CARD_BITS) != 0
+        core[:, 2 * CARD_SLOTS:2 * CARD_SLOTS + SCALARS] = storage['scalars']
+        core[:, 2 * CARD_SLOTS + SCALARS:CORE_SIZE] = _PHASE_ONE_HOT[storage['phase']]
+        core[:, CORE_SIZE:] = storage['extras']
+        if self.state_size == core.shape[1]:
+            return core
+        return core[:, self.tile_index]
+
+    @staticmethod
+    def _card_mask(slots):
+        return np.bitwise_or.reduce(np.where(slots > 0.5, _CARD_BITS, np.uint64(0)), axis=1)
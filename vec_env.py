@@ -0,0 +1,164 @@
+# vec_env.py
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from poker_env import PokerEnv
+
+class PokerVecEnv:
+    """
+    Vector of K PokerEnv instances stepped as one batch.
+    Observations come back stacked as a (K, state_size) float32 array, and an
+    environment whose episode ends is reset straight away: its row then holds the
+    first observation of the next episode while the final observation is passed in
+    infos[i]['terminal_observation'].
+
+    Backends:
+    - 'inprocess' steps every environment in the calling process.
+    - 'subprocess' splits the environments over worker processes. Observations,
+      actions, rewards and dones live in shared-memory arrays, so the pipes only
+      carry short commands.
+    """
+
+    def __init__(self, num_envs, backend='inprocess', num_workers=None, env_fn=PokerEnv):
+        self.num_envs = num_envs
+        self.backend = backend
+        probe = env_fn()
+        self.state_size = probe.observation_space.shape[0]
+        self.observation_space = probe.observation_space
+        self.action_space = probe.action_space
+
+        if backend == 'inprocess':
+            self.envs = [probe] + [env_fn() for _ in range(num_envs - 1)]
+            self.observations = np.zeros((num_envs, self.state_size), dtype=np.float32)
+            self.terminal_observations = np.zeros((num_envs, self.state_size), dtype=np.float32)
+            self.rewards = np.zeros(num_envs, dtype=np.float32)
+            self.dones = np.zeros(num_envs, dtype=bool)
+        elif backend == 'subprocess':
+            probe.close()
+            self._start_workers(num_workers or min(num_envs, mp.cpu_count()), env_fn)
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+
+    def _start_workers(self, num_workers, env_fn):
+        """Allocates the shared arrays and starts one worker per slice of environments."""
+        self._shared = {}
+        layout = {
+            'observations': ((self.num_envs, self.state_size), np.float32),
+            'terminal_observations': ((self.num_envs, self.state_size), np.float32),
+            'rewards': ((self.num_envs,), np.float32),
+            'dones': ((self.num_envs,), bool),
+            'actions': ((self.num_envs,), np.int64),
+        }
+        for name, (shape, dtype) in layout.items():
+            block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            self._shared[name] = block
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+        shared_names = {name: (block.name, layout[name][0], layout[name][1]) for name, block in self._shared.items()}
+        slices = np.array_split(np.arange(self.num_envs), num_workers)
+        self.pipes = []
+        self.workers = []
+        for env_indices in slices:
+            if len(env_indices) == 0:
+                continue
+            parent, child = mp.Pipe()
+            worker = mp.Process(
+                target=_worker, args=(child, env_fn, env_indices[0], env_indices[-1] + 1, shared_names),
+                daemon=True
+            )
+            worker.start()
+            child.close()
+            self.pipes.append(parent)
+            self.workers.append(worker)
+
+    def reset(self):
+        """Resets every environment and returns the stacked observations."""
+        if self.backend == 'inprocess':
+            for i, env in enumerate(self.envs):
+                self.observations[i] = env.reset()
+        else:
+            self._command('reset')
+        return self.observations.copy()
+
+    def step(self, actions):
+        """
+        Steps every environment with its action.
+        Returns (observations, rewards, dones, infos) as stacked arrays and a list of dicts.
+        """
+        if self.backend == 'inprocess':
+            for i, env in enumerate(self.envs):
+                self._step_env(env, i, actions[i], self.observations, self.terminal_observations,
+                               self.rewards, self.dones)
+        else:
+            self.actions[:] = actions
+            self._command('step')
+        infos = [
+            {'terminal_observation': self.terminal_observations[i].copy()} if self.dones[i] else {}
+            for i in range(self.num_envs)
+        ]
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+    @staticmethod
+    def _step_env(env, i, action, observations, terminal_observations, rewards, dones):
+        """Steps one environment into row i of the arrays, resetting it when its episode ends."""
+        observation, reward, done, _ = env.step(int(action))
+        rewards[i] = reward
+        dones[i] = done
+        if done:
+            terminal_observations[i] = observation
+            observation = env.reset()
+        observations[i] = observation
+
+    def _command(self, command):
+        for pipe in self.pipes:
+            pipe.send(command)
+        for pipe in self.pipes:
+            pipe.recv()
+
+    def close(self):
+        """Stops the workers and releases the shared memory."""
+        if self.backend == 'inprocess':
+            for env in self.envs:
+                env.close()
+            return
+        for pipe in self.pipes:
+            pipe.send('close')
+        for worker in self.workers:
+            worker.join()
+        for name, block in self._shared.items():
+            # Drop the array views before the buffers are released
+            setattr(self, name, None)
+            block.close()
+            block.unlink()
+        self._shared = {}
+
+
+def _worker(pipe, env_fn, start, stop, shared_names):
+    """Owns environments start..stop-1 and steps them on command from the parent."""
+    blocks = {name: shared_memory.SharedMemory(name=block_name) for name, (block_name, _, _) in shared_names.items()}
+    arrays = {
+        name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+        for name, (_, shape, dtype) in shared_names.items()
+    }
+    envs = [env_fn() for _ in range(start, stop)]
+    try:
+        while True:
+            command = pipe.recv()
+            if command == 'reset':
+                for offset, env in enumerate(envs):
+                    arrays['observations'][start + offset] = env.reset()
+            elif command == 'step':
+                for offset, env in enumerate(envs):
+                    i = start + offset
+                    PokerVecEnv._step_env(
+                        env, i, arrays['actions'][i], arrays['observations'],
+                        arrays['terminal_observations'], arrays['rewards'], arrays['dones']
+                    )
+            elif command == 'close':
+                break
+            pipe.send(True)
+    finally:
+        arrays.clear()
+        for block in blocks.values():
+            block.close()